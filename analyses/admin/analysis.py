@@ -15,6 +15,7 @@ from analyses.admin.base import (
     StudyFilter,
 )
 from analyses.models import Analysis
+from analyses.signals import send_bulk_saved
 
 
 class AnalysisStatusListFilter(StatusListFilter):
@@ -143,6 +144,7 @@ class AnalysisAdmin(JSONFieldWidgetOverridesMixin, ModelAdmin):
             results_dir="",
             external_results_dir="",
         )
+        send_bulk_saved(Analysis, queryset)
         self.message_user(
             request,
             f"{queryset.count()} analyses reset successfully",
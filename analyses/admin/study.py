@@ -173,13 +173,11 @@ class StudyAdmin(ENABrowserLinkMixin, JSONFieldWidgetOverridesMixin, ModelAdmin)
     )
     def show_assembly_status_summary(self, request, object_id):
         study = get_object_or_404(Study.objects, pk=object_id)
+        status_summary = study.assemblies_reads.status_summary(Assembly.AssemblyStates)
         assemblies_per_state = {
-            state: study.assemblies_reads.filter(
-                **{f"status__{state.value}": True}
-            ).count()
-            for state in Assembly.AssemblyStates
+            state: status_summary.count(state) for state in Assembly.AssemblyStates
         }
-        assemblies_total = study.assemblies_reads.count()
+        assemblies_total = status_summary.total
 
         def make_state_link(state: Assembly.AssemblyStates) -> str:
             url = reverse_lazy(
@@ -283,11 +281,11 @@ class StudyAdmin(ENABrowserLinkMixin, JSONFieldWidgetOverridesMixin, ModelAdmin)
     )
     def show_analysis_status_summary(self, request, object_id):
         study = get_object_or_404(Study.objects, pk=object_id)
+        status_summary = study.analyses.status_summary(Analysis.AnalysisStates)
         analyses_per_state = {
-            state: study.analyses.filter(**{f"status__{state.value}": True}).count()
-            for state in Analysis.AnalysisStates
+            state: status_summary.count(state) for state in Analysis.AnalysisStates
         }
-        analyses_total = study.analyses.count()
+        analyses_total = status_summary.total
 
         def make_state_link(state: Analysis.AnalysisStates) -> str:
             url = reverse_lazy(
@@ -5,3 +5,7 @@ class AnalysesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "analyses"
     verbose_name = "MGnify Analyses"
+
+    def ready(self):
+        # connects the receivers that invalidate cached API responses, in every process that might change data
+        import emgapiv2.api.cache  # noqa: F401
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Protocol
+from typing import Any, Iterable, Protocol
 
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
@@ -38,13 +38,45 @@ class VisibilityControlledModel(models.Model):
 
 
 class GetByENAAccessionManagerMixin:
+    """
+    Resolves ENA accessions to objects, by exact matches against their (GIN indexed) ena_accessions arrays.
+    """
+
     def get_by_accession(self, ena_accession):
-        qs = self.get_queryset().filter(ena_accessions__contains=[ena_accession])
-        if qs.count() > 1:
-            raise self.model.MultipleObjectsReturned()
-        elif not qs.exists():
-            raise self.model.DoesNotExist()
-        return qs.first()
+        # at most two matches are fetched, in one query: enough to tell if the accession is ambiguous
+        matches = list(
+            self.get_queryset().filter(ena_accessions__contains=[ena_accession])[:2]
+        )
+        if len(matches) > 1:
+            raise self.model.MultipleObjectsReturned(
+                f"More than one {self.model.__name__} has accession {ena_accession}"
+            )
+        elif not matches:
+            raise self.model.DoesNotExist(
+                f"No {self.model.__name__} has accession {ena_accession}"
+            )
+        return matches[0]
+
+    def resolve_many(self, ena_accessions: Iterable[str]) -> dict[str, models.Model]:
+        """
+        Resolve many accessions to objects at once, in a single (index-backed) query.
+        E.g. Run.objects.resolve_many(["ERR1", "SRR2"]) -> {"ERR1": <Run ...>, "SRR2": <Run ...>}
+        :param ena_accessions: Accessions to resolve. Each must match exactly one of an object's ena_accessions.
+        :return: Mapping of each accession that matched an object, to that object. Unmatched accessions are absent.
+        :raises MultipleObjectsReturned: If any accession matches more than one object.
+        """
+        wanted = set(ena_accessions)
+        if not wanted:
+            return {}
+        resolved = {}
+        for obj in self.get_queryset().filter(ena_accessions__overlap=list(wanted)):
+            for accession in wanted.intersection(obj.ena_accessions):
+                if accession in resolved and resolved[accession].pk != obj.pk:
+                    raise self.model.MultipleObjectsReturned(
+                        f"More than one {self.model.__name__} has accession {accession}"
+                    )
+                resolved[accession] = obj
+        return resolved
 
 
 class UpdateOrCreateByAccessionManagerMixin:
@@ -128,7 +160,7 @@ class ENADerivedModel(VisibilityControlledModel):
     )
     is_suppressed = models.BooleanField(default=False)
 
-    # TODO – postgres GIN index on accessions?
+    # N.B. concrete models should have a GinIndex on ena_accessions, so that accession lookups are index scans
 
     @property
     def first_accession(self):
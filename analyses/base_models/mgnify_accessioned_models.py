@@ -54,3 +54,9 @@ class MGnifyAccessionField(models.GeneratedField):
         kwargs["accession_prefix"] = self.accession_prefix
         kwargs["accession_length"] = self.accession_length
         return name, path, args, kwargs
+
+    def accession_for(self, pk: int) -> str:
+        """
+        The accession the DB will generate for an object with this pk, e.g. before the object is saved.
+        """
+        return f"{self.accession_prefix}{str(pk).zfill(self.accession_length)}"
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Optional, Union, Literal
 
 from django.db import models
-from pydantic import BaseModel, field_validator, Field
+from pydantic import BaseModel, field_validator, Field, PrivateAttr
 
 from emgapiv2.enum_utils import FutureStrEnum
 
@@ -73,6 +74,10 @@ class DownloadFile(BaseModel):
         None  # e.g. the accession of an Analysis this download is for
     )
 
+    # the already-loaded object these downloads belong to (e.g. the Analysis), if known.
+    # lets API URL resolution avoid re-fetching the parent for every download.
+    _parent: Optional[models.Model] = PrivateAttr(default=None)
+
     @field_validator("path", mode="before")
     def coerce_path(cls, value):
         if isinstance(value, Path):
@@ -102,40 +107,95 @@ class WithDownloadsModel(models.Model):
 
     downloads = models.JSONField(blank=True, default=list)
 
-    def add_download(self, download: DownloadFile):
-        if download.alias in [dl.get("alias") for dl in self.downloads]:
-            raise FileExistsError(
-                f"Duplicate download alias found in {self}.downloads list - not adding {download.path}"
-            )
+    def add_download(self, download: DownloadFile, save: bool = True):
+        """
+        Add a download to the downloads list.
+        :param download: The download file to add. Its alias must be unique within the downloads list.
+        :param save: Save (just the downloads field of) the object afterwards.
+            Set False if the object will be saved anyway, e.g. after adding several downloads.
+        """
+        self.add_downloads([download], save=save)
+
+    def add_downloads(self, downloads: List[DownloadFile], save: bool = True):
+        """
+        Add several downloads to the downloads list, saving (just the downloads field of) the object once.
+        Every download is checked before any is added, so if one is invalid the downloads list is left unchanged.
+        :param downloads: The download files to add. Their aliases must be unique within the downloads list.
+        :param save: Save the object afterwards.
+        """
+        aliases = {dl.get("alias") for dl in self.downloads}
+        for download in downloads:
+            if download.alias in aliases:
+                raise FileExistsError(
+                    f"Duplicate download alias found in {self}.downloads list - not adding {download.path}"
+                )
 
-        if (
-            download.download_group
-            and self.ALLOWED_DOWNLOAD_GROUP_PREFIXES
-            and not any(
-                download.download_group.startswith(prefix)
-                for prefix in self.ALLOWED_DOWNLOAD_GROUP_PREFIXES
-            )
-        ):
-            raise ValueError(
-                f"Download group {download.download_group} is not allowed for model {self.__class__.__name__}: only prefixes {self.ALLOWED_DOWNLOAD_GROUP_PREFIXES}"
-            )
+            if (
+                download.download_group
+                and self.ALLOWED_DOWNLOAD_GROUP_PREFIXES
+                and not any(
+                    download.download_group.startswith(prefix)
+                    for prefix in self.ALLOWED_DOWNLOAD_GROUP_PREFIXES
+                )
+            ):
+                raise ValueError(
+                    f"Download group {download.download_group} is not allowed for model {self.__class__.__name__}: only prefixes {self.ALLOWED_DOWNLOAD_GROUP_PREFIXES}"
+                )
+
+            aliases.add(download.alias)
 
-        self.downloads.append(download.model_dump(exclude={"parent_identifier"}))
-        self.save()
+        self.downloads.extend(
+            download.model_dump(exclude={"parent_identifier"}) for download in downloads
+        )
+
+        if save and not getattr(self, "_defer_downloads_save", False):
+            self._save_downloads()
+
+    def _save_downloads(self):
+        if self._state.adding:
+            # not in the DB yet, so update_fields cannot be used
+            self.save()
+        else:
+            update_fields = ["downloads"]
+            if hasattr(self, "updated_at"):
+                update_fields.append("updated_at")
+            self.save(update_fields=update_fields)
+
+    @contextmanager
+    def downloads_saved_once(self):
+        """
+        Context manager in which add_download(s) does not save the object each time.
+        The downloads field is instead saved once, on leaving the context (unless an exception was raised).
+
+        e.g.
+            with analysis.downloads_saved_once():
+                for download in downloads:
+                    analysis.add_download(download)
+        """
+        if getattr(self, "_defer_downloads_save", False):
+            # nested: the outermost context saves
+            yield self
+            return
+        self._defer_downloads_save = True
+        downloads_count = len(self.downloads)
+        try:
+            yield self
+        finally:
+            self._defer_downloads_save = False
+        if len(self.downloads) != downloads_count:
+            self._save_downloads()
 
     @property
     def downloads_as_objects(self) -> List[DownloadFile]:
-        return [
-            DownloadFile.model_validate(
-                dict(
-                    **dl,
-                    parent_identifier=getattr(
-                        self, self.DOWNLOAD_PARENT_IDENTIFIER_ATTR
-                    ),
-                )
+        parent_identifier = getattr(self, self.DOWNLOAD_PARENT_IDENTIFIER_ATTR)
+        download_files = []
+        for dl in self.downloads:
+            download_file = DownloadFile.model_validate(
+                dict(**dl, parent_identifier=parent_identifier)
             )
-            for dl in self.downloads
-        ]
+            download_file._parent = self
+            download_files.append(download_file)
+        return download_files
 
     class Meta:
         abstract = True
@@ -1,9 +1,77 @@
 # TODO: refactor the "state" field to a base model here, including helpers like a default state classmethod
 # and a mark-status method
 from enum import Enum
-from typing import List, Union
+from typing import Dict, Iterable, List, Union
 
-from django.db.models import Q, QuerySet
+from django.db.models import (
+    BooleanField,
+    Case,
+    Count,
+    F,
+    JSONField,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.expressions import CombinedExpression
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from pydantic import BaseModel, Field
+
+from analyses.signals import bulk_saved
+
+
+def _status_label(status: Union[str, Enum]) -> str:
+    return status.value if isinstance(status, Enum) else status
+
+
+class StatusCombinationCount(BaseModel):
+    statuses: List[str] = Field(
+        ..., examples=[["analysis_started", "analysis_completed"]]
+    )  # the statuses that are true for these objects (all others being false or unset)
+    count: int
+
+
+class StatusSummary(BaseModel):
+    """
+    Counts of objects (e.g. a study's analyses) by their statuses, as made by SelectByStatusQueryset.status_summary.
+    """
+
+    total: int
+    counts: Dict[str, int] = Field(
+        ..., examples=[{"analysis_started": 10, "analysis_completed": 8}]
+    )  # objects with each status true
+    combinations: List[StatusCombinationCount]
+
+    def count(self, status: Union[str, Enum]) -> int:
+        """
+        Number of objects with a status true.
+        """
+        return self.counts.get(_status_label(status), 0)
+
+    def count_any(self, statuses: Iterable[Union[str, Enum]]) -> int:
+        """
+        Number of objects with any of the statuses true, each counted once.
+        E.g. summary.count_any([AnalysisStates.ANALYSIS_FAILED, AnalysisStates.ANALYSIS_QC_FAILED])
+        """
+        labels = {_status_label(status) for status in statuses}
+        return sum(
+            combination.count
+            for combination in self.combinations
+            if labels.intersection(combination.statuses)
+        )
+
+    def count_all(self, statuses: Iterable[Union[str, Enum]]) -> int:
+        """
+        Number of objects with all of the statuses true.
+        """
+        labels = {_status_label(status) for status in statuses}
+        return sum(
+            combination.count
+            for combination in self.combinations
+            if labels.issubset(combination.statuses)
+        )
 
 
 class SelectByStatusQueryset(QuerySet):
@@ -63,6 +131,135 @@ class SelectByStatusQueryset(QuerySet):
         filters = self._build_q_objects(statuses_to_exclude, not strict, False)
         return self.filter(*filters)
 
+    def set_statuses(
+        self,
+        true: List[Union[str, Enum]] = None,
+        false: List[Union[str, Enum]] = None,
+        reasons: Dict[Union[str, Enum], str] = None,
+        reasons_if_was_true: Dict[Union[str, Enum], str] = None,
+    ) -> int:
+        """
+        Set keys of the status json field of every object in the queryset, in a single UPDATE query.
+        Other keys of the status field are left as they are, and no objects are loaded or reloaded.
+        Like QuerySet.update, the objects' save() methods and post_save signals are bypassed,
+        but a bulk_saved signal is sent for the updated objects (with statuses: the keys set, and their new values).
+
+        E.g. Analysis.objects.filter(id__in=ids).set_statuses(
+            true=[AnalysisStates.ANALYSIS_COMPLETED],
+            false=[AnalysisStates.ANALYSIS_FAILED],
+            reasons={AnalysisStates.ANALYSIS_COMPLETED: "all_results"},
+        )
+
+        :param true: List of keys to set to true in the model's status_fieldname json field.
+        :param false: List of keys to set to false in the model's status_fieldname json field.
+        :param reasons: Mapping of keys to a reason, stored as "<key>_reason" in the json field.
+        :param reasons_if_was_true: Like reasons, but only stored for objects whose key was true before the update
+            (e.g. to explain why a status that was set has been unset).
+        :return: Number of objects updated.
+        """
+
+        patch = {_status_label(status): True for status in true or []}
+        patch.update({_status_label(status): False for status in false or []})
+        patch.update(
+            {
+                f"{_status_label(status)}_reason": reason
+                for status, reason in (reasons or {}).items()
+            }
+        )
+        if not patch:
+            return 0
+
+        # jsonb || jsonb merges the patch's keys into the existing status
+        status = CombinedExpression(
+            Coalesce(F(self.status_fieldname), Value({}, output_field=JSONField())),
+            "||",
+            Value(patch, output_field=JSONField()),
+            output_field=JSONField(),
+        )
+        for key, reason in (reasons_if_was_true or {}).items():
+            label = _status_label(key)
+            status = CombinedExpression(
+                status,
+                "||",
+                # the condition sees the status as it was before this update
+                Case(
+                    When(
+                        Q(**{f"{self.status_fieldname}__{label}": True}),
+                        then=Value(
+                            {f"{label}_reason": reason}, output_field=JSONField()
+                        ),
+                    ),
+                    default=Value({}, output_field=JSONField()),
+                    output_field=JSONField(),
+                ),
+                output_field=JSONField(),
+            )
+        updates = {self.status_fieldname: status}
+        if any(field.name == "updated_at" for field in self.model._meta.fields):
+            updates["updated_at"] = timezone.now()
+        # the objects are only listed (before the update changes which of them match) if anything is listening
+        pks = (
+            list(self.values_list("pk", flat=True))
+            if bulk_saved.has_listeners(self.model)
+            else None
+        )
+        updated = self.update(**updates)
+        if pks:
+            bulk_saved.send(sender=self.model, pks=pks, statuses=patch)
+        return updated
+
+    def status_summary(self, statuses: Iterable[Union[str, Enum]]) -> StatusSummary:
+        """
+        Count the objects in the queryset with each status true, and with each combination of true statuses,
+        in a single query (grouping the objects by which of the statuses are true for them).
+        A status that is unset counts as false.
+
+        E.g. study.analyses.status_summary(Analysis.AnalysisStates).count(Analysis.AnalysisStates.ANALYSIS_COMPLETED)
+
+        :param statuses: The keys of the model's status_fieldname json field to count, e.g. a states enum.
+        :return: The total number of objects, the count for each status, and the count for each combination.
+        """
+        labels = [_status_label(status) for status in statuses]
+        # aliased by position, since status keys need not be valid (or unused) names for annotations
+        flags = {
+            f"_status_{position}": Case(
+                When(Q(**{f"{self.status_fieldname}__{label}": True}), then=True),
+                default=False,
+                output_field=BooleanField(),
+            )
+            for position, label in enumerate(labels)
+        }
+        groups = (
+            self.order_by()
+            .annotate(**flags)
+            .values(*flags.keys())
+            .annotate(_count=Count("pk"))
+        )
+
+        combinations = [
+            StatusCombinationCount(
+                statuses=[
+                    label
+                    for position, label in enumerate(labels)
+                    if group[f"_status_{position}"]
+                ],
+                count=group["_count"],
+            )
+            for group in groups
+        ]
+        return StatusSummary(
+            total=sum(combination.count for combination in combinations),
+            counts={
+                label: sum(
+                    combination.count
+                    for combination in combinations
+                    if label in combination.statuses
+                )
+                for label in labels
+            },
+            combinations=combinations,
+        )
+
 
 class SelectByStatusManagerMixin:
     """
@@ -91,3 +288,9 @@ class SelectByStatusManagerMixin:
 
     def filter_by_statuses(self, *args, **kwargs):
         return self.get_queryset().filter_by_statuses(*args, **kwargs)
+
+    def set_statuses(self, *args, **kwargs):
+        return self.get_queryset().set_statuses(*args, **kwargs)
+
+    def status_summary(self, *args, **kwargs):
+        return self.get_queryset().status_summary(*args, **kwargs)
@@ -0,0 +1,48 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from analyses.models import Analysis, AnalysisAnnotation
+
+
+class Command(BaseCommand):
+    help = "Backfills the normalised (searchable) AnalysisAnnotation rows of analyses with imported annotations."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-a",
+            "--accessions",
+            type=str,
+            nargs="+",
+            help="Only sync these analyses (MGYA accessions).",
+            required=False,
+        )
+        parser.add_argument(
+            "--missing-only",
+            action="store_true",
+            help="Only sync analyses that do not have any annotation rows yet.",
+        )
+
+    def handle(self, *args, **options):
+        analyses_to_sync = Analysis.objects.filter_by_statuses(
+            [Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+        ).order_by("id")
+        if options["accessions"]:
+            analyses_to_sync = analyses_to_sync.filter(
+                accession__in=options["accessions"]
+            )
+        if options["missing_only"]:
+            analyses_to_sync = analyses_to_sync.exclude(
+                id__in=AnalysisAnnotation.objects.values("analysis_id")
+            )
+
+        synced = 0
+        for analysis in analyses_to_sync.iterator(chunk_size=500):
+            try:
+                AnalysisAnnotation.objects.sync_for_analysis(analysis)
+            except Exception as e:
+                logging.error(f"Could not sync annotations of {analysis}: {e}")
+            else:
+                synced += 1
+
+        logging.info(f"Synced annotation rows for {synced} analyses")
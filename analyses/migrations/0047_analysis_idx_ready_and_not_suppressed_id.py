@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-16 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analyses", "0046_alter_study_watchers"),
+        ("ena", "0004_alter_sample_additional_accessions_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="analysis",
+            name="idx_ready_and_not_suppressed",
+        ),
+        migrations.AddIndex(
+            model_name="analysis",
+            index=models.Index(
+                condition=models.Q(("is_ready", True), ("is_suppressed", False)),
+                fields=["is_ready", "is_suppressed", "id"],
+                name="idx_ready_and_not_suppressed",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analyses", "0047_analysis_idx_ready_and_not_suppressed_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisAnnotation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("annotation_type", models.CharField(max_length=100)),
+                ("identifier", models.TextField()),
+                ("count", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "analysis",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="annotation_rows",
+                        to="analyses.analysis",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["identifier", "annotation_type"],
+                        name="idx_annotation_identifier",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("analysis", "annotation_type", "identifier"),
+                        name="unique_annotation_per_analysis",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:43
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analyses", "0048_analysisannotation"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="assembly",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["ena_accessions"], name="analyses_as_ena_acc_ac39a0_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="run",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["ena_accessions"], name="analyses_ru_ena_acc_3ef607_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sample",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["ena_accessions"], name="analyses_sa_ena_acc_ce108f_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="study",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["ena_accessions"], name="analyses_st_ena_acc_89e964_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:51
+
+from django.db import migrations, models
+
+
+def materialise_lineages(apps, schema_editor):
+    Biome = apps.get_model("analyses", "biome")
+
+    biomes = list(Biome.objects.all())
+    names_by_path = {str(biome.path): biome.biome_name for biome in biomes}
+    for biome in biomes:
+        prefixes = (".".join(biome.path[:n]) for n in range(1, len(biome.path) + 1))
+        biome.pretty_lineage = ":".join(
+            names_by_path[prefix] for prefix in prefixes if prefix in names_by_path
+        )
+        biome.depth = len(biome.path)
+    Biome.objects.bulk_update(biomes, ["pretty_lineage", "depth"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analyses", "0049_ena_accessions_gin_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="biome",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="biome",
+            name="pretty_lineage",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(
+            code=materialise_lineages, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -3,16 +3,19 @@ from __future__ import annotations
 import logging
 import os
 import re
+import threading
+import time
 from pathlib import Path
-from typing import ClassVar, Union
+from typing import ClassVar, Dict, Iterable, List, Optional, Union
 
 from aenum import extend_enum
 from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from django.db import models
+from django.db import models, transaction
 from django.db.models import JSONField, Q, Func, Value
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from django_ltree.fields import PathValue
 from django_ltree.models import TreeModel
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -29,6 +32,7 @@ from analyses.base_models.mgnify_accessioned_models import MGnifyAccessionField
 from analyses.base_models.with_downloads_models import WithDownloadsModel
 from analyses.base_models.with_status_models import SelectByStatusManagerMixin
 from analyses.base_models.with_watchers_models import WithWatchersModel
+from analyses.signals import bulk_saved, send_bulk_saved
 from emgapiv2.async_utils import anysync_property
 from emgapiv2.enum_utils import FutureStrEnum
 from emgapiv2.model_utils import JSONFieldWithSchema
@@ -42,20 +46,79 @@ from workflows.ena_utils.sample import ENASampleFields
 logger = logging.getLogger(__name__)
 
 
+def _lineage_for_path(path: PathValue, names_by_path: Dict[str, str]) -> str:
+    """
+    E.g. root.engineered.wet_fermentation -> "root:Engineered:Wet fermentation".
+    A level of the path with no biome (i.e. not in names_by_path) is simply missing from the lineage.
+    """
+    prefixes = (".".join(path[:depth]) for depth in range(1, len(path) + 1))
+    return ":".join(
+        names_by_path[prefix] for prefix in prefixes if prefix in names_by_path
+    )
+
+
 class Biome(TreeModel):
     biome_name = models.CharField(max_length=255)
 
+    # Materialised from the names of the biome's ancestors, whenever it or an ancestor is saved or deleted,
+    # so that a biome's lineage never needs a query. (Queryset .update()s of biomes bypass this.)
+    pretty_lineage = models.TextField(blank=True, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
     def __str__(self):
         return self.pretty_lineage
 
-    @property
-    def pretty_lineage(self):
-        return ":".join(self.ancestors().values_list("biome_name", flat=True))
-
     @property
     def descendants_count(self):
         return self.descendants().count()
 
+    def save(self, *args, **kwargs):
+        names_by_path = {
+            str(path): name
+            for path, name in Biome.objects.filter(path__ancestors=self.path)
+            .exclude(path=self.path)
+            .values_list("path", "biome_name")
+        }
+        names_by_path[str(self.path)] = self.biome_name
+        self.pretty_lineage = _lineage_for_path(self.path, names_by_path)
+        self.depth = len(self.path)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {
+                *kwargs["update_fields"],
+                "pretty_lineage",
+                "depth",
+            }
+        super().save(*args, **kwargs)
+        self.refresh_descendants_lineages(names_by_path)
+        biome_tree.invalidate()
+
+    def refresh_descendants_lineages(self, names_by_path: Dict[str, str] = None):
+        """
+        Update the materialised lineages of this biome's descendants, which include this biome's name.
+        E.g. after this biome is renamed, or created between existing levels of the hierarchy.
+        :param names_by_path: The names of this biome and its ancestors, if already known.
+        """
+        if names_by_path is None:
+            names_by_path = {
+                str(path): name
+                for path, name in Biome.objects.filter(
+                    path__ancestors=self.path
+                ).values_list("path", "biome_name")
+            }
+        descendants = list(
+            Biome.objects.filter(path__descendants=self.path).exclude(path=self.path)
+        )
+        names_by_path.update(
+            (str(descendant.path), descendant.biome_name) for descendant in descendants
+        )
+        changed = []
+        for descendant in descendants:
+            lineage = _lineage_for_path(descendant.path, names_by_path)
+            if descendant.pretty_lineage != lineage:
+                descendant.pretty_lineage = lineage
+                changed.append(descendant)
+        Biome.objects.bulk_update(changed, ["pretty_lineage"])
+
     @staticmethod
     def lineage_to_path(lineage: str) -> str:
         """
@@ -76,6 +139,86 @@ class Biome(TreeModel):
         return re.sub(r"[^a-zA-Z0-9._]", "", underscore_punctuated)
 
 
+class BiomeTree:
+    """
+    A process-wide snapshot of the whole biome hierarchy, which is small, loaded in a single query.
+    For code that needs many biomes or their ancestors at once (e.g. the choices of a flow input, breadcrumbs,
+    or ascending the hierarchy to find a heuristic), without a query per biome.
+
+    The snapshot is discarded whenever a biome is saved or deleted in this process,
+    and otherwise after max_age_seconds, so that changes made by other processes are picked up.
+    Its biomes are shared, so must not be modified.
+
+    E.g. biome_tree.ancestors("root.engineered.wet_fermentation") -> [<root>, <root:Engineered>, <root:Engineered:Wet fermentation>]
+    """
+
+    def __init__(self, max_age_seconds: int = 300):
+        self.max_age_seconds = max_age_seconds
+        self._biomes_by_path: Optional[Dict[str, Biome]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _get_biomes_by_path(self) -> Dict[str, Biome]:
+        with self._lock:
+            if (
+                self._biomes_by_path is None
+                or time.monotonic() - self._loaded_at > self.max_age_seconds
+            ):
+                self._biomes_by_path = {
+                    str(biome.path): biome for biome in Biome.objects.all()
+                }
+                self._loaded_at = time.monotonic()
+            return self._biomes_by_path
+
+    def invalidate(self):
+        with self._lock:
+            self._biomes_by_path = None
+
+    def all(self) -> List[Biome]:
+        """
+        Every biome, ordered by path (so each comes after its ancestors).
+        """
+        return list(self._get_biomes_by_path().values())
+
+    def get(self, path: Union[str, PathValue]) -> Optional[Biome]:
+        return self._get_biomes_by_path().get(str(path))
+
+    def ancestors(self, biome_or_path: Union[Biome, str, PathValue]) -> List[Biome]:
+        """
+        The biomes from the root down to (and including) a biome, like Biome.ancestors() but without a query.
+        Useful as breadcrumbs.
+        """
+        path = PathValue(
+            biome_or_path.path if isinstance(biome_or_path, Biome) else biome_or_path
+        )
+        biomes_by_path = self._get_biomes_by_path()
+        prefixes = (".".join(path[:depth]) for depth in range(1, len(path) + 1))
+        return [
+            biomes_by_path[prefix] for prefix in prefixes if prefix in biomes_by_path
+        ]
+
+    def choices(self) -> Dict[str, str]:
+        """
+        Mapping of every biome's path to its lineage, e.g. {"root.engineered": "root:Engineered", ...}
+        """
+        return {
+            path: biome.pretty_lineage
+            for path, biome in self._get_biomes_by_path().items()
+        }
+
+
+biome_tree = BiomeTree()
+
+
+@receiver(post_delete, sender=Biome)
+def on_biome_deleted_refresh_lineages(sender, instance: Biome, **kwargs):
+    """
+    Descendants of a deleted biome no longer include its name in their lineages.
+    """
+    instance.refresh_descendants_lineages()
+    biome_tree.invalidate()
+
+
 class StudyManager(ENADerivedManager):
     def get_or_create_for_ena_study(self, ena_study_accession):
         logger.info(f"Will get/create MGnify study for {ena_study_accession}")
@@ -155,6 +298,7 @@ class Study(
 
         indexes = [
             GinIndex(fields=["features"]),
+            GinIndex(fields=["ena_accessions"]),
         ]
 
     @property
@@ -188,6 +332,11 @@ class Sample(ENADerivedModel, TimeStampedModel):
     def __str__(self):
         return f"Sample {self.id}: {self.ena_sample}"
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["ena_accessions"]),
+        ]
+
 
 class WithExperimentTypeModel(models.Model):
     class ExperimentTypes(models.TextChoices):
@@ -258,7 +407,7 @@ class Run(
         return latest_analysis.status
 
     def set_experiment_type_by_metadata(
-        self, ena_library_strategy: str, ena_library_source: str
+        self, ena_library_strategy: str, ena_library_source: str, save: bool = True
     ):
         ALLOWED_WHOLE_GENOME_LIBRARY_STRATEGIES = ["wgs", "wga"]
         ALLOWED_AMPLICON_LIBRARY_STRATEGIES = ["amplicon"]
@@ -285,11 +434,17 @@ class Run(
             self.experiment_type = Run.ExperimentTypes.AMPLICON
         else:
             self.experiment_type = Run.ExperimentTypes.UNKNOWN
-        self.save()
+        if save:
+            self.save()
 
     def __str__(self):
         return f"Run {self.id}: {self.first_accession}"
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["ena_accessions"]),
+        ]
+
 
 class Assembler(TimeStampedModel):
     METASPADES = "metaspades"
@@ -437,6 +592,9 @@ class Assembly(InferredMetadataMixin, TimeStampedModel, ENADerivedModel):
             )
         ]
         ordering = ["id"]
+        indexes = [
+            GinIndex(fields=["ena_accessions"]),
+        ]
 
     def __str__(self):
         return f"Assembly {self.id} | {self.first_accession or 'unaccessioned'} (Run {self.run.first_accession})"
@@ -719,8 +877,28 @@ class Analysis(
         self.status[status] = set_status_as
         if reason:
             self.status[f"{status}_reason"] = reason
+        # (the AnalysisAnnotation rows follow the ANALYSIS_ANNOTATIONS_IMPORTED status when saved)
         return self.save()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "status" in instance.__dict__:
+            # so that saving can tell whether the imported status changed
+            instance._annotations_were_imported = instance.annotations_imported
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or "status" in fields:
+            self._annotations_were_imported = self.annotations_imported
+
+    @property
+    def annotations_imported(self) -> bool:
+        return bool(
+            (self.status or {}).get(self.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED)
+        )
+
     @property
     def assembly_or_run(self) -> Union[Assembly, Run]:
         return self.assembly or self.run
@@ -747,7 +925,8 @@ class Analysis(
         indexes = [
             models.Index(
                 name="idx_ready_and_not_suppressed",  # API queries might want this index for default queries
-                fields=["is_ready", "is_suppressed"],
+                # id last, so that keyset (cursor) pagination of public analyses is an index range scan
+                fields=["is_ready", "is_suppressed", "id"],
                 condition=models.Q(is_ready=True, is_suppressed=False),
             )
         ]
@@ -785,6 +964,7 @@ def on_study_saved_update_analyses_suppression_states(
         )
         analysis.is_suppressed = instance.is_suppressed
     Analysis.objects.bulk_update(analyses_to_update_suppression_of, ["is_suppressed"])
+    send_bulk_saved(Analysis, analyses_to_update_suppression_of)
 
 
 class AnalysedContig(TimeStampedModel):
@@ -812,3 +992,223 @@ class AnalysedContig(TimeStampedModel):
         }
 
     annotations = models.JSONField(default=default_annotations.__func__)
+
+
+class AnalysisAnnotationManager(models.Manager):
+    # keys that hold the identifier of an annotation in the annotations lists, in order of preference
+    IDENTIFIER_KEYS = ["accession", "function", "organism", "pfam", "ipr", "go", "ko"]
+    COUNT_KEYS = ["count", "read_count"]
+
+    @classmethod
+    def rows_from_annotations(cls, annotations: dict) -> dict[tuple[str, str], int]:
+        """
+        Flatten an Analysis.annotations blob into (annotation_type, identifier) -> count.
+        Nested annotations get types like the Analysis constants, e.g. "taxonomies__ssu".
+        Annotations listed more than once have their counts summed.
+        """
+        rows = {}
+
+        def add_rows(annotation_type: str, value):
+            if isinstance(value, dict):
+                if isinstance(value.get("read_count"), list):
+                    # e.g. functional_annotation__pfam: {"read_count": [...], "coverage_depth": [...], ...}
+                    add_rows(annotation_type, value["read_count"])
+                    return
+                for key, sub_value in value.items():
+                    add_rows(f"{annotation_type}__{key}", sub_value)
+                return
+            if not isinstance(value, list):
+                return
+            for item in value:
+                if isinstance(item, str):
+                    identifier, count = item, None
+                elif isinstance(item, dict):
+                    identifier = next(
+                        (item[key] for key in cls.IDENTIFIER_KEYS if item.get(key)),
+                        None,
+                    )
+                    count = next(
+                        (
+                            item[key]
+                            for key in cls.COUNT_KEYS
+                            if item.get(key) is not None
+                        ),
+                        None,
+                    )
+                else:
+                    continue
+                if not identifier:
+                    continue
+                key = (annotation_type, str(identifier))
+                if isinstance(count, (int, float)):
+                    rows[key] = (rows.get(key) or 0) + int(count)
+                else:
+                    rows.setdefault(key, None)
+
+        for annotation_type, value in (annotations or {}).items():
+            add_rows(annotation_type, value)
+        return rows
+
+    def sync_for_analysis(self, analysis: Analysis):
+        """
+        (Re)build the annotation rows of an analysis from its annotations blob.
+        """
+        annotations = (
+            Analysis.objects_and_annotations.filter(pk=analysis.pk)
+            .values_list("annotations", flat=True)
+            .first()
+        )
+        rows = self.rows_from_annotations(annotations)
+        with transaction.atomic():
+            self.filter(analysis=analysis).delete()
+            self.bulk_create(
+                [
+                    self.model(
+                        analysis=analysis,
+                        annotation_type=annotation_type,
+                        identifier=identifier,
+                        count=count,
+                    )
+                    for (annotation_type, identifier), count in rows.items()
+                ],
+                batch_size=5000,
+            )
+        logger.info(f"Synced {len(rows)} annotation rows for {analysis}")
+
+    def sync_for_analyses(self, analyses: Iterable[Analysis], batch_size: int = 500):
+        """
+        (Re)build the annotation rows of several analyses from their annotations blobs,
+        reading and rewriting a batch of analyses at a time rather than one analysis at a time.
+        """
+        pks = [analysis.pk for analysis in analyses]
+        rows_count = 0
+        for start in range(0, len(pks), batch_size):
+            batch = pks[start : start + batch_size]
+            annotations_by_pk = Analysis.objects_and_annotations.filter(
+                pk__in=batch
+            ).values_list("pk", "annotations")
+            with transaction.atomic():
+                self.filter(analysis_id__in=batch).delete()
+                rows = [
+                    self.model(
+                        analysis_id=pk,
+                        annotation_type=annotation_type,
+                        identifier=identifier,
+                        count=count,
+                    )
+                    for pk, annotations in annotations_by_pk
+                    for (
+                        annotation_type,
+                        identifier,
+                    ), count in self.rows_from_annotations(annotations).items()
+                ]
+                self.bulk_create(rows, batch_size=5000)
+            rows_count += len(rows)
+        logger.info(f"Synced {rows_count} annotation rows for {len(pks)} analyses")
+
+
+class AnalysisAnnotation(models.Model):
+    """
+    A single annotation (e.g. a Pfam accession, or a taxonomic lineage) found in an Analysis.
+    A normalised, indexed copy of the Analysis.annotations blob of analyses with imported annotations,
+    so that questions like "which analyses contain PF00005" are index lookups rather than JSON scans.
+    """
+
+    objects: AnalysisAnnotationManager = AnalysisAnnotationManager()
+
+    analysis = models.ForeignKey(
+        Analysis, on_delete=models.CASCADE, related_name="annotation_rows"
+    )
+    annotation_type = models.CharField(
+        max_length=100
+    )  # e.g. "pfams" or "taxonomies__ssu"
+    identifier = models.TextField()  # e.g. "PF00005" or "sk__Bacteria;k__;p__Bacillota"
+    count = models.BigIntegerField(
+        null=True, blank=True
+    )  # sometimes it is just presence with no count
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["analysis", "annotation_type", "identifier"],
+                name="unique_annotation_per_analysis",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["identifier", "annotation_type"],
+                name="idx_annotation_identifier",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.analysis_id}: {self.annotation_type} {self.identifier}"
+
+
+@receiver(pre_save, sender=Analysis)
+def on_analysis_saving_check_annotation_rows(
+    sender, instance: Analysis, update_fields=None, raw=False, **kwargs
+):
+    """
+    Work out whether an analysis' AnalysisAnnotation rows need rebuilding (or removing) once it is saved:
+    i.e. if its ANALYSIS_ANNOTATIONS_IMPORTED status is changing,
+    or (while that is set) its annotations are changing and are saved with update_fields=["annotations", ...].
+    A full save() does not compare the annotations, since that would send the whole blob to the DB every time.
+    """
+    instance._annotation_rows_stale = False
+    if raw:
+        return
+    saving = set(update_fields) if update_fields is not None else None
+    imported = instance.annotations_imported
+
+    if saving is None or "status" in saving:
+        was_imported = getattr(instance, "_annotations_were_imported", None)
+        if was_imported is None and not instance._state.adding:
+            was_imported = Analysis.objects.filter(
+                pk=instance.pk,
+                **{
+                    f"status__{Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED.value}": True
+                },
+            ).exists()
+        if imported != bool(was_imported):
+            instance._annotation_rows_stale = True
+            return
+
+    if imported and saving is not None and "annotations" in saving:
+        # compared in the DB, rather than keeping a copy of every loaded (and potentially large) annotations blob
+        instance._annotation_rows_stale = not Analysis.objects_and_annotations.filter(
+            pk=instance.pk, annotations=instance.annotations
+        ).exists()
+
+
+@receiver(post_save, sender=Analysis)
+def on_analysis_saved_sync_annotation_rows(
+    sender, instance: Analysis, update_fields=None, raw=False, **kwargs
+):
+    if raw:
+        return
+    if getattr(instance, "_annotation_rows_stale", False):
+        if instance.annotations_imported:
+            AnalysisAnnotation.objects.sync_for_analysis(instance)
+        else:
+            AnalysisAnnotation.objects.filter(analysis=instance).delete()
+        instance._annotation_rows_stale = False
+    if update_fields is None or "status" in update_fields:
+        instance._annotations_were_imported = instance.annotations_imported
+
+
+@receiver(bulk_saved, sender=Analysis)
+def on_analyses_statuses_set_sync_annotation_rows(sender, pks, statuses=None, **kwargs):
+    """
+    Rebuild (or remove) the AnalysisAnnotation rows of analyses whose ANALYSIS_ANNOTATIONS_IMPORTED status
+    was set (or unset) in bulk, by SelectByStatusQueryset.set_statuses.
+    """
+    imported = (statuses or {}).get(
+        Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED.value
+    )
+    if imported is True:
+        AnalysisAnnotation.objects.sync_for_analyses(
+            Analysis.objects.filter(pk__in=pks).only("pk")
+        )
+    elif imported is False:
+        AnalysisAnnotation.objects.filter(analysis_id__in=pks).delete()
@@ -3,11 +3,12 @@ from __future__ import annotations
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Union, Dict, Any, TypeVar, Generic
+from typing import List, Optional, Union, Dict, Any, TypeVar, Generic, Type
 from urllib.parse import urljoin
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
+from django.db import models
 from ninja import Field, ModelSchema, Schema
 from pydantic import field_validator, BaseModel
 from typing_extensions import Annotated
@@ -16,12 +17,13 @@ import analyses.models
 from analyses.base_models.with_downloads_models import (
     DownloadFile,
     DownloadFileIndexFile,
+    WithDownloadsModel,
 )
+from analyses.base_models.with_status_models import StatusSummary
 from emgapiv2.api.storage import private_storage
 from emgapiv2.enum_utils import FutureStrEnum
 from workflows.data_io_utils.filenames import trailing_slash_ensured_dir
 
-
 logger = logging.getLogger(__name__)
 
 EMG_CONFIG = settings.EMG_CONFIG
@@ -78,6 +80,14 @@ class MGnifyStudyDetail(MGnifyStudy):
         ]
 
 
+class MGnifyStudyStatusSummary(Schema):
+    accession: str = Field(..., examples=["MGYS00000001"])
+    analyses: StatusSummary
+    assemblies: StatusSummary = Field(
+        ..., description="Assemblies of the study's reads"
+    )
+
+
 T = TypeVar("T", bound=str)
 
 
@@ -117,6 +127,38 @@ class MGnifySampleDetail(MGnifySample):
     class Meta(MGnifySample.Meta): ...
 
 
+def _get_download_parent(obj: DownloadFile, model: Type[models.Model]):
+    """
+    The object (e.g. Analysis) a download file belongs to.
+    Uses the parent already loaded by `downloads_as_objects` if there is one, so that resolving
+    the URLs of a whole downloads list does not need a query per file.
+    """
+    parent = getattr(obj, "_parent", None)
+    if isinstance(parent, model):
+        return parent
+    return model.objects.filter(accession=obj.parent_identifier).first()
+
+
+def _get_private_download_link(parent: WithDownloadsModel, path: str) -> str:
+    """
+    Secure link to a download file of a private object.
+    Links for all of the parent's downloads are signed in one batch on first use,
+    and reused when resolving the sibling downloads.
+    """
+    private_path = str(Path(parent.external_results_dir) / path)
+    links = getattr(parent, "_private_download_links", None)
+    if links is None:
+        private_paths = [
+            str(Path(parent.external_results_dir) / dl.get("path"))
+            for dl in parent.downloads
+        ]
+        links = dict(
+            zip(private_paths, private_storage.generate_secure_links(private_paths))
+        )
+        parent._private_download_links = links
+    return links.get(private_path) or private_storage.generate_secure_link(private_path)
+
+
 class MGnifyDownloadFileIndexFile(Schema, DownloadFileIndexFile):
     path: Annotated[str, Field(exclude=True)]
     relative_url: str = Field(
@@ -155,7 +197,7 @@ class MGnifyAnalysisDownloadFile(Schema, DownloadFile):
 
     @staticmethod
     def resolve_url(obj: MGnifyAnalysisDownloadFile):
-        analysis = analyses.models.Analysis.objects.get(accession=obj.parent_identifier)
+        analysis = _get_download_parent(obj, analyses.models.Analysis)
         if not analysis:
             logger.warning(
                 f"No parent Analysis object found with identified {obj.parent_identifier}"
@@ -163,8 +205,7 @@ class MGnifyAnalysisDownloadFile(Schema, DownloadFile):
             return None
 
         if analysis.is_private:
-            private_path = Path(analysis.external_results_dir) / obj.path
-            return private_storage.generate_secure_link(private_path)
+            return _get_private_download_link(analysis, obj.path)
 
         return urljoin(
             EMG_CONFIG.service_urls.transfer_services_url_root,
@@ -182,7 +223,7 @@ class MGnifyStudyDownloadFile(MGnifyAnalysisDownloadFile):
 
     @staticmethod
     def resolve_url(obj: MGnifyStudyDownloadFile):
-        study = analyses.models.Study.objects.get(accession=obj.parent_identifier)
+        study = _get_download_parent(obj, analyses.models.Study)
         if not study:
             logger.warning(
                 f"No parent Study object found with identified {obj.parent_identifier}"
@@ -190,8 +231,7 @@ class MGnifyStudyDownloadFile(MGnifyAnalysisDownloadFile):
             return None
 
         if study.is_private:
-            private_path = Path(study.external_results_dir) / obj.path
-            return private_storage.generate_secure_link(private_path)
+            return _get_private_download_link(study, obj.path)
 
         return f"{EMG_CONFIG.service_urls.transfer_services_url_root.rstrip('/')}/{study.external_results_dir}/{obj.path}"
 
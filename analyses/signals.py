@@ -0,0 +1,24 @@
+from typing import Iterable, Type
+
+from django.db import models
+from django.dispatch import Signal
+
+__all__ = ["bulk_saved", "send_bulk_saved"]
+
+# Sent after objects are written in bulk (e.g. by bulk_create, bulk_update or QuerySet.update),
+# since those send no post_save signals.
+# Receivers are called with sender (the model class) and pks (a list of the primary keys of the objects written).
+# Statuses set by SelectByStatusQueryset.set_statuses are also sent, as statuses (a dict of status key -> new value).
+bulk_saved = Signal()
+
+
+def send_bulk_saved(model: Type[models.Model], objs: Iterable[models.Model]):
+    """
+    Send bulk_saved for some objects of a model that have just been written in bulk.
+    E.g. send_bulk_saved(Run, runs) after Run.objects.bulk_update(runs, [...])
+    """
+    if not bulk_saved.has_listeners(model):
+        return
+    pks = [obj.pk for obj in objs if obj.pk is not None]
+    if pks:
+        bulk_saved.send(sender=model, pks=pks)
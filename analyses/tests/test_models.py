@@ -1,17 +1,28 @@
 import csv
 import os
+import random
 import tempfile
+import time
 
 import pytest
 from django.core.management import call_command
+from django.db import connection
+
+from analyses.base_models.with_downloads_models import (
+    DownloadFile,
+    DownloadFileType,
+    DownloadType,
+)
 
 from analyses.models import (
     Analysis,
+    AnalysisAnnotation,
     Assembler,
     Biome,
     ComputeResourceHeuristic,
     Run,
     Study,
+    biome_tree,
 )
 from ena.models import Study as ENAStudy
 
@@ -91,9 +102,11 @@ def test_biome_hierarchy():
     # pretty lineage is colon separated with capitals and spaces
     assert wet_ferm.pretty_lineage == "root:Engineered:Wet fermentation"
 
-    # if a level of hierarchy is skipped (bioreactor) it is simply missing in pretty version (known limitation)
+    # if a level of hierarchy is skipped (bioreactor) it is simply missing in pretty version
     cont_cult.refresh_from_db()
     assert cont_cult.pretty_lineage == "root:Engineered:Continuous culture"
+    assert cont_cult.depth == 4
+    assert str(cont_cult) == "root:Engineered:Continuous culture"
 
     # ancestors are as expected (self, engineered, root)
     assert cont_cult.ancestors().count() == 3
@@ -107,6 +120,50 @@ def test_biome_hierarchy():
     Biome.objects.create(biome_name="Bioreactor", path="root.engineered.bioreactor")
     assert engineered.children().count() == 2
 
+    # lineages of descendants are kept in sync, including the missing level once it exists
+    cont_cult.refresh_from_db()
+    assert cont_cult.pretty_lineage == "root:Engineered:Bioreactor:Continuous culture"
+    engineered.biome_name = "Built"
+    engineered.save()
+    cont_cult.refresh_from_db()
+    assert cont_cult.pretty_lineage == "root:Built:Bioreactor:Continuous culture"
+    Biome.objects.get(path="root.engineered.bioreactor").delete()
+    cont_cult.refresh_from_db()
+    assert cont_cult.pretty_lineage == "root:Built:Continuous culture"
+
+    # wet fermentation moves, and gets a new lineage and depth
+    wet_ferm.path = "root.wet_fermentation"
+    wet_ferm.save()
+    wet_ferm.refresh_from_db()
+    assert wet_ferm.pretty_lineage == "root:Wet fermentation"
+    assert wet_ferm.depth == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_biome_tree(top_level_biomes, django_assert_num_queries):
+    human = Biome.objects.get(path="root.host_associated.human")
+
+    with django_assert_num_queries(1):
+        assert biome_tree.choices() == {
+            "root": "root",
+            "root.engineered": "root:Engineered",
+            "root.host_associated": "root:Host-Associated",
+            "root.host_associated.human": "root:Host-Associated:Human",
+        }
+        assert [biome.biome_name for biome in biome_tree.ancestors(human)] == [
+            "root",
+            "Host-Associated",
+            "Human",
+        ]
+        assert biome_tree.get("root.engineered").biome_name == "Engineered"
+        assert biome_tree.get("root.nowhere") is None
+
+    # saving a biome discards the snapshot
+    Biome.objects.create(biome_name="Gut", path="root.host_associated.human.gut")
+    assert biome_tree.get("root.host_associated.human.gut").pretty_lineage == (
+        "root:Host-Associated:Human:Gut"
+    )
+
 
 @pytest.mark.django_db(transaction=True)
 def test_study_biome_lookups(top_level_biomes, raw_reads_mgnify_study):
@@ -370,6 +427,98 @@ def test_status_filtering(
     )
 
 
+@pytest.mark.django_db(transaction=True)
+def test_set_statuses(raw_read_analyses, django_assert_num_queries):
+    AnalysisStates = Analysis.AnalysisStates
+    first, *others = raw_read_analyses
+    first.status["an_extra_key"] = True
+    first.status[AnalysisStates.ANALYSIS_FAILED] = True
+    first.save()
+
+    # listing the analyses for the bulk_saved signal (AnalysisAnnotation rows listen to it), and the update
+    with django_assert_num_queries(2):
+        updated = Analysis.objects.filter(
+            pk__in=[analysis.pk for analysis in raw_read_analyses]
+        ).set_statuses(
+            true=[AnalysisStates.ANALYSIS_COMPLETED],
+            false=[AnalysisStates.ANALYSIS_FAILED],
+            reasons={AnalysisStates.ANALYSIS_COMPLETED: "all_results"},
+            reasons_if_was_true={AnalysisStates.ANALYSIS_FAILED: "retried"},
+        )
+    assert updated == len(raw_read_analyses)
+
+    for analysis in raw_read_analyses:
+        analysis.refresh_from_db()
+        assert analysis.status[AnalysisStates.ANALYSIS_COMPLETED]
+        assert not analysis.status[AnalysisStates.ANALYSIS_FAILED]
+        assert (
+            analysis.status[f"{AnalysisStates.ANALYSIS_COMPLETED}_reason"]
+            == "all_results"
+        )
+    # only analyses that had failed say why they no longer have
+    assert first.status[f"{AnalysisStates.ANALYSIS_FAILED}_reason"] == "retried"
+    assert f"{AnalysisStates.ANALYSIS_FAILED}_reason" not in others[0].status
+    # other keys are untouched
+    assert first.status["an_extra_key"]
+    assert first.status[AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+    assert not others[0].status[AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+    assert "an_extra_key" not in others[0].status
+
+    assert Analysis.objects.filter_by_statuses(
+        [AnalysisStates.ANALYSIS_COMPLETED]
+    ).count() == len(raw_read_analyses)
+    assert Analysis.objects.none().set_statuses(true=["an_extra_key"]) == 0
+    assert Analysis.objects.set_statuses() == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_status_summary(raw_read_analyses, django_assert_num_queries):
+    AnalysisStates = Analysis.AnalysisStates
+    completed, started = raw_read_analyses[:2]
+    started.status[AnalysisStates.ANALYSIS_FAILED] = True
+    started.status[AnalysisStates.ANALYSIS_QC_FAILED] = True
+    started.save()
+
+    study_analyses = completed.study.analyses
+    with django_assert_num_queries(1):
+        summary = study_analyses.status_summary(AnalysisStates)
+
+    assert summary.total == study_analyses.count()
+    assert summary.count(AnalysisStates.ANALYSIS_STARTED) == 2
+    assert summary.count(AnalysisStates.ANALYSIS_COMPLETED) == 1
+    assert summary.count("analysis_annotations_imported") == 1
+    assert summary.count(AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED) == 0
+    assert summary.count("not_a_status") == 0
+
+    # an analysis with several failed statuses is counted once
+    failed = [
+        AnalysisStates.ANALYSIS_FAILED,
+        AnalysisStates.ANALYSIS_QC_FAILED,
+        AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
+    ]
+    assert summary.count_any(failed) == 1
+    assert summary.count_all(failed[:2]) == 1
+    assert summary.count_all(failed) == 0
+    assert (
+        summary.count_all(
+            [AnalysisStates.ANALYSIS_STARTED, AnalysisStates.ANALYSIS_COMPLETED]
+        )
+        == 1
+    )
+    assert sum(combination.count for combination in summary.combinations) == (
+        summary.total
+    )
+
+    # chained with other filters
+    assert (
+        study_analyses.filter(pk=completed.pk)
+        .status_summary(AnalysisStates)
+        .count(AnalysisStates.ANALYSIS_STARTED)
+        == 1
+    )
+    assert Analysis.objects.none().status_summary(AnalysisStates).total == 0
+
+
 @pytest.mark.django_db(transaction=True)
 def test_update_or_create_by_accession(raw_reads_mgnify_study):
     ena_study = raw_reads_mgnify_study.ena_study
@@ -446,6 +595,113 @@ def test_update_or_create_by_accession(raw_reads_mgnify_study):
     assert study.results_dir == "/has/been/set"
 
 
+@pytest.mark.django_db(transaction=True)
+def test_resolve_accessions(raw_read_run, django_assert_num_queries):
+    run = raw_read_run[0]
+    run.ena_accessions = ["SRR6180434", "ERR6180434"]
+    run.save()
+
+    with django_assert_num_queries(1):
+        assert Run.objects.get_by_accession("ERR6180434") == run
+    # exact matches only
+    with pytest.raises(Run.DoesNotExist):
+        Run.objects.get_by_accession("SRR618043")
+    with pytest.raises(Run.DoesNotExist):
+        Run.objects.get_by_accession("srr6180434")
+
+    with django_assert_num_queries(1):
+        resolved = Run.objects.resolve_many(
+            ["SRR6180434", "ERR6180434", "SRR6704248", "SRR0"]
+        )
+    assert resolved == {
+        "SRR6180434": run,
+        "ERR6180434": run,
+        "SRR6704248": raw_read_run[2],
+    }
+    with django_assert_num_queries(0):
+        assert Run.objects.resolve_many([]) == {}
+
+    raw_read_run[1].ena_accessions = ["SRR6180435", "ERR6180434"]
+    raw_read_run[1].save()
+    with pytest.raises(Run.MultipleObjectsReturned):
+        Run.objects.get_by_accession("ERR6180434")
+    with pytest.raises(Run.MultipleObjectsReturned):
+        Run.objects.resolve_many(["ERR6180434"])
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_resolve_accessions(raw_read_run):
+    """
+    Compare indexed accession lookups against substring (icontains) and count-exists-first lookups,
+    on a few million synthetic runs.
+    Run with: pytest -m benchmark -s --no-cov -n0 analyses/tests/test_models.py -k resolve_accessions
+    """
+    runs = 2_000_000
+    run = raw_read_run[0]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {Run._meta.db_table} (
+                is_private, is_suppressed, ena_study_id, study_id, sample_id, ena_accessions,
+                experiment_type, metadata, created_at, updated_at
+            )
+            SELECT
+                false, false, %s, %s, %s, ARRAY['ERR' || i, 'SRR' || i]::varchar(20)[],
+                %s, '{{}}'::jsonb, now(), now()
+            FROM generate_series(1000000, 1000000 + %s - 1) AS i
+            """,
+            [
+                run.ena_study_id,
+                run.study_id,
+                run.sample_id,
+                Run.ExperimentTypes.METAGENOMIC,
+                runs,
+            ],
+        )
+        cursor.execute(f"ANALYZE {Run._meta.db_table}")
+
+    random.seed(1)
+    accessions = [
+        f"ERR{i}" for i in random.sample(range(1000000, 1000000 + runs), 5000)
+    ]
+
+    def time_lookups(lookup, lookup_accessions):
+        start = time.perf_counter()
+        found = [lookup(accession) for accession in lookup_accessions]
+        return found, (time.perf_counter() - start) / len(lookup_accessions)
+
+    def old_get_by_accession(accession):
+        qs = Run.objects.filter(ena_accessions__contains=[accession])
+        assert qs.count() == 1 and qs.exists()
+        return qs.first()
+
+    substring, substring_seconds = time_lookups(
+        lambda accession: Run.objects.get(ena_accessions__icontains=accession),
+        accessions[:5],
+    )
+    old, old_seconds = time_lookups(old_get_by_accession, accessions[:200])
+    new, new_seconds = time_lookups(Run.objects.get_by_accession, accessions[:200])
+
+    start = time.perf_counter()
+    resolved = Run.objects.resolve_many(accessions)
+    resolve_many_seconds = (time.perf_counter() - start) / len(accessions)
+
+    print(
+        f"{runs} runs, seconds per accession: "
+        f"icontains {substring_seconds:.5f}s, "
+        f"count-exists-first {old_seconds:.5f}s, "
+        f"get_by_accession {new_seconds:.5f}s, "
+        f"resolve_many {resolve_many_seconds:.6f}s"
+    )
+    assert substring == new[:5]
+    assert old == new
+    assert [resolved[accession] for accession in accessions[:200]] == new
+    assert new_seconds * 100 < substring_seconds
+    assert new_seconds * 2 < old_seconds
+    assert resolve_many_seconds * 10 < new_seconds
+
+
 @pytest.mark.django_db
 def test_inferred_metadata_mixin(raw_read_run):
     run = Run.objects.first()
@@ -467,3 +723,151 @@ def test_inferred_metadata_mixin(raw_read_run):
     assert run.metadata_preferring_inferred["kessel_run"] == "20 parsecs"
     assert run.metadata["kessel_run"] == 20
     assert run.metadata_preferring_inferred["falcon"] == "millenium"
+
+
+@pytest.mark.django_db
+def test_analysis_annotation_rows(raw_read_analyses):
+    analysis: Analysis = raw_read_analyses[0]
+    analysis.annotations = {
+        Analysis.PFAMS: [
+            {"pfam": "PF00005", "count": 10, "description": "ABC transporter"},
+            {"pfam": "PF00005", "count": 2, "description": "ABC transporter"},
+            {"count": 1, "description": "No identifier"},
+        ],
+        Analysis.GO_SLIMS: ["GO:0003824"],
+        Analysis.TAXONOMIES: {
+            Analysis.TaxonomySources.SSU.value: [
+                {"organism": "sk__Bacteria;k__;p__Bacillota", "count": 30}
+            ]
+        },
+        Analysis.FUNCTIONAL_ANNOTATION: {
+            Analysis.FunctionalSources.PFAM.value: {
+                "read_count": [{"function": "PF00001", "read_count": 4}],
+                "coverage_depth": [{"function": "PF00001", "coverage_depth": 0.5}],
+            }
+        },
+    }
+    analysis.save()
+
+    assert AnalysisAnnotation.objects.rows_from_annotations(analysis.annotations) == {
+        (Analysis.PFAMS, "PF00005"): 12,
+        (Analysis.GO_SLIMS, "GO:0003824"): None,
+        (Analysis.TAXONOMIES_SSU, "sk__Bacteria;k__;p__Bacillota"): 30,
+        (Analysis.FUNCTIONAL_PFAM, "PF00001"): 4,
+    }
+
+    # rows are (re)built when annotations are marked as imported
+    analysis.mark_status(Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED)
+    assert analysis.annotation_rows.count() == 4
+    assert (
+        Analysis.objects.filter(
+            annotation_rows__identifier="PF00005",
+            annotation_rows__annotation_type=Analysis.PFAMS,
+        ).get()
+        == analysis
+    )
+
+    # and whenever changed annotations of an imported analysis are saved by name
+    analysis.annotations[Analysis.PFAMS] = []
+    analysis.save(update_fields=["annotations"])
+    assert analysis.annotation_rows.count() == 3
+    reloaded = Analysis.objects_and_annotations.get(pk=analysis.pk)
+    reloaded.annotations[Analysis.GO_SLIMS] = ["GO:0003824", "GO:0008150"]
+    reloaded.save(update_fields=["annotations", "status"])
+    assert analysis.annotation_rows.count() == 4
+
+    # but a full save does not compare (nor ship) the annotations blob
+    reloaded.annotations[Analysis.GO_SLIMS] = ["GO:0003824"]
+    reloaded.save()
+    assert analysis.annotation_rows.count() == 4
+    reloaded.annotations[Analysis.GO_SLIMS] = []
+    reloaded.save(update_fields=["annotations"])
+    assert analysis.annotation_rows.count() == 2
+
+    analysis.mark_status(
+        Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED, set_status_as=False
+    )
+    assert analysis.annotation_rows.count() == 0
+
+    # or when the imported status is set in bulk
+    Analysis.objects.filter(pk=analysis.pk).set_statuses(
+        true=[Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+    )
+    assert analysis.annotation_rows.count() == 3
+    Analysis.objects.filter(pk=analysis.pk).set_statuses(
+        false=[Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+    )
+    assert analysis.annotation_rows.count() == 0
+
+    # backfill
+    analysis.mark_status(Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED)
+    AnalysisAnnotation.objects.all().delete()
+    call_command("sync_analysis_annotations", "--missing-only")
+    assert analysis.annotation_rows.count() == 3
+
+    # several analyses at once
+    AnalysisAnnotation.objects.sync_for_analyses(raw_read_analyses, batch_size=1)
+    assert analysis.annotation_rows.count() == 3
+    assert AnalysisAnnotation.objects.filter(
+        analysis__in=raw_read_analyses[1:]
+    ).count() == sum(
+        len(AnalysisAnnotation.objects.rows_from_annotations(other.annotations))
+        for other in Analysis.objects_and_annotations.filter(
+            pk__in=[a.pk for a in raw_read_analyses[1:]]
+        )
+    )
+
+
+@pytest.mark.django_db
+def test_add_downloads_saved_once(
+    raw_read_analyses, django_assert_num_queries, django_assert_max_num_queries
+):
+    analysis = raw_read_analyses[0]
+    analysis.downloads = []
+    analysis.save()
+
+    def download(alias):
+        return DownloadFile(
+            path=f"taxonomy-summary/{alias}",
+            alias=alias,
+            download_type=DownloadType.TAXONOMIC_ANALYSIS,
+            file_type=DownloadFileType.TSV,
+            short_description="Tax. assignments",
+            long_description="A table of taxonomic assignments",
+        )
+
+    # not saved at all
+    with django_assert_num_queries(0):
+        analysis.add_download(download("a.tsv"), save=False)
+
+    # saved once, for all downloads
+    with django_assert_max_num_queries(1):
+        analysis.add_downloads([download("b.tsv"), download("c.tsv")])
+    analysis.refresh_from_db()
+    assert [dl["alias"] for dl in analysis.downloads] == ["a.tsv", "b.tsv", "c.tsv"]
+
+    # nothing is added if any download is invalid
+    with pytest.raises(FileExistsError):
+        analysis.add_downloads([download("d.tsv"), download("d.tsv")])
+    with pytest.raises(FileExistsError):
+        analysis.add_downloads([download("d.tsv"), download("a.tsv")])
+    bad_group = download("d.tsv")
+    bad_group.download_group = "not.an.allowed.group"
+    with pytest.raises(ValueError):
+        analysis.add_downloads([download("e.tsv"), bad_group])
+    assert [dl["alias"] for dl in analysis.downloads] == ["a.tsv", "b.tsv", "c.tsv"]
+    analysis.refresh_from_db()
+
+    with django_assert_max_num_queries(1):
+        with analysis.downloads_saved_once():
+            analysis.add_download(download("d.tsv"))
+            analysis.add_download(download("e.tsv"))
+    analysis.refresh_from_db()
+    assert len(analysis.downloads) == 5
+
+    # just the downloads are saved, not other unsaved changes
+    analysis.annotations = {"not": "saved"}
+    analysis.add_download(download("f.tsv"))
+    analysis.refresh_from_db()
+    assert len(analysis.downloads) == 6
+    assert analysis.annotations != {"not": "saved"}
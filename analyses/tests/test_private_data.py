@@ -114,3 +114,37 @@ def test_public_vs_private_study_urls(
     query_params = parse_qs(parsed_url.query)
     assert "token" in query_params
     assert "expires" in query_params
+
+
+@pytest.mark.django_db
+def test_download_urls_resolved_from_loaded_parent(
+    private_analysis_with_download, django_assert_num_queries
+):
+    """Test that download URLs are built from the already-loaded parent, without re-fetching it."""
+    private_analysis_with_download.add_download(
+        DownloadFile(
+            download_type=DownloadType.SEQUENCE_DATA,
+            file_type=DownloadFileType.FASTA,
+            alias=f"{private_analysis_with_download.accession}_more_sequences.fasta",
+            short_description="More private analysis sequences",
+            long_description="More sequence data for private analysis",
+            path="private_analysis_more_sequences.fasta",
+            download_group="all.sequence_data.private",
+        )
+    )
+    downloads = private_analysis_with_download.downloads_as_objects
+
+    with django_assert_num_queries(0):
+        urls = [MGnifyAnalysisDownloadFile.resolve_url(dl) for dl in downloads]
+
+    assert len(urls) == 2
+    assert urls[0] != urls[1]
+    for url, download in zip(urls, downloads):
+        parsed_url = urlparse(url)
+        assert parsed_url.path.endswith(download.path)
+        query_params = parse_qs(parsed_url.query)
+        assert "token" in query_params
+        assert "expires" in query_params
+
+    # links signed in one batch share their expiry
+    assert len({parse_qs(urlparse(url).query)["expires"][0] for url in urls}) == 1
@@ -8,6 +8,7 @@ from prefect.testing.utilities import prefect_test_harness
 
 django.setup()
 
+from analyses.models import biome_tree
 from emgapiv2.api import api
 from django.db import connections
 
@@ -71,6 +72,14 @@ def django_db_modify_db_settings_for_xdist():
             db_settings["NAME"] = f"{db_settings['NAME']}_{worker_id}"
 
 
+@pytest.fixture(scope="function", autouse=True)
+def fresh_biome_tree():
+    # test transactions are rolled back without the biome tree snapshot knowing
+    biome_tree.invalidate()
+    yield
+    biome_tree.invalidate()
+
+
 @pytest.fixture(scope="function", autouse=True)
 def user(django_user_model):
     return django_user_model.objects.create_user(
@@ -1,6 +1,11 @@
+from typing import Optional
+
+from django.db.models import Q
+from ninja import FilterSchema, Query
 from ninja_extra import api_controller, http_get
 from ninja_extra.pagination import paginate
 from ninja_extra.schemas import NinjaPaginationResponseSchema
+from pydantic import Field
 
 import analyses.models
 from analyses.schemas import (
@@ -11,6 +16,11 @@ from analyses.schemas import (
 )
 from emgapiv2.api import perms
 from emgapiv2.api.auth import WebinJWTAuth, NoAuth, DjangoSuperUserAuth
+from emgapiv2.api.pagination import (
+    JSONArraySlicer,
+    CursorPaginationResponseSchema,
+    PageNumberOrCursorPagination,
+)
 from emgapiv2.api.perms import UnauthorisedIsUnfoundController
 from emgapiv2.api.schema_utils import (
     make_links_section,
@@ -19,6 +29,35 @@ from emgapiv2.api.schema_utils import (
 )
 
 
+class AnalysisListFilters(FilterSchema):
+    has_annotation: Optional[str] = Field(
+        None,
+        description="If set, will only show analyses with this annotation, e.g. a Pfam accession",
+        examples=["PF00005"],
+    )
+    annotation_type: Optional[str] = Field(
+        None,
+        description="If set with `has_annotation`, only match annotations of this type",
+        examples=["pfams", "taxonomies__ssu"],
+    )
+
+    def filter_has_annotation(self, identifier: str | None) -> Q:
+        if not identifier:
+            return Q()
+        matching_annotations = analyses.models.AnalysisAnnotation.objects.filter(
+            identifier=identifier
+        )
+        if self.annotation_type:
+            matching_annotations = matching_annotations.filter(
+                annotation_type=self.annotation_type
+            )
+        return Q(id__in=matching_annotations.values("analysis_id"))
+
+    def filter_annotation_type(self, annotation_type: str | None) -> Q:
+        # only meaningful in combination with has_annotation
+        return Q()
+
+
 @api_controller("analyses", tags=[ApiSections.ANALYSES])
 class AnalysisController(UnauthorisedIsUnfoundController):
     @http_get(
@@ -51,17 +90,18 @@ class AnalysisController(UnauthorisedIsUnfoundController):
 
     @http_get(
         "/",
-        response=NinjaPaginationResponseSchema[MGnifyAnalysisDetail],
+        response=CursorPaginationResponseSchema[MGnifyAnalysisDetail],
         summary="List all analyses (MGYAs) available from MGnify",
         description="Each analysis is the result of a Pipeline execution on a reads dataset "
         "(either a raw read-run, or an assembly).",
         operation_id="list_mgnify_analyses",
     )
-    @paginate
-    def list_mgnify_analyses(self):
+    @paginate(PageNumberOrCursorPagination)
+    def list_mgnify_analyses(self, filters: AnalysisListFilters = Query(...)):
         qs = analyses.models.Analysis.public_objects.select_related(
             "study", "sample", "run", "assembly"
         )
+        qs = filters.filter(qs)
         return qs
 
     @http_get(
@@ -99,13 +139,9 @@ class AnalysisController(UnauthorisedIsUnfoundController):
         accession: str,
         annotation_type: MGnifyFunctionalAnalysisAnnotationType,
     ):
-        # TODO: this involves a duplicate DB query, can probably be a single query that is then perm checked
-        self.get_object_or_exception(
-            analyses.models.Analysis.objects, accession=accession
-        )
-        annotations = (
-            analyses.models.Analysis.objects.filter(accession=accession)
-            .values_list(f"annotations__{annotation_type.value}", flat=True)
-            .first()
+        return JSONArraySlicer(
+            analyses.models.Analysis.objects.filter(accession=accession),
+            json_field="annotations",
+            json_path=annotation_type.value.split("__"),
+            get_object=self.get_object_or_exception,
         )
-        return annotations or []  # None -> []
@@ -0,0 +1,276 @@
+import hashlib
+import logging
+import re
+import uuid
+from typing import Callable, Iterable, List, Optional, Pattern, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpRequest, HttpResponse
+
+import analyses.models
+from analyses.signals import bulk_saved
+from emgapiv2.api.auth import WebinJWTAuth
+
+__all__ = [
+    "APIResponseCacheMiddleware",
+    "auth_identity",
+    "cache_tags_for_path",
+    "invalidate_cached_responses",
+]
+
+logger = logging.getLogger(__name__)
+
+API_RESPONSE_CACHE = "api_responses"
+CACHE_STATUS_HEADER = "X-EMG-Cache"
+
+STUDIES = "studies"
+ANALYSES = "analyses"
+SAMPLES = "samples"
+
+
+def _list_tag(kind: str) -> str:
+    return f"list:{kind}"
+
+
+def _object_tag(kind: str, accession: str) -> str:
+    return f"{kind}:{accession}"
+
+
+# GET routes (relative to the API root) whose responses are cached, and the tags of the data each response shows.
+# A cached response is discarded as soon as any of its tags is invalidated.
+_CACHED_ROUTES: List[Tuple[Pattern, Callable[[re.Match], List[str]]]] = [
+    (re.compile(r"^studies/$"), lambda match: [_list_tag(STUDIES)]),
+    (
+        re.compile(r"^studies/(?P<accession>[^/]+)(/analyses/)?$"),
+        lambda match: [_object_tag(STUDIES, match["accession"])],
+    ),
+    (re.compile(r"^analyses/$"), lambda match: [_list_tag(ANALYSES)]),
+    (
+        re.compile(r"^analyses/(?P<accession>[^/]+)(/annotations(/[^/]+)?)?$"),
+        lambda match: [_object_tag(ANALYSES, match["accession"])],
+    ),
+    (re.compile(r"^samples/$"), lambda match: [_list_tag(SAMPLES)]),
+    (
+        re.compile(r"^samples/(?P<accession>[^/]+)$"),
+        lambda match: [_object_tag(SAMPLES, match["accession"])],
+    ),
+]
+
+
+def cache_tags_for_path(path: str) -> Optional[List[str]]:
+    """
+    The tags of a (full) request path, if responses to it are cached.
+    E.g. "/studies/MGYS00000001" -> ["studies:MGYS00000001"]
+    """
+    api_root = f"/{settings.BASE_URL}"
+    if not path.startswith(api_root):
+        return None
+    relative_path = path[len(api_root) :]
+    for pattern, tags_for_match in _CACHED_ROUTES:
+        if match := pattern.match(relative_path):
+            return tags_for_match(match)
+    return None
+
+
+def auth_identity(request: HttpRequest) -> Optional[str]:
+    """
+    Who a request is authenticated as, so that cached responses are only ever served to the same identity.
+    E.g. "webin:Webin-123", "user:1" (a Django session user, e.g. an admin), or "anonymous".
+    :return: The identity, or None if it cannot be determined safely here (e.g. the token is invalid or expired),
+        in which case the response must not be cached.
+    """
+    if authorization := request.headers.get("Authorization"):
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+        jwt_auth = WebinJWTAuth()
+        try:
+            # (not jwt_auth(request), which has side effects on request.user)
+            user = jwt_auth.get_user(jwt_auth.get_validated_token(token))
+            return f"webin:{user.id}" if user else None
+        except Exception:
+            return None
+
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    return "anonymous"
+
+
+def _tag_key(tag: str) -> str:
+    return f"api-tag:{tag}"
+
+
+def _tag_versions(tags: List[str]) -> List[str]:
+    cache = caches[API_RESPONSE_CACHE]
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in set(keys) - set(versions):
+        # a new (or evicted) tag gets a unique version, so entries made under an older version are never reused
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def invalidate_cached_responses(tags: Iterable[str]):
+    """
+    Discard every cached response with any of these tags (by giving the tags new versions).
+    """
+    if not settings.EMG_CONFIG.api_response_cache.enabled:
+        return
+    tags = set(tags)
+    if not tags:
+        return
+    logger.debug(f"Invalidating cached API responses tagged {tags}")
+    caches[API_RESPONSE_CACHE].set_many(
+        {_tag_key(tag): uuid.uuid4().hex for tag in tags}, timeout=None
+    )
+
+
+def _response_key(request: HttpRequest, identity: str, tags: List[str]) -> str:
+    query = sorted(request.GET.lists())
+    key_parts = [request.path, repr(query), identity, *tags, *_tag_versions(tags)]
+    return "api-response:" + hashlib.sha256("\n".join(key_parts).encode()).hexdigest()
+
+
+class APIResponseCacheMiddleware:
+    """
+    Caches the (JSON) responses of GET requests to the public API endpoints, for each auth identity.
+    Must come after AuthenticationMiddleware, so that Django session users are known.
+
+    Only successful responses are cached. A response is served from the cache until the data it shows changes
+    (see the receivers below), or EMG_CONFIG.api_response_cache.timeout_seconds passes.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if (
+            not settings.EMG_CONFIG.api_response_cache.enabled
+            or request.method != "GET"
+        ):
+            return self.get_response(request)
+
+        tags = cache_tags_for_path(request.path_info)
+        identity = auth_identity(request) if tags else None
+        if identity is None:
+            return self.get_response(request)
+
+        cache = caches[API_RESPONSE_CACHE]
+        key = _response_key(request, identity, tags)
+        if cached := cache.get(key):
+            content_type, content = cached
+            response = HttpResponse(content, content_type=content_type)
+            response[CACHE_STATUS_HEADER] = "HIT"
+            return response
+
+        response = self.get_response(request)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(
+                key,
+                (response["Content-Type"], response.content),
+                timeout=settings.EMG_CONFIG.api_response_cache.timeout_seconds,
+            )
+            response[CACHE_STATUS_HEADER] = "MISS"
+        return response
+
+
+# Invalidation.
+# Each change invalidates the tags of every cached response that could show the changed object,
+# e.g. a changed run is shown in the detail of its analyses, and in its study's list of analyses.
+
+
+def _tags_for_analyses(analyses_qs: QuerySet) -> Set[str]:
+    tags = {_list_tag(ANALYSES)}
+    for accession, study_accession in analyses_qs.values_list(
+        "accession", "study__accession"
+    ):
+        tags.add(_object_tag(ANALYSES, accession))
+        tags.add(_object_tag(STUDIES, study_accession))
+    return tags
+
+
+def _tags_for_samples(samples_qs: QuerySet) -> Set[str]:
+    tags = {_list_tag(SAMPLES)}
+    for ena_accessions in samples_qs.values_list("ena_accessions", flat=True):
+        tags.update(_object_tag(SAMPLES, accession) for accession in ena_accessions)
+    return tags
+
+
+def _tags_for_saved(model, pks: List) -> Set[str]:
+    if model is analyses.models.Analysis:
+        return _tags_for_analyses(model.objects.filter(pk__in=pks))
+    if model is analyses.models.Run:
+        return _tags_for_analyses(
+            analyses.models.Analysis.objects.filter(run_id__in=pks)
+        )
+    if model is analyses.models.Sample:
+        return _tags_for_samples(model.objects.filter(pk__in=pks)) | _tags_for_analyses(
+            analyses.models.Analysis.objects.filter(sample_id__in=pks)
+        )
+    if model is analyses.models.Study:
+        tags = {_list_tag(STUDIES)}
+        tags.update(
+            _object_tag(STUDIES, accession)
+            for accession in model.objects.filter(pk__in=pks).values_list(
+                "accession", flat=True
+            )
+        )
+        # sample details show their studies
+        return tags | _tags_for_samples(
+            analyses.models.Sample.objects.filter(studies__in=pks)
+        )
+    return set()
+
+
+def _tags_for_deleted(instance) -> List[str]:
+    # related objects are already gone, but those deleted with this one (by cascade) send their own signals
+    if isinstance(instance, analyses.models.Analysis):
+        return [
+            _list_tag(ANALYSES),
+            _object_tag(ANALYSES, instance.accession),
+            _object_tag(STUDIES, instance.study.accession),
+        ]
+    if isinstance(instance, analyses.models.Run):
+        return [_list_tag(ANALYSES)]
+    if isinstance(instance, analyses.models.Sample):
+        return [_list_tag(SAMPLES)] + [
+            _object_tag(SAMPLES, accession) for accession in instance.ena_accessions
+        ]
+    if isinstance(instance, analyses.models.Study):
+        return [_list_tag(STUDIES), _object_tag(STUDIES, instance.accession)]
+    return []
+
+
+def on_saved_invalidate_cached_responses(sender, instance, **kwargs):
+    if not settings.EMG_CONFIG.api_response_cache.enabled:
+        return
+    if sender is analyses.models.Analysis:
+        # an analysis is shown only by itself (and lists), so no query is needed
+        invalidate_cached_responses(_tags_for_deleted(instance))
+    else:
+        invalidate_cached_responses(_tags_for_saved(sender, [instance.pk]))
+
+
+def on_bulk_saved_invalidate_cached_responses(sender, pks, **kwargs):
+    if settings.EMG_CONFIG.api_response_cache.enabled:
+        invalidate_cached_responses(_tags_for_saved(sender, pks))
+
+
+def on_deleted_invalidate_cached_responses(sender, instance, **kwargs):
+    invalidate_cached_responses(_tags_for_deleted(instance))
+
+
+for _model in [
+    analyses.models.Analysis,
+    analyses.models.Run,
+    analyses.models.Sample,
+    analyses.models.Study,
+]:
+    post_save.connect(on_saved_invalidate_cached_responses, sender=_model)
+    bulk_saved.connect(on_bulk_saved_invalidate_cached_responses, sender=_model)
+    post_delete.connect(on_deleted_invalidate_cached_responses, sender=_model)
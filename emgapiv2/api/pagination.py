@@ -0,0 +1,303 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Generic, List, Optional, Sequence, TypeVar
+
+from django.db import connection, models
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+from ninja import Field, Schema
+from ninja.pagination import PageNumberPagination
+from ninja_extra.exceptions import ParseError
+from pydantic import field_validator
+
+from emgapiv2.enum_utils import FutureStrEnum
+
+T = TypeVar("T")
+
+
+class JSONArraySlicer:
+    """
+    A lazy, sliceable stand-in for a JSON array stored in a jsonb field of a single object.
+    Intended to be returned from `@paginate` endpoints instead of the (possibly huge) list itself.
+
+    Slicing pushes the offset/limit down into Postgres, so only one page of the array leaves the DB.
+    The object itself (e.g. for permission checks) and the total length of the array are fetched
+    in that same query, so the cost of a page depends on the page size rather than the array size.
+
+    e.g.
+        return JSONArraySlicer(
+            Analysis.objects.filter(accession="MGYA1"),
+            json_field="annotations",
+            json_path=["taxonomies", "ssu"],
+            get_object=self.get_object_or_exception,
+        )
+    """
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        json_field: str,
+        json_path: Optional[List[str]] = None,
+        get_object: Optional[Callable[[QuerySet], models.Model]] = None,
+    ):
+        """
+        :param queryset: Queryset that should match exactly one object.
+        :param json_field: Name of the jsonb model field containing the array (or containing an object that contains it).
+        :param json_path: Keys to follow within the json_field to reach the array, e.g. ["taxonomies", "ssu"].
+        :param get_object: Callable to fetch the object from the (annotated) queryset, e.g. a controller's
+            get_object_or_exception so that permissions are checked. Defaults to queryset.get().
+        """
+        self.queryset = queryset
+        self.json_field = json_field
+        self.json_path = list(json_path or [])
+        self.get_object = get_object or (lambda qs: qs.get())
+        self._count: Optional[int] = None
+
+    def _array_sql(self) -> str:
+        model = self.queryset.model
+        column = model._meta.get_field(self.json_field).column
+        qn = connection.ops.quote_name
+        return f"{qn(model._meta.db_table)}.{qn(column)} #> %s::text[]"
+
+    def _fetch(self, offset: int = 0, limit: Optional[int] = 0) -> List[Any]:
+        """
+        Fetch the object, the array length, and up to `limit` array elements from `offset`, in one query.
+        limit=None means all elements from offset onwards.
+        """
+        array = self._array_sql()
+        queryset = self.queryset.annotate(
+            _json_array_length=RawSQL(
+                f"CASE WHEN jsonb_typeof({array}) = 'array' THEN jsonb_array_length({array}) ELSE 0 END",
+                (self.json_path, self.json_path),
+                output_field=models.IntegerField(),
+            )
+        )
+        if limit != 0:
+            last_position_condition = "AND position <= %s" if limit is not None else ""
+            last_position_params = (offset + limit,) if limit is not None else ()
+            queryset = queryset.annotate(
+                _json_array_page=RawSQL(
+                    f"""
+                    CASE WHEN jsonb_typeof({array}) = 'array' THEN (
+                        SELECT coalesce(jsonb_agg(element ORDER BY position), '[]'::jsonb)
+                        FROM jsonb_array_elements({array}) WITH ORDINALITY AS page(element, position)
+                        WHERE position > %s {last_position_condition}
+                    ) ELSE '[]'::jsonb END
+                    """,
+                    (self.json_path, self.json_path, offset, *last_position_params),
+                    output_field=models.JSONField(),
+                )
+            )
+
+        obj = self.get_object(queryset)
+        self._count = obj._json_array_length
+        return getattr(obj, "_json_array_page", [])
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            if key < 0:
+                key += self.count()
+            page = self._fetch(offset=key, limit=1)
+            if not page:
+                raise IndexError("JSON array index out of range")
+            return page[0]
+
+        if not isinstance(key, slice) or key.step not in [None, 1]:
+            raise TypeError(
+                "JSONArraySlicer only supports integer indexes and simple slices"
+            )
+        if (key.start or 0) < 0 or (key.stop or 0) < 0:
+            raise ValueError("JSONArraySlicer does not support negative slicing")
+
+        offset = key.start or 0
+        limit = None if key.stop is None else max(key.stop - offset, 0)
+        if limit == 0:
+            self.count()
+            return []
+        return self._fetch(offset=offset, limit=limit)
+
+    def count(self) -> int:
+        if self._count is None:
+            self._fetch(limit=0)
+        return self._count
+
+    def all(self) -> "JSONArraySlicer":
+        # paginators call queryset.all().count() to distinguish querysets from lists
+        return self
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class CountMode(FutureStrEnum):
+    EXACT = "exact"
+    APPROXIMATE = "approximate"
+    NONE = "none"
+
+
+class CursorPaginationResponseSchema(Schema, Generic[T]):
+    count: Optional[int] = Field(
+        None,
+        description="Total number of items. Approximate or absent if requested via `count`.",
+    )
+    items: List[T]
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the next page, when using cursor pagination."
+    )
+    previous_cursor: Optional[str] = Field(
+        None, description="Cursor for the previous page, when using cursor pagination."
+    )
+
+    @field_validator("items", mode="before")
+    def validate_items(cls, value: Any) -> Any:
+        if value is not None and not isinstance(value, list):
+            value = list(value)
+        return value
+
+
+def approximate_count(queryset: QuerySet) -> int:
+    """
+    Estimate the number of rows in a queryset without counting them.
+    Unfiltered querysets use the table's row estimate from pg_class.reltuples,
+    filtered ones use the query planner's row estimate.
+    """
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            # reltuples is -1 if the table has never been vacuumed/analyzed
+            return row[0]
+
+    plan = json.loads(queryset.explain(format="json"))
+    if isinstance(plan, list):
+        plan = plan[0]
+    return int(plan["Plan"]["Plan Rows"])
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Page-number pagination (as used elsewhere in the API), with opt-in keyset (cursor) pagination.
+
+    Passing `cursor` (empty, to start from the beginning) switches to keyset pagination:
+    items are ordered by the `keyset` fields, and each page is fetched with a WHERE on those fields
+    rather than an OFFSET, so every page costs the same however deep into the list it is.
+    The opaque `next_cursor`/`previous_cursor` of each response fetch the adjacent pages.
+    Any ordering applied to the queryset by the endpoint is replaced by the keyset ordering.
+
+    Counting every matching row can dominate the cost of a page, so `count` may be
+    `exact`, `approximate` or `none`. Page-number pagination defaults to exact counts,
+    and cursor pagination to approximate ones.
+
+    E.g.
+        @paginate(PageNumberOrCursorPagination, keyset=("updated_at", "id"))
+    """
+
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    class Input(PageNumberPagination.Input):
+        cursor: Optional[str] = Field(
+            None,
+            description="Use cursor pagination: empty to start from the first page, "
+            "or the `next_cursor`/`previous_cursor` of a previous response.",
+        )
+        count: Optional[CountMode] = Field(
+            None,
+            description="How to count the total number of items. "
+            "Defaults to `exact` for page-number pagination and `approximate` for cursor pagination.",
+        )
+
+    def __init__(self, keyset: Sequence[str] = ("id",), **kwargs: Any) -> None:
+        self.keyset = list(keyset)
+        super().__init__(**kwargs)
+
+    def paginate_queryset(
+        self,
+        queryset: QuerySet,
+        pagination: Input,
+        **params: Any,
+    ) -> Any:
+        page_size = self._get_page_size(pagination.page_size)
+
+        if pagination.cursor is None:
+            offset = (pagination.page - 1) * page_size
+            return {
+                "items": queryset[offset : offset + page_size],
+                "count": self._get_count(queryset, pagination.count or CountMode.EXACT),
+            }
+
+        direction, key_values = self._decode_cursor(pagination.cursor)
+        page_queryset = queryset.order_by(
+            *(self.keyset if direction == self.NEXT else [f"-{f}" for f in self.keyset])
+        )
+        if key_values is not None:
+            page_queryset = page_queryset.filter(
+                self._keyset_filter(key_values, after=direction == self.NEXT)
+            )
+
+        items = list(page_queryset[: page_size + 1])
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if direction == self.PREVIOUS:
+            items.reverse()
+
+        next_cursor = previous_cursor = None
+        if items:
+            if has_more or direction == self.PREVIOUS:
+                next_cursor = self._encode_cursor(self.NEXT, items[-1])
+            if (has_more and direction == self.PREVIOUS) or (
+                direction == self.NEXT and key_values is not None
+            ):
+                previous_cursor = self._encode_cursor(self.PREVIOUS, items[0])
+
+        return {
+            "items": items,
+            "count": self._get_count(
+                queryset, pagination.count or CountMode.APPROXIMATE
+            ),
+            "next_cursor": next_cursor,
+            "previous_cursor": previous_cursor,
+        }
+
+    def _get_count(self, queryset: QuerySet, count_mode: CountMode) -> Optional[int]:
+        if count_mode == CountMode.NONE:
+            return None
+        if count_mode == CountMode.APPROXIMATE:
+            return approximate_count(queryset)
+        return self._items_count(queryset)
+
+    def _keyset_filter(self, key_values: List[Any], after: bool) -> Q:
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+        lookup = "gt" if after else "lt"
+        keyset_filter = Q()
+        for i, field in enumerate(self.keyset):
+            equal_so_far = {f: v for f, v in zip(self.keyset[:i], key_values[:i])}
+            keyset_filter |= Q(**equal_so_far, **{f"{field}__{lookup}": key_values[i]})
+        return keyset_filter
+
+    def _encode_cursor(self, direction: str, item: models.Model) -> str:
+        key_values = [getattr(item, field) for field in self.keyset]
+        cursor = json.dumps({"d": direction, "k": key_values}, default=str)
+        return base64.urlsafe_b64encode(cursor.encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> tuple[str, Optional[List[Any]]]:
+        if not cursor:
+            return self.NEXT, None
+        try:
+            decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            direction, key_values = decoded["d"], decoded["k"]
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ParseError("Invalid cursor")
+        if direction not in [self.NEXT, self.PREVIOUS] or not (
+            isinstance(key_values, list) and len(key_values) == len(self.keyset)
+        ):
+            raise ParseError("Invalid cursor")
+        return direction, key_values
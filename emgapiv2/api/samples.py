@@ -1,11 +1,14 @@
 from ninja_extra import api_controller, http_get, paginate
 from ninja_extra.exceptions import NotFound
-from ninja_extra.schemas import NinjaPaginationResponseSchema
 
 import analyses.models
 from analyses.schemas import MGnifySample, MGnifySampleDetail
 from emgapiv2.api import perms
 from emgapiv2.api.auth import WebinJWTAuth, NoAuth, DjangoSuperUserAuth
+from emgapiv2.api.pagination import (
+    CursorPaginationResponseSchema,
+    PageNumberOrCursorPagination,
+)
 from emgapiv2.api.perms import UnauthorisedIsUnfoundController
 from emgapiv2.api.schema_utils import (
     make_links_section,
@@ -50,12 +53,12 @@ class SampleController(UnauthorisedIsUnfoundController):
 
     @http_get(
         "/",
-        response=NinjaPaginationResponseSchema[MGnifySample],
+        response=CursorPaginationResponseSchema[MGnifySample],
         summary="List all samples analysed by MGnify",
         description="MGnify samples inherit directly from samples (or BioSamples) in ENA.",
         operation_id="list_mgnify_samples",
     )
-    @paginate()
+    @paginate(PageNumberOrCursorPagination)
     def list_mgnify_samples(self):
         qs = analyses.models.Sample.public_objects.all().prefetch_related("studies")
         return qs
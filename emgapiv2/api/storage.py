@@ -6,6 +6,7 @@ import hmac
 import hashlib
 from urllib.parse import urlencode, urljoin
 from time import time
+from typing import Iterable, List
 
 
 class SecureStorage:
@@ -13,16 +14,26 @@ class SecureStorage:
         self.base_url = base_url
 
     def generate_secure_link(self, path: str | Path, expiry_seconds: int = 3600) -> str:
-        secret = settings.SECURE_LINK_SECRET_KEY
-
-        _path = str(path)
+        return self.generate_secure_links([path], expiry_seconds)[0]
+
+    def generate_secure_links(
+        self, paths: Iterable[str | Path], expiry_seconds: int = 3600
+    ) -> List[str]:
+        """
+        Sign many paths at once, e.g. for every download file of an object.
+        All links share a single expiry time and HMAC key.
+        """
+        secret = settings.SECURE_LINK_SECRET_KEY.encode()
         expires = str(int(time()) + expiry_seconds)
-        message = _path + expires
-        signature = hmac.new(
-            secret.encode(), message.encode(), hashlib.sha256
-        ).hexdigest()
-        query = urlencode({"expires": expires, "token": signature})
-        return urljoin(self.base_url, _path) + "?" + query
+
+        links = []
+        for path in paths:
+            _path = str(path)
+            message = _path + expires
+            signature = hmac.new(secret, message.encode(), hashlib.sha256).hexdigest()
+            query = urlencode({"expires": expires, "token": signature})
+            links.append(urljoin(self.base_url, _path) + "?" + query)
+        return links
 
 
 private_storage = SecureStorage(settings.EMG_CONFIG.service_urls.private_data_url_root)
@@ -10,11 +10,16 @@ import analyses.models
 from analyses.schemas import (
     MGnifyStudyDetail,
     MGnifyStudy,
+    MGnifyStudyStatusSummary,
     MGnifyAnalysis,
     OrderByFilter,
 )
 from emgapiv2.api import perms
 from emgapiv2.api.auth import WebinJWTAuth, DjangoSuperUserAuth, NoAuth
+from emgapiv2.api.pagination import (
+    CursorPaginationResponseSchema,
+    PageNumberOrCursorPagination,
+)
 from emgapiv2.api.perms import UnauthorisedIsUnfoundController
 from emgapiv2.api.schema_utils import (
     make_links_section,
@@ -22,6 +27,7 @@ from emgapiv2.api.schema_utils import (
     BiomeFilter,
     ApiSections,
 )
+from emgapiv2.model_utils import with_trusted_json_reads
 
 
 class StudyListFilters(BiomeFilter):
@@ -58,17 +64,42 @@ class StudyController(UnauthorisedIsUnfoundController):
     )
     def get_mgnify_study(self, accession: str):
         return self.get_object_or_exception(
+            analyses.models.Study.objects.select_related("biome"), accession=accession
+        )
+
+    @http_get(
+        "/{accession}/status-summary",
+        response=MGnifyStudyStatusSummary,
+        summary="Count a study's analyses and assemblies by status",
+        description="For internal monitoring of a study's progress. "
+        "Each status is counted in a single query, however many analyses the study has.",
+        operation_id="get_mgnify_study_status_summary",
+        include_in_schema=False,
+        auth=[WebinJWTAuth(), DjangoSuperUserAuth()],
+        permissions=[perms.IsWebinOwner | perms.IsAdminUserWithObjectPerms],
+    )
+    def get_mgnify_study_status_summary(self, accession: str):
+        study = self.get_object_or_exception(
             analyses.models.Study.objects, accession=accession
         )
+        return MGnifyStudyStatusSummary(
+            accession=study.accession,
+            analyses=study.analyses.status_summary(
+                analyses.models.Analysis.AnalysisStates
+            ),
+            assemblies=study.assemblies_reads.status_summary(
+                analyses.models.Assembly.AssemblyStates
+            ),
+        )
 
     @http_get(
         "/",
-        response=NinjaPaginationResponseSchema[MGnifyStudy],
+        response=CursorPaginationResponseSchema[MGnifyStudy],
         summary="List all studies analysed by MGnify",
         description="MGnify studies inherit directly from studies (or projects) in ENA.",
         operation_id="list_mgnify_studies",
     )
-    @paginate()
+    @paginate(PageNumberOrCursorPagination)
     def list_mgnify_studies(
         self,
         order: OrderByFilter[
@@ -76,7 +107,9 @@ class StudyController(UnauthorisedIsUnfoundController):
         ] = Query(...),
         filters: StudyListFilters = Query(...),
     ):
-        qs = analyses.models.Study.public_objects.all()
+        qs = with_trusted_json_reads(
+            analyses.models.Study.public_objects.select_related("biome")
+        )
         qs = order.order_by(qs)
         qs = filters.filter(qs)
         return qs
@@ -1,6 +1,6 @@
 import re
 from datetime import timedelta
-from typing import List, Pattern
+from typing import List, Literal, Optional, Pattern
 
 from pydantic import AnyHttpUrl, BaseModel, Field
 from pydantic.networks import MongoDsn, MySQLDsn
@@ -32,17 +32,37 @@ class SlurmConfig(BaseModel):
     # if a cluster job flow is still running after this long, it is timed out to clear
     #   up cases where the prefect worker has been ended whilst the slurm job ran.
 
+    central_job_state_poller: bool = False
+    # if True, the states of all in-flight jobs are polled from slurm at once (by the `poll_cluster_job_states`
+    #   command), and cluster job flows read those states from the DB instead of each querying slurm.
+    central_job_state_max_age_seconds: int = 60
+    # if a job's polled state is older than this (e.g. the poller is not running), the flow queries slurm itself.
+
+    samplesheet_chunks_per_study_limit: int = 4
+    # at most this many samplesheet chunks (each a pipeline run) of a study are run concurrently,
+    #   and fewer if the cluster does not have space for that many chunks' worth of jobs.
+    samplesheet_chunks_concurrency_limit: Optional[str] = "samplesheet-chunks"
+    # name of a prefect global concurrency limit on the chunks of all studies (ignored if it does not exist)
+
     job_log_tail_lines: int = 10
     # how many lines of slurm log to send to prefect each time we check it
 
     job_log_failure_tail_lines: int = 100
     # how many lines of final slurm log to send to prefect if a job fails
 
+    input_file_sampled_hash_min_bytes: Optional[int] = None
+    # if set, input files at least this big are hashed from samples of their contents rather than in full
+    #   (note that enabling this changes their hashes, so jobs' input files will look changed once)
+    input_file_sampled_hash_sample_bytes: int = 4 * 1024 * 1024
+    # how big each of the (start, middle, end) samples of a sampled-hash input file is
+
     use_nextflow_tower: bool = False
     nextflow_tower_org: str = "EMBL-EBI"
     nextflow_tower_workspace: str = "ebi-spws-dev-microbiome-info"
 
     datamover_paritition: str = "datamover"
+    datamover_parallel_transfers: int = 4
+    # when a single datamover job moves many sources (e.g. a samplesheet chunk's results), it moves this many at once
 
     shared_filesystem_root_on_slurm: str = "/nfs/public"
     shared_filesystem_root_on_server: str = "/app/data"
@@ -138,6 +158,17 @@ class AssemblyAnalysisPipelineConfig(BaseModel):
     functional_folder: str = "functional-annotation"
 
 
+class ResultsImportConfig(BaseModel):
+    concurrent_analysis_imports: int = 4
+    # how many completed analyses (e.g. of a samplesheet chunk) are imported into the DB at once, each in a thread
+    db_connections_budget: int = 8
+    # at most this many analyses are being imported at once across the whole worker process (e.g. over several chunks),
+    #   since each import thread holds its own DB connection
+    file_validation_workers: int = 8
+    # how many result files (e.g. annotation tables) are stat-ed and validated against their rules at once,
+    #   when sanity checking an analysis' results
+
+
 class WebinConfig(BaseModel):
     emg_webin_account: str = None
     emg_webin_password: str = None
@@ -166,6 +197,13 @@ class ENAConfig(BaseModel):
     ]
     portal_search_api_max_retries: int = 4
     portal_search_api_retry_delay_seconds: int = 15
+    portal_search_api_timeout_seconds: int = 30
+    portal_search_api_max_connections: int = 20
+    # connections to the portal API are pooled and kept alive; this many may be open at once
+    portal_search_api_page_size: int = 10000
+    # large result sets (e.g. all the runs of a study) are fetched in pages of this many records
+    portal_search_api_records_format: Literal["tsv", "json"] = "tsv"
+    # format for large result sets; tsv is parsed as it streams, so memory use doesn't grow with the page size
     browser_view_url_prefix: AnyHttpUrl = "https://www.ebi.ac.uk/ena/browser/view"
     # TODO: migrate to the ENA Handler
     study_metadata_fields: list[str] = ["study_title", "secondary_study_accession"]
@@ -177,6 +215,8 @@ class ENAConfig(BaseModel):
 class LegacyServiceConfig(BaseModel):
     emg_mongo_dsn: MongoDsn = "mongodb://mongo.not.here/db"
     emg_mongo_db: str = "emgapi"
+    emg_mongo_page_size: int = 1000
+    # how many analyses' taxonomies are fetched from the legacy mongo per query
 
     emg_mysql_dsn: MySQLDsn = "mysql+mysqlconnector://mysql.not.here/emg"
 
@@ -185,6 +225,19 @@ class LegacyServiceConfig(BaseModel):
     )
 
 
+class APIResponseCacheConfig(BaseModel):
+    enabled: bool = False
+    # if True, GET responses of the public API endpoints are cached (keyed by path, query and auth identity)
+    backend: str = "django.core.cache.backends.filebased.FileBasedCache"
+    location: str = "/tmp/emg-api-response-cache"
+    # any django cache backend, e.g. "django.core.cache.backends.locmem.LocMemCache".
+    #   entries are invalidated by signals in whichever process changes the data (e.g. a prefect worker),
+    #   so the backend must be shared by the API and worker processes (local memory is only suitable for dev/tests),
+    #   and `enabled` must be set the same way for both.
+    timeout_seconds: int = 600
+    # entries also expire after this long, in case data is changed in a way that sends no signals
+
+
 class ServiceURLsConfig(BaseModel):
     app_root: str = "http://localhost:8000"
     base_url: str = ""
@@ -218,10 +271,12 @@ class EMGConfig(BaseSettings):
     assembly_analysis_pipeline: AssemblyAnalysisPipelineConfig = (
         AssemblyAnalysisPipelineConfig()
     )
+    api_response_cache: APIResponseCacheConfig = APIResponseCacheConfig()
     assembler: AssemblerConfig = AssemblerConfig()
     ena: ENAConfig = ENAConfig()
     environment: str = "development"
     legacy_service: LegacyServiceConfig = LegacyServiceConfig()
+    results_import: ResultsImportConfig = ResultsImportConfig()
     service_urls: ServiceURLsConfig = ServiceURLsConfig()
     slurm: SlurmConfig = SlurmConfig()
     webin: WebinConfig = WebinConfig()
@@ -1,16 +1,78 @@
 import json
-from typing import Type
+from functools import cached_property, lru_cache
+from typing import Dict, List, Type
 
 from django.core.exceptions import ValidationError as DjValidationError
 from django.db import models
-from pydantic import BaseModel
+from django.db.models.fields.json import KeyTransform
+from django.db.models.query import ModelIterable
+from django.db.models.query_utils import DeferredAttribute
+from pydantic import AliasChoices, AliasPath, BaseModel, TypeAdapter
 from pydantic import ValidationError as PydValidationError
 
 
+@lru_cache(maxsize=None)
+def _field_names_by_key(schema: Type[BaseModel]) -> Dict[str, str]:
+    """
+    Mapping of the keys a dict for the schema can have (field aliases, or names) to the schema's field names.
+    Each choice of an AliasChoices validation alias is a key for its field.
+    """
+    field_names = {}
+    for name, field in schema.model_fields.items():
+        alias = field.validation_alias
+        if isinstance(alias, str):
+            field_names[alias] = name
+        elif isinstance(alias, AliasChoices):
+            for choice in alias.choices:
+                if isinstance(choice, str):
+                    field_names[choice] = name
+                elif len(choice.path) == 1:
+                    field_names[choice.path[0]] = name
+        else:
+            field_names[field.alias or name] = name
+    return field_names
+
+
+@lru_cache(maxsize=None)
+def _validates_whole_dicts(schema: Type[BaseModel]) -> bool:
+    """
+    Whether dicts for the schema must be validated as a whole, rather than entry-wise:
+    i.e. if it has model validators (which may need the whole dict),
+    or fields aliased to paths nested inside an entry (e.g. AliasPath("location", "lat")).
+    """
+    if schema.__pydantic_decorators__.model_validators:
+        return True
+    for field in schema.model_fields.values():
+        alias = field.validation_alias
+        paths = alias.choices if isinstance(alias, AliasChoices) else [alias]
+        if any(isinstance(path, AliasPath) and len(path.path) > 1 for path in paths):
+            return True
+    return False
+
+
+def _validate_entry(schema: Type[BaseModel], key, value, strict=False):
+    """
+    Validate a single entry of a dict for the schema, without validating (or copying) the rest of the dict.
+    Schemas that must be validated as whole dicts (see _validates_whole_dicts) cannot be validated entry-wise,
+    so for those the dict must be validated as a whole instead.
+    :raises pydantic.ValidationError: If the entry is invalid.
+    """
+    field_name = _field_names_by_key(schema).get(key)
+    if field_name is None:
+        if schema.model_config.get("extra") == "forbid":
+            schema.__pydantic_validator__.validate_assignment(
+                schema.model_construct(), key, value, strict=strict
+            )
+        return
+    schema.__pydantic_validator__.validate_assignment(
+        schema.model_construct(), field_name, value, strict=strict
+    )
+
+
 class _PydanticValidatingDict(dict):
     """
     If django field is returning a dict, override item setter so that a field within the dict
-    can be updated, with validation.
+    can be updated, with validation of just that field.
     """
 
     def __init__(self, data, schema, strict=False, parent=None):
@@ -19,26 +81,30 @@ class _PydanticValidatingDict(dict):
         self._parent = parent
         super().__init__(data)
 
+    def _validate_entries(self, entries: dict):
+        if _validates_whole_dicts(self._schema):
+            self._schema.model_validate({**self, **entries}, strict=self._strict)
+            return
+        for key, value in entries.items():
+            _validate_entry(self._schema, key, value, strict=self._strict)
+
     def __setitem__(self, key, value):
-        field_data = dict(self)
-        field_data[key] = value
-        self._schema.model_validate(field_data, strict=self._strict)
+        self._validate_entries({key: value})
         super().__setitem__(key, value)
         if self._parent:
             self._parent._mark_field_as_dirty()
 
     def update(self, *args, **kwargs):
-        field_data = dict(self)
-        field_data.update(*args, **kwargs)
-        self._schema.model_validate(field_data, strict=self._strict)
-        super().update(*args, **kwargs)
+        entries = dict(*args, **kwargs)
+        self._validate_entries(entries)
+        super().update(entries)
         if self._parent:
             self._parent._mark_field_as_dirty()
 
 
 class _PydanticValidatingList(list):
     """
-    If django field is returning a list, override setter and appender to validate updated data.
+    If django field is returning a list, override setters and appenders to validate the new items.
     """
 
     def __init__(self, data, schema, strict=False, parent=None):
@@ -47,32 +113,42 @@ class _PydanticValidatingList(list):
         self._parent = parent
         super().__init__(data)
 
-    def append(self, value):
-        self._schema.model_validate(value, strict=self._strict)
-        super().append(value)
-        if self._parent:
-            self._parent._mark_field_as_dirty()
+    def _validate_items(self, values):
+        for value in values:
+            self._schema.model_validate(value, strict=self._strict)
 
-    def __setitem__(self, index, value):
-        self._schema.model_validate(value, strict=self._strict)
-        super().__setitem__(index, value)
+    def _changed(self):
         if self._parent:
             self._parent._mark_field_as_dirty()
 
+    def append(self, value):
+        self._validate_items([value])
+        super().append(value)
+        self._changed()
 
-class _PydanticDecoder(json.JSONDecoder):
-    def __init__(self, *args, schema=None, is_list: bool = False, **kwargs):
-        self.pydantic_model = schema
-        self.is_list = is_list
-        super().__init__(*args, **kwargs)
+    def extend(self, values):
+        values = list(values)
+        self._validate_items(values)
+        super().extend(values)
+        self._changed()
 
-    def decode(self, s, **kwargs):
-        data = super().decode(s, **kwargs)
-        if self.pydantic_model:
-            if self.is_list:
-                return [self.pydantic_model.model_validate(d) for d in data]
-            return self.pydantic_model.model_validate(data)
-        return data
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def insert(self, index, value):
+        self._validate_items([value])
+        super().insert(index, value)
+        self._changed()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self._validate_items(value)
+        else:
+            self._validate_items([value])
+        super().__setitem__(index, value)
+        self._changed()
 
 
 class _PydanticEncoder(json.JSONEncoder):
@@ -86,6 +162,41 @@ class _PydanticEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+class _StoredJSON:
+    """
+    Marks a JSON value exactly as loaded from the DB: parsed, but not yet decoded to its schema.
+    If trusted, it is never decoded.
+    """
+
+    trusted = False
+
+
+class _StoredDict(_StoredJSON, dict): ...
+
+
+class _StoredList(_StoredJSON, list): ...
+
+
+class _SchemaDecodingAttribute(DeferredAttribute):
+    """
+    Decodes a JSONFieldWithSchema value loaded from the DB to its schema on first access (rather than on load),
+    so that rows whose value is never used (e.g. in a list of many rows) never pay for its validation.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, _StoredJSON):
+            value = self.field.decode(value, trusted=value.trusted)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        # (a data descriptor, so that __get__ is used even once the value is in the instance's __dict__)
+        instance.__dict__[self.field.attname] = value
+
+
 class JSONFieldWithSchema(models.JSONField):
     """
     A Django JSONField for a model, except that the JSON content has a validator based on a pydantic schema.
@@ -101,8 +212,14 @@ class JSONFieldWithSchema(models.JSONField):
         things = JSONFieldWithSchema(schema=MyThing, is_list=True, strict=True)
 
     my_object = MyModel.objects.create(things=[{"name": "x-wing", "length": 1}])
+
+    Values loaded from the DB are decoded to schema instances (e.g. a list of MyThing) lazily, on first access.
+    A value that is saved without having been accessed is written back as it was loaded, without being decoded.
+    For bulk reads of rows whose stored values are trusted to be valid, see `with_trusted_json_reads`.
     """
 
+    descriptor_class = _SchemaDecodingAttribute
+
     def __init__(
         self,
         schema: Type[BaseModel] = None,
@@ -116,19 +233,7 @@ class JSONFieldWithSchema(models.JSONField):
         self.schema = schema
         self.is_list = is_list
         self.is_strict = strict
-        super().__init__(
-            *args, decoder=self._make_decoder(), encoder=_PydanticEncoder, **kwargs
-        )
-
-    def _make_decoder(self):
-        schema = self.schema
-        is_list = self.is_list
-
-        class SchemaDecoder(_PydanticDecoder):
-            def __init__(inner_self, *args, **kwargs):
-                super().__init__(schema=schema, is_list=is_list, *args, **kwargs)
-
-        return SchemaDecoder
+        super().__init__(*args, encoder=_PydanticEncoder, **kwargs)
 
     def deconstruct(self):
         """
@@ -144,13 +249,51 @@ class JSONFieldWithSchema(models.JSONField):
 
         return name, path, args, kwargs
 
+    def from_db_value(self, value, expression, connection):
+        data = super().from_db_value(value, expression, connection)
+        if not self.schema or isinstance(expression, KeyTransform):
+            return data
+        if self.is_list and type(data) is list:
+            return _StoredList(data)
+        if not self.is_list and type(data) is dict:
+            return _StoredDict(data)
+        return data
+
+    @cached_property
+    def _list_adapter(self) -> TypeAdapter:
+        return TypeAdapter(List[self.schema])
+
+    def decode(self, data, trusted: bool = False):
+        """
+        Decode JSON data loaded from the DB to instance(s) of the schema.
+        :param data: The parsed JSON (a dict, or a list of dicts if is_list).
+        :param trusted: Skip decoding (and so validation): the JSON data is returned as plain dicts/lists,
+            as a JSONField without a schema would return it.
+        """
+        if trusted:
+            return list(data) if self.is_list else dict(data)
+        if self.is_list:
+            return _PydanticValidatingList(
+                self._list_adapter.validate_python(data),
+                schema=self.schema,
+                strict=self.is_strict,
+            )
+        return self.schema.model_validate(data)
+
+    def pre_save(self, model_instance, add):
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, _StoredJSON):
+            # not accessed since it was loaded, so not changed: no need to decode it
+            return value
+        return super().pre_save(model_instance, add)
+
     def validate(self, value, model_instance):
         super().validate(value, model_instance)
 
         # Use the Pydantic model for additional validation
         try:
             if self.is_list:
-                if type(value) is not list:
+                if not isinstance(value, list):
                     raise DjValidationError("Value is not a list")
                 [
                     self.schema.model_validate(item, strict=self.is_strict)
@@ -210,3 +353,36 @@ class JSONFieldWithSchema(models.JSONField):
         if isinstance(value, _PydanticValidatingList):
             return list(value)
         return super().get_prep_value(value)
+
+
+class _TrustedJSONModelIterable(ModelIterable):
+    def __iter__(self):
+        attnames = [
+            field.attname
+            for field in self.queryset.model._meta.concrete_fields
+            if isinstance(field, JSONFieldWithSchema)
+        ]
+        for obj in super().__iter__():
+            for attname in attnames:
+                value = obj.__dict__.get(attname)
+                if isinstance(value, _StoredJSON):
+                    value.trusted = True
+            yield obj
+
+
+def with_trusted_json_reads(queryset: models.QuerySet) -> models.QuerySet:
+    """
+    Opt a queryset's objects out of decoding (and so validating) their JSONFieldWithSchema values:
+    they are returned as the stored JSON, as plain dicts/lists.
+    For bulk, read-only listings of rows whose stored values are known to be valid (they were validated when saved),
+    e.g. by list API endpoints, whose response schemas read dicts as well as objects.
+    Objects loaded by select_related are not affected.
+
+    E.g. with_trusted_json_reads(Study.public_objects.all())
+    """
+    if queryset._iterable_class is not ModelIterable:
+        # e.g. a .values() queryset, whose JSON values are never decoded
+        return queryset
+    queryset = queryset.all()
+    queryset._iterable_class = _TrustedJSONModelIterable
+    return queryset
@@ -13,9 +13,16 @@ EMG_CONFIG.webin.auth_endpoint = "http://fake-auth.example.com/auth"
 EMG_CONFIG.ena.portal_search_api_default_data_portals = [ENAPortalDataPortal.METAGENOME]
 EMG_CONFIG.ena.portal_search_api_max_retries = 0  # failfast in unit tests
 EMG_CONFIG.ena.portal_search_api_retry_delay_seconds = 1
+EMG_CONFIG.ena.portal_search_api_records_format = "json"  # fixtures mock json responses
 EMG_CONFIG.amplicon_pipeline.allow_non_insdc_run_names = True
 EMG_CONFIG.amplicon_pipeline.keep_study_summary_partials = True
 EMG_CONFIG.slurm.default_seconds_between_job_checks = 1
+EMG_CONFIG.api_response_cache.enabled = False  # tests that need it enable it
+
+CACHES["api_responses"] = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "emg-api-response-cache-test",
+}
 
 STORAGES = {
     "staticfiles": {
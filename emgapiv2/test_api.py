@@ -105,6 +105,81 @@ def test_api_analyses_list(raw_read_analyses, ninja_api_client):
     ]
 
 
+@pytest.mark.django_db
+def test_api_analyses_list_cursor_pagination(raw_read_analyses, ninja_api_client):
+    for analysis in raw_read_analyses:
+        analysis.status[Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED] = True
+        analysis.save()
+    expected = [a.accession for a in sorted(raw_read_analyses, key=lambda a: a.id)]
+
+    first_page = call_endpoint_and_get_data(
+        ninja_api_client,
+        "/analyses/?cursor=&page_size=2&count=exact",
+        count=len(raw_read_analyses),
+        getter=_whole_object,
+    )
+    assert [a["accession"] for a in first_page["items"]] == expected[:2]
+    assert first_page["previous_cursor"] is None
+    assert first_page["next_cursor"]
+
+    last_page = call_endpoint_and_get_data(
+        ninja_api_client,
+        f"/analyses/?cursor={first_page['next_cursor']}&page_size=2&count=none",
+        getter=_whole_object,
+    )
+    assert last_page["count"] is None
+    assert [a["accession"] for a in last_page["items"]] == expected[2:]
+    assert last_page["next_cursor"] is None
+    assert last_page["previous_cursor"]
+
+    back_to_first_page = call_endpoint_and_get_data(
+        ninja_api_client,
+        f"/analyses/?cursor={last_page['previous_cursor']}&page_size=2",
+        getter=_whole_object,
+    )
+    assert [a["accession"] for a in back_to_first_page["items"]] == expected[:2]
+    assert back_to_first_page["previous_cursor"] is None
+    assert back_to_first_page["next_cursor"]
+
+    # page-number pagination is unchanged unless a cursor is given
+    call_endpoint_and_get_data(
+        ninja_api_client, "/analyses/?page=2&page_size=2", count=len(expected)
+    )
+
+    call_endpoint_and_get_data(
+        ninja_api_client, "/analyses/?cursor=not-a-cursor", status_code=400
+    )
+
+
+@pytest.mark.django_db
+def test_api_analyses_list_has_annotation(raw_read_analyses, ninja_api_client):
+    for analysis in raw_read_analyses:
+        analysis.annotations[Analysis.PFAMS] = [{"pfam": "PF00001", "count": 1}]
+        analysis.save()
+    raw_read_analyses[0].annotations[Analysis.PFAMS].append(
+        {"pfam": "PF00005", "count": 3}
+    )
+    raw_read_analyses[0].save()
+    for analysis in raw_read_analyses:
+        analysis.mark_status(Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED)
+
+    items = call_endpoint_and_get_data(
+        ninja_api_client, "/analyses/?has_annotation=PF00005", count=1
+    )
+    assert items[0]["accession"] == raw_read_analyses[0].accession
+
+    call_endpoint_and_get_data(
+        ninja_api_client,
+        "/analyses/?has_annotation=PF00001",
+        count=len(raw_read_analyses),
+    )
+    call_endpoint_and_get_data(
+        ninja_api_client,
+        "/analyses/?has_annotation=PF00005&annotation_type=go_terms",
+        count=0,
+    )
+
+
 @pytest.mark.django_db
 def test_api_study_analyses_list(raw_read_analyses, ninja_api_client):
     items = call_endpoint_and_get_data(
@@ -169,6 +244,44 @@ def test_api_analysis_downloads(raw_read_analyses, ninja_api_client):
     assert "path" not in dl_api
 
 
+@pytest.mark.django_db
+def test_api_analysis_annotations_of_type_paginated(
+    raw_read_analyses, ninja_api_client, django_assert_num_queries
+):
+    analysis = raw_read_analyses[0]
+    analysis.annotations[Analysis.PFAMS] = [
+        {"count": i, "description": f"PF{i:05}"} for i in range(25)
+    ]
+    analysis.save()
+
+    with django_assert_num_queries(1):
+        items = call_endpoint_and_get_data(
+            ninja_api_client,
+            f"/analyses/{analysis.accession}/annotations/pfams?page=2&page_size=10",
+            count=25,
+        )
+    assert [item["count"] for item in items] == list(range(10, 20))
+    assert items[0]["description"] == "PF00010"
+
+    items = call_endpoint_and_get_data(
+        ninja_api_client,
+        f"/analyses/{analysis.accession}/annotations/pfams?page=3&page_size=10",
+        count=25,
+    )
+    assert [item["count"] for item in items] == list(range(20, 25))
+
+    # missing or non-list annotations are an empty list
+    call_endpoint_and_get_data(
+        ninja_api_client,
+        f"/analyses/{analysis.accession}/annotations/taxonomies__dada2_pr2",
+        count=0,
+    )
+
+    call_endpoint_and_get_data(
+        ninja_api_client, "/analyses/MGYA99999999/annotations/pfams", status_code=404
+    )
+
+
 @pytest.mark.django_db
 def test_api_samples_list(raw_reads_mgnify_sample, ninja_api_client):
     items = call_endpoint_and_get_data(
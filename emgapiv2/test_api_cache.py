@@ -0,0 +1,152 @@
+import pytest
+from django.core.cache import caches
+from ninja_jwt.tokens import SlidingToken
+
+from analyses.models import Analysis, Study
+from emgapiv2.api.cache import API_RESPONSE_CACHE, CACHE_STATUS_HEADER
+
+
+@pytest.fixture
+def api_response_cache(settings):
+    settings.EMG_CONFIG.api_response_cache.enabled = True
+    caches[API_RESPONSE_CACHE].clear()
+    yield caches[API_RESPONSE_CACHE]
+    settings.EMG_CONFIG.api_response_cache.enabled = False
+
+
+def cache_status(response):
+    return response.headers.get(CACHE_STATUS_HEADER)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_api_response_cache_invalidation(
+    settings, client, api_response_cache, raw_read_analyses
+):
+    analysis: Analysis = raw_read_analyses[0]
+    study: Study = analysis.study
+    study_url = f"/{settings.BASE_URL}studies/{study.accession}"
+    analysis_url = f"/{settings.BASE_URL}analyses/{analysis.accession}"
+    study_analyses_url = f"{study_url}/analyses/"
+
+    response = client.get(study_url)
+    assert response.status_code == 200
+    assert cache_status(response) == "MISS"
+    response = client.get(study_url)
+    assert cache_status(response) == "HIT"
+    assert response.json()["accession"] == study.accession
+
+    # different queries are cached separately
+    assert cache_status(client.get(study_url, {"x": "1"})) == "MISS"
+
+    # saving invalidates
+    study.title = "A new title"
+    study.save()
+    response = client.get(study_url)
+    assert cache_status(response) == "MISS"
+    assert response.json()["title"] == "A new title"
+
+    assert cache_status(client.get(analysis_url)) == "MISS"
+    assert cache_status(client.get(analysis_url)) == "HIT"
+
+    # as does saving an analysis, for its study's list of analyses
+    assert cache_status(client.get(study_analyses_url)) == "MISS"
+    assert cache_status(client.get(study_analyses_url)) == "HIT"
+    analysis.save()
+    assert cache_status(client.get(study_analyses_url)) == "MISS"
+    assert cache_status(client.get(analysis_url)) == "MISS"
+    assert cache_status(client.get(analysis_url)) == "HIT"
+
+    # so do bulk writes, which send no post_save signals
+    Analysis.objects.filter(pk=analysis.pk).set_statuses(
+        true=[Analysis.AnalysisStates.ANALYSIS_QC_FAILED]
+    )
+    assert cache_status(client.get(analysis_url)) == "MISS"
+
+    # including those that change which analyses a study lists
+    ready_count = len(client.get(study_analyses_url).json()["items"])
+    assert cache_status(client.get(study_analyses_url)) == "HIT"
+    Analysis.objects.filter(pk=analysis.pk).set_statuses(
+        false=[Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+    )
+    response = client.get(study_analyses_url)
+    assert cache_status(response) == "MISS"
+    assert len(response.json()["items"]) == ready_count - 1
+    Analysis.objects.filter(pk=analysis.pk).set_statuses(
+        true=[Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+    )
+    response = client.get(study_analyses_url)
+    assert cache_status(response) == "MISS"
+    assert len(response.json()["items"]) == ready_count
+
+    # and changes to related objects shown in the response
+    assert cache_status(client.get(analysis_url)) == "MISS"
+    assert cache_status(client.get(analysis_url)) == "HIT"
+    other_analysis_url = (
+        f"/{settings.BASE_URL}analyses/{raw_read_analyses[1].accession}"
+    )
+    assert cache_status(client.get(other_analysis_url)) == "MISS"
+    analysis.run.instrument_model = "Box"
+    analysis.run.save()
+    response = client.get(analysis_url)
+    assert cache_status(response) == "MISS"
+    assert response.json()["run"]["instrument_model"] == "Box"
+
+    # but not changes to unrelated objects
+    assert cache_status(client.get(other_analysis_url)) == "HIT"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_api_response_cache_auth_identity(
+    settings, client, api_response_cache, webin_private_study
+):
+    study_url = f"/{settings.BASE_URL}studies/{webin_private_study.accession}"
+
+    def auth_header(username):
+        token = SlidingToken()
+        token["username"] = username
+        return {"Authorization": f"Bearer {token}"}
+
+    owner = auth_header(webin_private_study.webin_submitter)
+    response = client.get(study_url, headers=owner)
+    assert response.status_code == 200
+    assert cache_status(response) == "MISS"
+    assert cache_status(client.get(study_url, headers=owner)) == "HIT"
+
+    # the owner's cached response is never served to anyone else
+    assert client.get(study_url).status_code == 404
+    evil = auth_header(webin_private_study.webin_submitter + "-evil")
+    assert client.get(study_url, headers=evil).status_code == 404
+
+    # nor are responses to invalid tokens cached
+    response = client.get(study_url, headers={"Authorization": "Bearer nope"})
+    assert cache_status(response) is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_api_response_cache_invalidated_by_ena_study_privacy(
+    settings, client, api_response_cache, raw_read_analyses
+):
+    analysis: Analysis = raw_read_analyses[0]
+    study: Study = analysis.study
+    studies_url = f"/{settings.BASE_URL}studies/"
+    study_url = f"{studies_url}{study.accession}"
+    study_analyses_url = f"{study_url}/analyses/"
+    analysis_url = f"/{settings.BASE_URL}analyses/{analysis.accession}"
+
+    for url in [studies_url, study_url, study_analyses_url, analysis_url]:
+        assert cache_status(client.get(url)) == "MISS"
+        assert cache_status(client.get(url)) == "HIT"
+
+    # privacy reaches the study and its analyses by bulk updates from the ENA study
+    ena_study = study.ena_study
+    ena_study.is_private = True
+    ena_study.save()
+
+    assert client.get(study_url).status_code == 404
+    assert client.get(study_analyses_url).status_code == 404
+    assert client.get(analysis_url).status_code == 404
+    response = client.get(studies_url)
+    assert cache_status(response) == "MISS"
+    assert study.accession not in [
+        item["accession"] for item in response.json()["items"]
+    ]
@@ -296,6 +296,33 @@ def test_admin_can_view_private_study_analyses_list(
     assert data["count"] == 1
 
 
+@pytest.mark.django_db
+def test_study_status_summary_is_for_owner_or_admin_only(
+    private_analysis_with_download,
+    ninja_api_client,
+    admin_user,
+    webin_private_auth_token,
+    auth_token_evil,
+):
+    study = private_analysis_with_download.study.accession
+    url = f"/studies/{study}/status-summary"
+
+    response = ninja_api_client.get(url, user=admin_user)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["accession"] == study
+    assert data["analyses"]["total"] == 1
+    assert data["assemblies"]["total"] == 0
+
+    headers = {"Authorization": f"Bearer {webin_private_auth_token}"}
+    assert ninja_api_client.get(url, headers=headers).status_code == 200
+
+    headers = {"Authorization": f"Bearer {auth_token_evil}"}
+    assert ninja_api_client.get(url, headers=headers).status_code == 404
+
+    assert ninja_api_client.get(url).status_code == 401
+
+
 @pytest.mark.django_db
 def test_wrong_owner_cannot_view_private_study_detail(
     webin_private_study, ninja_api_client, auth_token_evil
@@ -1,13 +1,28 @@
+import json
+import statistics
+import time
+
 import pytest
 from django.core.exceptions import ValidationError
-from django.db import models
-from pydantic import BaseModel
-
+from django.db import connection, models
+from pydantic import AliasChoices, BaseModel, Field
+from pydantic import ValidationError as PydValidationError
+
+from analyses.base_models.with_downloads_models import (
+    DownloadFile,
+    DownloadFileType,
+    DownloadType,
+)
+from analyses.models import Study
 from emgapiv2.async_utils import anysync_property
 from emgapiv2.dict_utils import some, add
 from emgapiv2.enum_utils import FutureStrEnum
 from emgapiv2.log_utils import mask_sensitive_data
-from emgapiv2.model_utils import JSONFieldWithSchema
+from emgapiv2.model_utils import (
+    JSONFieldWithSchema,
+    _PydanticValidatingDict,
+    with_trusted_json_reads,
+)
 
 
 # Tests for async utils
@@ -135,6 +150,230 @@ def test_json_field_with_schema():
     assert TestSchema.model_validate(instance.my_data[0]).name == "X-wing"
 
 
+class ThingSchema(BaseModel):
+    name: str
+    length: int
+
+
+class ThingsModel(models.Model):
+    thing = JSONFieldWithSchema(schema=ThingSchema, null=True)
+    things = JSONFieldWithSchema(schema=ThingSchema, is_list=True, default=list)
+    downloads = JSONFieldWithSchema(schema=DownloadFile, is_list=True, default=list)
+
+    class Meta:
+        app_label = "test"
+
+
+def load_from_db(**raw_json) -> ThingsModel:
+    """
+    Make a ThingsModel object as the ORM would from a DB row, with its values' stored JSON.
+    """
+    field_names = ["id", *raw_json.keys()]
+    values = [
+        ThingsModel._meta.get_field(field_name).from_db_value(raw, None, connection)
+        for field_name, raw in raw_json.items()
+    ]
+    return ThingsModel.from_db("default", field_names, [1, *values])
+
+
+def save_values(instance: ThingsModel) -> list:
+    """
+    The values the ORM would write to the DB when saving an object (as psycopg Jsonb adapters).
+    """
+    return [
+        field.get_db_prep_save(field.pre_save(instance, add=False), connection)
+        for field in ThingsModel._meta.concrete_fields
+        if isinstance(field, JSONFieldWithSchema) and field.attname in instance.__dict__
+    ]
+
+
+def dump_save_values(instance: ThingsModel) -> list:
+    return [jsonb.dumps(jsonb.obj) for jsonb in save_values(instance)]
+
+
+def test_json_field_with_schema_lazy_decoding():
+    things_field = ThingsModel._meta.get_field("things")
+    instance = load_from_db(
+        thing=json.dumps({"name": "X-wing", "length": 13}),
+        things=json.dumps([{"name": "TIE fighter", "length": 7}]),
+    )
+
+    # nothing is decoded until accessed, and is saved as it was loaded
+    assert not isinstance(instance.__dict__["things"], BaseModel)
+    assert things_field.pre_save(instance, add=False) == [
+        {"name": "TIE fighter", "length": 7}
+    ]
+    assert not isinstance(instance.__dict__["things"][0], BaseModel)
+
+    assert instance.thing == ThingSchema(name="X-wing", length=13)
+    assert instance.things == [ThingSchema(name="TIE fighter", length=7)]
+
+    # invalid stored JSON is found when decoded
+    instance = load_from_db(things=json.dumps([{"name": "Death star"}]))
+    with pytest.raises(PydValidationError):
+        instance.things
+
+    # new items are validated
+    instance = load_from_db(things=json.dumps([]))
+    instance.things.append({"name": "A-wing", "length": 9})
+    instance.things.extend([ThingSchema(name="B-wing", length=16)])
+    with pytest.raises(PydValidationError):
+        instance.things.append({"name": "Death star"})
+    with pytest.raises(PydValidationError):
+        instance.things.extend([{"name": "Death star", "length": "huge"}])
+    assert len(instance.things) == 2
+    assert save_values(instance)[0].obj == [
+        {"name": "A-wing", "length": 9},
+        ThingSchema(name="B-wing", length=16),
+    ]
+
+
+def test_json_field_with_schema_trusted_reads():
+    field = ThingsModel._meta.get_field("things")
+    stored = field.from_db_value(json.dumps([{"name": "Death star"}]), None, connection)
+    stored.trusted = True
+    instance = ThingsModel.from_db("default", ["id", "things"], [1, stored])
+
+    # not decoded, so no error for the missing length
+    assert instance.things == [{"name": "Death star"}]
+
+
+@pytest.mark.django_db
+def test_json_field_with_schema_trusted_queryset(raw_reads_mgnify_study):
+    studies = Study.objects.filter(pk=raw_reads_mgnify_study.pk)
+    assert isinstance(studies.get().features, Study.StudyFeatures)
+
+    study = with_trusted_json_reads(studies).get()
+    assert study.features == studies.get().features.model_dump()
+
+    # and survives further chaining
+    study = with_trusted_json_reads(studies).order_by("-accession").first()
+    assert not isinstance(study.features, Study.StudyFeatures)
+
+
+def test_json_field_with_schema_validates_only_the_changed_entry():
+    thing = _PydanticValidatingDict(
+        {"name": "X-wing", "length": 13}, schema=ThingSchema
+    )
+    thing["length"] = 14
+    thing.update(name="Y-wing")
+    assert thing == {"name": "Y-wing", "length": 14}
+    with pytest.raises(PydValidationError):
+        thing["length"] = "long"
+    with pytest.raises(PydValidationError):
+        thing.update({"name": None})
+    assert thing == {"name": "Y-wing", "length": 14}
+
+    class AliasedThingSchema(BaseModel):
+        length: int = Field(validation_alias=AliasChoices("length", "size"))
+
+    aliased_thing = _PydanticValidatingDict({}, schema=AliasedThingSchema)
+    aliased_thing["size"] = 14
+    with pytest.raises(PydValidationError):
+        aliased_thing["size"] = "long"
+    with pytest.raises(PydValidationError):
+        aliased_thing["length"] = "long"
+    assert aliased_thing == {"size": 14}
+
+
+def make_download(n: int) -> dict:
+    return DownloadFile(
+        path=f"taxonomy-summary/SILVA-SSU/{n}.tsv",
+        alias=f"ERR{n}_SILVA-SSU.tsv",
+        download_type=DownloadType.TAXONOMIC_ANALYSIS,
+        file_type=DownloadFileType.TSV,
+        long_description="A table of taxonomic assignments",
+        short_description="Tax. assignments",
+        download_group="taxonomies.closed_reference.ssu",
+        file_size_bytes=1024,
+    ).model_dump()
+
+
+@pytest.mark.benchmark
+def test_benchmark_json_field_with_schema():
+    """
+    Time loading, mutating and saving objects with hundreds of schema'd downloads,
+    against eagerly validating every download on load, and revalidating a whole dict on every change.
+    Run with: pytest -m benchmark -s --no-cov -n0 emgapiv2/test_utils.py -k json_field
+    """
+    rows = 200
+    downloads_per_row = 300
+    raw_downloads = json.dumps([make_download(n) for n in range(downloads_per_row)])
+
+    def timed(func, repeats=1):
+        # the median of several runs, so that a hiccup in one run does not skew the comparisons
+        seconds = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = func()
+            seconds.append(time.perf_counter() - start)
+        return result, statistics.median(seconds)
+
+    # load, e.g. a list of objects whose downloads are not shown
+    _, eager_load_seconds = timed(
+        lambda: [
+            [DownloadFile.model_validate(d) for d in json.loads(raw_downloads)]
+            for _ in range(rows)
+        ],
+        repeats=5,
+    )
+    loaded, lazy_load_seconds = timed(
+        lambda: [load_from_db(downloads=raw_downloads) for _ in range(rows)],
+        repeats=5,
+    )
+
+    # access
+    _, access_seconds = timed(lambda: [len(row.downloads) for row in loaded])
+    trusted = []
+    for _ in range(rows):
+        row = load_from_db(downloads=raw_downloads)
+        row.__dict__["downloads"].trusted = True
+        trusted.append(row)
+    _, trusted_access_seconds = timed(lambda: [len(row.downloads) for row in trusted])
+
+    # save, with and without having been accessed
+    _, save_accessed_seconds = timed(lambda: [dump_save_values(row) for row in loaded])
+    unaccessed = [load_from_db(downloads=raw_downloads) for _ in range(rows)]
+    _, save_unaccessed_seconds = timed(
+        lambda: [dump_save_values(row) for row in unaccessed]
+    )
+
+    # mutate a dict entry by entry
+    entries = 2000
+
+    class Features(BaseModel):
+        model_config = {"extra": "allow"}
+        name: str = ""
+        size: int = 0
+
+    def whole_dict_revalidation():
+        features = {}
+        for n in range(entries):
+            Features.model_validate({**features, f"feature_{n}": n, "size": n})
+            features.update({f"feature_{n}": n, "size": n})
+
+    def entry_validation():
+        features = _PydanticValidatingDict({}, schema=Features)
+        for n in range(entries):
+            features.update({f"feature_{n}": n, "size": n})
+
+    _, whole_dict_seconds = timed(whole_dict_revalidation, repeats=5)
+    _, entry_seconds = timed(entry_validation, repeats=5)
+
+    print(
+        f"{rows} rows of {downloads_per_row} downloads: "
+        f"eager load {eager_load_seconds:.3f}s, lazy load {lazy_load_seconds:.3f}s, "
+        f"first access {access_seconds:.3f}s (trusted {trusted_access_seconds:.3f}s), "
+        f"save accessed {save_accessed_seconds:.3f}s, save unaccessed {save_unaccessed_seconds:.3f}s. "
+        f"{entries} dict changes: whole-dict revalidation {whole_dict_seconds:.3f}s, "
+        f"entry validation {entry_seconds:.3f}s"
+    )
+    assert lazy_load_seconds * 3 < eager_load_seconds
+    assert trusted_access_seconds < access_seconds
+    assert save_unaccessed_seconds < save_accessed_seconds
+    assert entry_seconds * 3 < whole_dict_seconds
+
+
 def test_enum_stringification():
     class MyEnum(FutureStrEnum):
         HELLO = "hello"
@@ -7,6 +7,8 @@ from django.db.models import Model, QuerySet
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from analyses.signals import send_bulk_saved
+
 # Some models that mirror ENA objects, like Study, Sample, Run etc
 
 
@@ -133,6 +135,10 @@ def on_ena_study_saved_update_derived_suppression_and_privacy_states(
                                 related_objects_to_update_status_of,
                                 [field_to_propagate],
                             )
+                            # e.g. so that cached API responses showing objects that are now private are discarded
+                            send_bulk_saved(
+                                related_model, related_objects_to_update_status_of
+                            )
 
 
 class Sample(ENAModel):
@@ -0,0 +1,151 @@
+from typing import Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import pandas as pd
+
+from workflows.data_io_utils.csv.csv_comment_handler import (
+    CSVDelimiter,
+    move_file_pointer_past_comment_lines,
+)
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class EmptyAnnotationTableError(Exception): ...
+
+
+def _read_tsv_in_chunks(
+    tsv: TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **read_csv_kwargs,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a (possibly commented) TSV as string columns, a chunk of rows at a time.
+    Reading everything as str means pandas need not infer dtypes, and numbers are parsed only where needed.
+    """
+    move_file_pointer_past_comment_lines(
+        tsv, delimiter=CSVDelimiter.TAB, comment_char="#"
+    )
+    try:
+        yield from pd.read_csv(
+            tsv,
+            sep=CSVDelimiter.TAB,
+            dtype=str,
+            chunksize=chunk_size,
+            **read_csv_kwargs,
+        )
+    except pd.errors.EmptyDataError:
+        raise EmptyAnnotationTableError
+
+
+def _to_int(column: pd.Series, fill: int) -> pd.Series:
+    return pd.to_numeric(column, errors="coerce").fillna(fill).astype(int)
+
+
+def _to_float(column: pd.Series, fill: float) -> pd.Series:
+    return pd.to_numeric(column, errors="coerce").fillna(fill).astype(float)
+
+
+def _records(**columns: pd.Series) -> List[dict]:
+    """
+    Like DataFrame.to_dict(orient="records") for the given columns, but much faster for long tables.
+    Values are native python types.
+    """
+    names = list(columns.keys())
+    return [
+        dict(zip(names, row))
+        for row in zip(*(column.tolist() for column in columns.values()))
+    ]
+
+
+def read_taxonomy_table(
+    tsv: TextIO,
+    count_columns: Sequence[str],
+    lineage_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **read_csv_kwargs,
+) -> Tuple[List[dict], int]:
+    """
+    Read a taxonomy table of lineages and their (read/contig) counts, into records of organism and count.
+
+    Lineages split over several rank columns (e.g. sk__Bacteria | k__ | p__Bacillota) are joined with ";",
+    column-wise rather than row by row, and the table is read in chunks so that huge tables
+    (e.g. hundreds of thousands of mOTUs lineages) do not need to be parsed in one go.
+
+    :param tsv: Open TSV file, possibly with leading comment lines.
+    :param count_columns: Possible names of the count column: the first that exists is used.
+        If none exist, counts are 0. Unparseable counts are 1.
+    :param lineage_columns: Column(s) of the lineage, joined in order with ";".
+        Defaults to all columns other than the count column.
+    :param chunk_size: Number of rows to parse at a time.
+    :param read_csv_kwargs: Passed to pandas.read_csv, e.g. names or usecols.
+    :return: A records-oriented list of taxonomies (as "organism") with their "count", and the total count.
+    :raises EmptyAnnotationTableError: If the table has no content.
+    """
+    records = []
+    total_count = 0
+    for chunk in _read_tsv_in_chunks(tsv, chunk_size=chunk_size, **read_csv_kwargs):
+        count_column = next((c for c in count_columns if c in chunk.columns), None)
+        if count_column is None:
+            counts = pd.Series(0, index=chunk.index)
+        else:
+            counts = _to_int(chunk[count_column], fill=1)
+
+        lineage_parts = [
+            chunk[c].fillna("")
+            for c in (
+                lineage_columns or chunk.columns.drop(count_column, errors="ignore")
+            )
+        ]
+        organisms = lineage_parts[0]
+        if len(lineage_parts) > 1:
+            organisms = organisms.str.cat(lineage_parts[1:], sep=";").str.strip(";")
+
+        records.extend(_records(organism=organisms, count=counts))
+        total_count += int(counts.sum())
+
+    return records, total_count
+
+
+def read_function_table(
+    tsv: TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **read_csv_kwargs,
+) -> Tuple[List[dict], List[dict], List[dict], int]:
+    """
+    Read a functional profile table of functions and their read counts, coverage depths and coverage breadths.
+
+    :param tsv: Open TSV file, possibly with leading comment lines.
+        Must have "function", "read_count", "coverage_depth" and "coverage_breadth" columns.
+    :param chunk_size: Number of rows to parse at a time.
+    :param read_csv_kwargs: Passed to pandas.read_csv.
+    :return: Records-oriented lists of functions with their "read_count", "coverage_depth" and "coverage_breadth"
+        respectively, and the total read count.
+    :raises EmptyAnnotationTableError: If the table has no content.
+    """
+    columns: Dict[str, List[dict]] = {
+        "read_count": [],
+        "coverage_depth": [],
+        "coverage_breadth": [],
+    }
+    total_read_count = 0
+    for chunk in _read_tsv_in_chunks(tsv, chunk_size=chunk_size, **read_csv_kwargs):
+        functions = chunk["function"]
+        read_counts = _to_int(chunk["read_count"], fill=1)
+        columns["read_count"].extend(
+            _records(function=functions, read_count=read_counts)
+        )
+        for coverage_column in ["coverage_depth", "coverage_breadth"]:
+            columns[coverage_column].extend(
+                _records(
+                    function=functions,
+                    **{coverage_column: _to_float(chunk[coverage_column], fill=0)},
+                )
+            )
+        total_read_count += int(read_counts.sum())
+
+    return (
+        columns["read_count"],
+        columns["coverage_depth"],
+        columns["coverage_breadth"],
+        total_read_count,
+    )
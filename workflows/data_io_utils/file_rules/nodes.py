@@ -10,6 +10,7 @@ from workflows.data_io_utils.file_rules.base_rules import (
     FileRule,
     GlobRule,
 )
+from workflows.data_io_utils.file_rules.validation import failed_rules
 
 __all__ = ["File", "Directory"]
 
@@ -26,18 +27,8 @@ class File(BaseModel):
 
     @model_validator(mode="after")
     def passes_all_rules(self):
-        failures = []
-        for rule in self.rules:
-            try:
-                passes = rule.test(self.path)
-            except Exception as e:
-                logging.error(
-                    f"Unexpected failure applying rule <<{rule.__class__.__name__}: {rule.rule_name}>> to {self.path}. Treating as rule failure. {e}"
-                )
-                failures.append(rule)
-            else:
-                if not passes:
-                    failures.append(rule)
+        # outcomes for unchanged files are reused, e.g. if already checked by validate_result_tree
+        failures = failed_rules(self.path, self.rules)
         if failures:
             raise ValueError(
                 f"Rules {[f.rule_name for f in failures]} failed for {self.path}"
@@ -64,9 +55,12 @@ class Directory(File):
     @model_validator(mode="after")
     def passes_all_glob_rules(self):
         failures = []
+        matches = {}
         for rule in self.glob_rules:
+            if rule.glob_patten not in matches:
+                matches[rule.glob_patten] = list(self.path.glob(rule.glob_patten))
             try:
-                passes = rule.test(self.path.glob(rule.glob_patten))
+                passes = rule.test(iter(matches[rule.glob_patten]))
             except Exception as e:
                 logging.error(
                     f"Unexpected failure applying rule <<{rule.__class__.__name__}: {rule.rule_name}>> to files of {self}. Treating as rule failure. {e}"
@@ -78,7 +72,7 @@ class Directory(File):
         if failures:
             for failure in failures:
                 matched_failed = "\n\t ├─> ".join(
-                    [str(p) for p in self.path.glob(failure.glob_patten)]
+                    [str(p) for p in matches[failure.glob_patten]]
                 )
                 logging.warning(
                     f"Glob rule failure for {failure.rule_name}:"
@@ -8,6 +8,10 @@ from workflows.data_io_utils.csv.csv_comment_handler import (
     CommentAwareDictReader,
     CSVDelimiter,
 )
+from workflows.data_io_utils.csv.schema_validation import (
+    ColumnarSchemaValidator,
+    RaggedCSVError,
+)
 from workflows.data_io_utils.file_rules.base_rules import FileRule
 
 
@@ -16,18 +20,49 @@ def generate_csv_schema_file_rule(
     delimiter: CSVDelimiter = CSVDelimiter.COMMA,
     none_values: Iterable[Hashable] = None,
     allow_trailing_delimiters: bool = True,
+    max_reported_bad_rows: int = 10,
 ) -> FileRule:
     """
     Generate a FileRule in which the rule test checks if the CSV file at path follows the specified schema.
+    Files are validated column-wise where possible (see ColumnarSchemaValidator),
+    falling back to validating each row against the schema, e.g. for rows with trailing delimiters.
     :param row_schema: A Pydantic model to validate each CSV row against
     :param delimiter: Field separator for CSV file. E.g. CSVDelimiter.COMMA
     :param none_values: Optional list of values that should be parsed to None, e.g. ["", "NA"]
     :param allow_trailing_delimiters: Whether to allow (ignore) trailing delimiters after the final dataful column
+    :param max_reported_bad_rows: How many of the first rows that fail validation are logged
     :return: A FileRule that can be applied to any path
     """
     schema_name = row_schema.__name__
 
+    try:
+        columnar_validator = ColumnarSchemaValidator(
+            row_schema, delimiter=delimiter, none_values=none_values
+        )
+    except NotImplementedError as e:
+        logging.info(f"{e}: CSVs will be validated row by row")
+        columnar_validator = None
+
+    def columnar_tester(path: Path):
+        with path.open("r") as f:
+            bad_rows = columnar_validator.bad_rows(
+                f, max_bad_rows=max_reported_bad_rows
+            )
+        for bad_row in bad_rows:
+            logging.error(
+                f"Validation failed on row {bad_row.row_number} of {path}: {'; '.join(bad_row.errors)}"
+            )
+        if not bad_rows:
+            logging.info(f"{path} validated against {schema_name}")
+        return not bad_rows
+
     def tester(path: Path):
+        if columnar_validator:
+            try:
+                return columnar_tester(path)
+            except RaggedCSVError as e:
+                logging.info(f"Validating {path} row by row: {e}")
+
         with path.open("r") as f:
             reader = CommentAwareDictReader(
                 f, delimiter=delimiter, none_values=none_values
@@ -0,0 +1,161 @@
+import logging
+import os
+import stat
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from workflows.data_io_utils.file_rules.base_rules import FileRule
+
+__all__ = [
+    "RuleOutcomesCache",
+    "rule_outcomes",
+    "apply_rule",
+    "failed_rules",
+    "validate_result_tree",
+]
+
+FileSignature = Tuple[int, int]  # size and modification time (ns) of a file
+
+
+class RuleOutcomesCache:
+    """
+    A bounded, thread-safe, least-recently-used store of whether a rule passed for a file.
+    Outcomes are keyed by the file's size and modification time as well as its path,
+    so an outcome is never reused once the file has changed.
+    """
+
+    def __init__(self, max_size: int = 50_000):
+        self.max_size = max_size
+        self._outcomes: OrderedDict[Hashable, Tuple[Callable, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bool]:
+        with self._lock:
+            if key not in self._outcomes:
+                return None
+            self._outcomes.move_to_end(key)
+            return self._outcomes[key][1]
+
+    def set(self, key: Hashable, test: Callable, outcome: bool):
+        with self._lock:
+            # the test itself is held too, so that its id (part of the key) cannot be reused by another test
+            self._outcomes[key] = (test, outcome)
+            self._outcomes.move_to_end(key)
+            while len(self._outcomes) > self.max_size:
+                self._outcomes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._outcomes.clear()
+
+    def __len__(self):
+        return len(self._outcomes)
+
+
+rule_outcomes = RuleOutcomesCache()
+
+
+def _file_signature(path: Path) -> Optional[FileSignature]:
+    try:
+        path_stat = path.stat()
+    except OSError:
+        return None
+    if not stat.S_ISREG(path_stat.st_mode):
+        return None
+    return path_stat.st_size, path_stat.st_mtime_ns
+
+
+def apply_rule(rule: FileRule, path: Path) -> bool:
+    """
+    Apply a rule to a path, reusing the outcome if the rule has already been applied to the unchanged file.
+    Only regular files are cached: rules about missing files or directories are cheap, and their outcomes volatile.
+    """
+    signature = _file_signature(path)
+    if signature is None:
+        return rule.test(path)
+
+    key = (id(rule.test), rule.rule_name, str(path.absolute()), signature)
+    outcome = rule_outcomes.get(key)
+    if outcome is None:
+        outcome = bool(rule.test(path))
+        rule_outcomes.set(key, rule.test, outcome)
+    return outcome
+
+
+def failed_rules(path: Path, rules: List[FileRule]) -> List[FileRule]:
+    """
+    Apply each rule to a path.
+    A rule that raises an exception is treated as a failure.
+    :return: The rules that did not pass.
+    """
+    failures = []
+    for rule in rules:
+        try:
+            passes = apply_rule(rule, path)
+        except Exception as e:
+            logging.error(
+                f"Unexpected failure applying rule <<{rule.__class__.__name__}: {rule.rule_name}>> to {path}. Treating as rule failure. {e}"
+            )
+            failures.append(rule)
+        else:
+            if not passes:
+                failures.append(rule)
+    return failures
+
+
+def validate_result_tree(
+    root: Path,
+    rules_for_globs: Dict[str, List[FileRule]],
+    max_workers: int = 8,
+) -> Dict[Path, List[str]]:
+    """
+    Validate every file in a (pipeline result) tree that matches a glob, with the rules for that glob.
+
+    The tree is walked once, and files are stat-ed and validated in parallel threads,
+    which hides much of the latency of a networked filesystem.
+    Outcomes are cached (see apply_rule), so later checks of the same unchanged files
+    (e.g. by File nodes built during an import) do not validate them again.
+
+    E.g. validate_result_tree(
+        Path("/results/SRR1"),
+        {"taxonomy-summary/*/SRR1_*.txt": [FileIsNotEmptyRule, FileConformsToRawReadsTaxonomyTSVSchemaRule]},
+    )
+
+    :param root: Directory to walk. If it does not exist, nothing is validated.
+    :param rules_for_globs: Mapping of glob patterns (relative to root) to the rules for files matching them.
+    :param max_workers: Maximum number of files to validate at once.
+    :return: Mapping of every file that failed any of its rules, to the names of those rules.
+    """
+    files_to_validate: Dict[Path, List[FileRule]] = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            relative_path = path.relative_to(root)
+            for pattern, rules in rules_for_globs.items():
+                if relative_path.match(pattern):
+                    files_to_validate.setdefault(path, []).extend(rules)
+
+    if not files_to_validate:
+        return {}
+
+    with ThreadPoolExecutor(
+        max_workers=max(min(max_workers, len(files_to_validate)), 1),
+        thread_name_prefix="file-rules",
+    ) as executor:
+        failures = dict(
+            zip(
+                files_to_validate.keys(),
+                executor.map(
+                    lambda path_and_rules: failed_rules(*path_and_rules),
+                    files_to_validate.items(),
+                ),
+            )
+        )
+    return {
+        path: [rule.rule_name for rule in failed]
+        for path, failed in failures.items()
+        if failed
+    }
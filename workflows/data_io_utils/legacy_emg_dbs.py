@@ -1,3 +1,4 @@
+import threading
 from contextlib import contextmanager
 from typing import List, Optional, TYPE_CHECKING
 
@@ -204,24 +205,34 @@ LEGACY_DOWNLOAD_TYPE_MAP = {
 }
 
 
-@task(task_run_name="Get taxonomy for {mgya} from legacy mongo")
-def get_taxonomy_from_api_v1_mongo(
-    mgya: str,
-) -> dict["analyses.models.Analysis.TaxonomySources", Optional[List]]:
-    from analyses.models import Analysis  # prevent importing before apps ready
+_legacy_mongo_client: Optional[pymongo.MongoClient] = None
+_legacy_mongo_client_lock = threading.Lock()
 
-    logger = get_run_logger()
-    mongo_dsn = str(settings.EMG_CONFIG.legacy_service.emg_mongo_dsn)
-    mongo_client = pymongo.MongoClient(mongo_dsn)
-    db = mongo_client[settings.EMG_CONFIG.legacy_service.emg_mongo_db]
 
-    taxonomies_collection: Collection = db.analysis_job_taxonomy
+def legacy_mongo_taxonomies_collection() -> Collection:
+    """
+    The taxonomies collection of the legacy Mongo database (behind the v1 EMG API).
+    A single (pooled, thread-safe) client is shared by the whole process,
+    so that connection and auth setup happen once rather than per query.
+    """
+    global _legacy_mongo_client
+    with _legacy_mongo_client_lock:
+        if _legacy_mongo_client is None:
+            _legacy_mongo_client = pymongo.MongoClient(
+                str(settings.EMG_CONFIG.legacy_service.emg_mongo_dsn)
+            )
+    db = _legacy_mongo_client[settings.EMG_CONFIG.legacy_service.emg_mongo_db]
+    return db.analysis_job_taxonomy
 
-    mgya_taxonomies = taxonomies_collection.find_one({"accession": mgya})
 
-    if not mgya_taxonomies:
-        logger.warning(f"Did not find {mgya} in legacy mongo")
-        return {}
+# fields of the legacy mongo's taxonomy documents that are imported
+LEGACY_MONGO_TAXONOMY_FIELDS = ["taxonomy_ssu", "taxonomy_lsu", "itsonedb", "unite"]
+
+
+def _taxonomies_from_mongo_document(
+    mgya_taxonomies: dict,
+) -> dict["analyses.models.Analysis.TaxonomySources", Optional[List]]:
+    from analyses.models import Analysis  # prevent importing before apps ready
 
     return {
         Analysis.TaxonomySources.SSU.value: mgya_taxonomies.get("taxonomy_ssu"),
@@ -232,6 +243,55 @@ def get_taxonomy_from_api_v1_mongo(
     }
 
 
+@task(task_run_name="Get taxonomy for {mgya} from legacy mongo")
+def get_taxonomy_from_api_v1_mongo(
+    mgya: str,
+) -> dict["analyses.models.Analysis.TaxonomySources", Optional[List]]:
+    logger = get_run_logger()
+
+    mgya_taxonomies = legacy_mongo_taxonomies_collection().find_one({"accession": mgya})
+
+    if not mgya_taxonomies:
+        logger.warning(f"Did not find {mgya} in legacy mongo")
+        return {}
+
+    return _taxonomies_from_mongo_document(mgya_taxonomies)
+
+
+@task
+def get_taxonomies_from_api_v1_mongo(
+    mgyas: List[str],
+) -> dict[str, dict["analyses.models.Analysis.TaxonomySources", Optional[List]]]:
+    """
+    Get the taxonomies of many analyses from the legacy mongo, a page of accessions per query.
+    :param mgyas: Accessions of analyses, e.g. ["MGYA00012345", ...]
+    :return: Taxonomies (as for get_taxonomy_from_api_v1_mongo) keyed by accession.
+        Accessions not found in the legacy mongo are missing.
+    """
+    logger = get_run_logger()
+    page_size = settings.EMG_CONFIG.legacy_service.emg_mongo_page_size
+    collection = legacy_mongo_taxonomies_collection()
+
+    taxonomies = {}
+    for page_start in range(0, len(mgyas), page_size):
+        page = mgyas[page_start : page_start + page_size]
+        for mgya_taxonomies in collection.find(
+            {"accession": {"$in": page}},
+            projection={
+                "_id": False,
+                "accession": True,
+                **{field: True for field in LEGACY_MONGO_TAXONOMY_FIELDS},
+            },
+        ):
+            taxonomies[mgya_taxonomies["accession"]] = _taxonomies_from_mongo_document(
+                mgya_taxonomies
+            )
+
+    for mgya in set(mgyas) - set(taxonomies):
+        logger.warning(f"Did not find {mgya} in legacy mongo")
+    return taxonomies
+
+
 legacy_emg_engine = create_engine(str(settings.EMG_CONFIG.legacy_service.emg_mysql_dsn))
 LegacyEmgSession = sessionmaker(bind=legacy_emg_engine)
 
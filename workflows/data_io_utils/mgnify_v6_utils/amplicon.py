@@ -3,7 +3,6 @@ import logging
 from pathlib import Path
 from typing import List, Literal, Optional
 
-import pandas as pd
 from django.conf import settings
 from pydantic import BaseModel, Field
 
@@ -13,9 +12,9 @@ from analyses.base_models.with_downloads_models import (
     DownloadFileType,
     DownloadType,
 )
-from workflows.data_io_utils.csv.csv_comment_handler import (
-    CSVDelimiter,
-    move_file_pointer_past_comment_lines,
+from workflows.data_io_utils.csv.annotation_tables import (
+    EmptyAnnotationTableError,
+    read_taxonomy_table,
 )
 from workflows.data_io_utils.file_rules.common_rules import (
     DirectoryExistsRule,
@@ -85,35 +84,19 @@ def get_annotations_from_tax_table(tax_table: File) -> (List[dict], Optional[int
     :return:  A records-oriented list of taxonomies (lineages) present along with their read count, and the total read count.
     """
     with tax_table.path.open("r") as tax_tsv:
-        move_file_pointer_past_comment_lines(
-            tax_tsv, delimiter=CSVDelimiter.TAB, comment_char="#"
-        )
         try:
-            tax_df = pd.read_csv(tax_tsv, sep=CSVDelimiter.TAB, usecols=[0, 1, 2])
-        except pd.errors.EmptyDataError:
+            return read_taxonomy_table(
+                tax_tsv,
+                count_columns=["SSU", "PR2", "ITSonedb", "UNITE", "LSU"],
+                lineage_columns=["taxonomy"],
+                usecols=[0, 1, 2],
+            )
+        except EmptyAnnotationTableError:
             logging.error(
                 f"Found empty taxonomy TSV at {tax_table.path}. Probably unit testing, otherwise we should never be here"
             )
             return [], 0
 
-    for read_count_column_possible_name in ["SSU", "PR2", "ITSonedb", "UNITE", "LSU"]:
-        if read_count_column_possible_name in tax_df.columns:
-            tax_df.rename(
-                columns={read_count_column_possible_name: "count"}, inplace=True
-            )
-            break
-    else:
-        tax_df["count"] = 0
-
-    tax_df["count"] = (
-        pd.to_numeric(tax_df["count"], errors="coerce").fillna(1).astype(int)
-    )
-
-    tax_df = tax_df.rename(columns={"taxonomy": "organism"})
-    tax_df: pd.DataFrame = tax_df[["organism", "count"]]
-
-    return tax_df.to_dict(orient="records"), int(tax_df["count"].sum())
-
 
 def import_taxonomy(
     analysis: analyses.models.Analysis,
@@ -203,7 +186,8 @@ def import_taxonomy(
                 parent_identifier=analysis.accession,
                 short_description=f"{schema.taxonomy_summary_folder_name} taxonomy table",
                 long_description="Table with read counts for each taxonomic assignment",
-            )
+            ),
+            save=False,
         )
 
     if schema.expect_krona:
@@ -218,7 +202,8 @@ def import_taxonomy(
                     parent_identifier=analysis.accession,
                     short_description=f"{schema.taxonomy_summary_folder_name} Krona plot",
                     long_description=f"Krona plot webpage showing taxonomic assignments from {schema.taxonomy_summary_folder_name} annotation",
-                )
+                ),
+                save=False,
             )
 
     if schema.expect_mseq:
@@ -232,7 +217,8 @@ def import_taxonomy(
                 parent_identifier=analysis.accession,
                 short_description=f"{schema.taxonomy_summary_folder_name} MAPseq output",
                 long_description="MAPseq output table with taxonomic database hit details",
-            )
+            ),
+            save=False,
         )
 
     analysis.save()
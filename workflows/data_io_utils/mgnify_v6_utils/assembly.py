@@ -16,8 +16,11 @@ from analyses.base_models.with_downloads_models import (
     DownloadType,
     DownloadFileIndexFile,
 )
+from workflows.data_io_utils.csv.annotation_tables import (
+    EmptyAnnotationTableError,
+    read_taxonomy_table,
+)
 from workflows.data_io_utils.csv.csv_comment_handler import (
-    move_file_pointer_past_comment_lines,
     CSVDelimiter,
 )
 
@@ -91,35 +94,22 @@ def get_annotations_from_tax_table(tax_table: File) -> (list[dict], int | None):
     :param tax_table: File whose property .path points at a TSV file (of a contig count and then multi-column nullable lineage parts)
     :return:  A records-oriented list of taxonomies and the total contig-annotation count.
     """
-    # with tax_table.path.open("r") as tax_tsv:
+    # TODO: could also validate here with toolkit:schemas.shemas.TaxonRecord
     with gzip.open(tax_table.path, "rt") as tax_tsv:
-        move_file_pointer_past_comment_lines(
-            tax_tsv, delimiter=CSVDelimiter.TAB, comment_char="#"
-        )  # comments not expected - defensive measure
         try:
-            tax_df = pd.read_csv(
-                tax_tsv, sep=CSVDelimiter.TAB, names=TAXONOMY_COLUMN_NAMES
-            ).fillna("")
-        except pd.errors.EmptyDataError:
+            # comments not expected, but are handled as a defensive measure
+            return read_taxonomy_table(
+                tax_tsv,
+                count_columns=[TAXONOMY_COLUMN_NAMES[0]],
+                lineage_columns=TAXONOMY_COLUMN_NAMES[1:],
+                names=TAXONOMY_COLUMN_NAMES,
+            )
+        except EmptyAnnotationTableError:
             logging.error(
                 f"Found empty taxonomy TSV at {tax_table.path}. Probably unit testing, otherwise we should never be here"
             )
             return [], 0
 
-    # TODO: could also validate here with toolkit:schemas.shemas.TaxonRecord
-    tax_df["organism"] = (
-        tax_df[TAXONOMY_COLUMN_NAMES[1:]].agg(";".join, axis=1).str.strip(";")
-    )
-    tax_df.rename(columns={"Count": "count"}, inplace=True)
-
-    tax_df["count"] = (
-        pd.to_numeric(tax_df["count"], errors="coerce").fillna(1).astype(int)
-    )
-
-    tax_df: pd.DataFrame = tax_df[["organism", "count"]]
-
-    return tax_df.to_dict(orient="records"), int(tax_df["count"].sum())
-
 
 def import_taxonomy(
     analysis: analyses.models.Analysis,
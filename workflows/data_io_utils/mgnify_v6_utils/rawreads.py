@@ -3,7 +3,6 @@ import logging
 from pathlib import Path
 from typing import List, Optional
 
-import pandas as pd
 from django.conf import settings
 from pydantic import BaseModel, Field
 
@@ -13,9 +12,10 @@ from analyses.base_models.with_downloads_models import (
     DownloadFileType,
     DownloadType,
 )
-from workflows.data_io_utils.csv.csv_comment_handler import (
-    CSVDelimiter,
-    move_file_pointer_past_comment_lines,
+from workflows.data_io_utils.csv.annotation_tables import (
+    EmptyAnnotationTableError,
+    read_function_table,
+    read_taxonomy_table,
 )
 from workflows.data_io_utils.file_rules.common_rules import (
     DirectoryExistsRule,
@@ -86,28 +86,14 @@ def get_annotations_from_tax_table(tax_table: File) -> (List[dict], Optional[int
     :return:  A records-oriented list of taxonomies (lineages) present along with their read count, and the total read count.
     """
     with tax_table.path.open("r") as tax_tsv:
-        move_file_pointer_past_comment_lines(
-            tax_tsv, delimiter=CSVDelimiter.TAB, comment_char="#"
-        )
         try:
-            tax_df = pd.read_csv(tax_tsv, sep=CSVDelimiter.TAB)
-        except pd.errors.EmptyDataError:
+            return read_taxonomy_table(tax_tsv, count_columns=["Count"])
+        except EmptyAnnotationTableError:
             logging.error(
                 f"Found empty taxonomy TSV at {tax_table.path}. Probably unit testing, otherwise we should never be here"
             )
             return [], 0
 
-    tax_df["organism"] = [
-        ";".join(r[list(tax_df.columns)[1:]]).strip(";") for _, r in tax_df.iterrows()
-    ]
-    tax_df["count"] = (
-        pd.to_numeric(tax_df["Count"], errors="coerce").fillna(1).astype(int)
-    )
-
-    tax_df: pd.DataFrame = tax_df[["organism", "count"]]
-
-    return tax_df.to_dict(orient="records"), int(tax_df["count"].sum())
-
 
 def import_taxonomy(
     analysis: analyses.models.Analysis,
@@ -215,7 +201,8 @@ def import_taxonomy(
                 parent_identifier=analysis.accession,
                 short_description=f"{schema.taxonomy_summary_folder_name} taxonomy table",
                 long_description="Table with read counts for each taxonomic assignment",
-            )
+            ),
+            save=False,
         )
 
     if schema.expect_krona:
@@ -230,7 +217,8 @@ def import_taxonomy(
                     parent_identifier=analysis.accession,
                     short_description=f"{schema.taxonomy_summary_folder_name} Krona plot",
                     long_description=f"Krona plot webpage showing taxonomic assignments from {schema.taxonomy_summary_folder_name} annotation",
-                )
+                ),
+                save=False,
             )
 
     if schema.expect_mseq:
@@ -244,7 +232,8 @@ def import_taxonomy(
                 parent_identifier=analysis.accession,
                 short_description=f"{schema.taxonomy_summary_folder_name} MAPseq output",
                 long_description="MAPseq output table with taxonomic database hit details",
-            )
+            ),
+            save=False,
         )
 
     if schema.expect_raw:
@@ -258,7 +247,8 @@ def import_taxonomy(
                 parent_identifier=analysis.accession,
                 short_description=f"{schema.taxonomy_summary_folder_name} raw mOTUs output",
                 long_description="mOTUs output table with taxonomic database hit details",
-            )
+            ),
+            save=False,
         )
 
     analysis.save()
@@ -272,42 +262,14 @@ def get_annotations_from_func_table(func_table: File) -> (List[dict], Optional[i
     :return:  A records-oriented list of functions (genes) present along with their read count, and the total read count.
     """
     with func_table.path.open("r") as func_tsv:
-        move_file_pointer_past_comment_lines(
-            func_tsv, delimiter=CSVDelimiter.TAB, comment_char="#"
-        )
         try:
-            func_df = pd.read_csv(func_tsv, sep=CSVDelimiter.TAB)
-        except pd.errors.EmptyDataError:
+            return read_function_table(func_tsv)
+        except EmptyAnnotationTableError:
             logging.error(
                 f"Found empty functional profile TSV at {func_table.path}. Probably unit testing, otherwise we should never be here"
             )
             return [], 0
 
-    func_df["read_count"] = (
-        pd.to_numeric(func_df["read_count"], errors="coerce").fillna(1).astype(int)
-    )
-    func_df["coverage_depth"] = (
-        pd.to_numeric(func_df["coverage_depth"], errors="coerce")
-        .fillna(0)
-        .astype(float)
-    )
-    func_df["coverage_breadth"] = (
-        pd.to_numeric(func_df["coverage_breadth"], errors="coerce")
-        .fillna(0)
-        .astype(float)
-    )
-
-    count_df: pd.DataFrame = func_df[["function", "read_count"]]
-    depth_df: pd.DataFrame = func_df[["function", "coverage_depth"]]
-    breadth_df: pd.DataFrame = func_df[["function", "coverage_breadth"]]
-
-    return (
-        count_df.to_dict(orient="records"),
-        depth_df.to_dict(orient="records"),
-        breadth_df.to_dict(orient="records"),
-        int(count_df["read_count"].sum()),
-    )
-
 
 def import_functional(
     analysis: analyses.models.Analysis,
@@ -394,7 +356,8 @@ def import_functional(
                 parent_identifier=analysis.accession,
                 short_description=f"{schema.function_summary_folder_name} functional profile table",
                 long_description="Table with read counts for each functional assignment",
-            )
+            ),
+            save=False,
         )
 
     if schema.expect_raw:
@@ -408,7 +371,8 @@ def import_functional(
                 parent_identifier=analysis.accession,
                 short_description=f"{schema.function_summary_folder_name} raw HMMer output",
                 long_description="HMMer output table with hit details",
-            )
+            ),
+            save=False,
         )
 
     analysis.save()
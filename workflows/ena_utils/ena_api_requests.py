@@ -1,15 +1,20 @@
+import asyncio
 import operator
 from datetime import timedelta
 from functools import reduce
-from typing import List, Optional, Type, Union, Literal
+from typing import Dict, List, Optional, Tuple, Type, Union, Literal
 
 from django.conf import settings
-from httpx import Auth
+from django.db import transaction
+from django.utils.timezone import now
+from httpx import AsyncClient, Auth
 from prefect import flow, get_run_logger, task
 from prefect.tasks import task_input_hash
+from prefect.utilities.asyncutils import run_coro_as_sync
 
 import analyses.models
 import ena.models
+from analyses.signals import send_bulk_saved
 from emgapiv2.dict_utils import some
 from emgapiv2.enum_utils import FutureStrEnum
 from workflows.ena_utils.abstract import ENAPortalResultType
@@ -20,7 +25,11 @@ from workflows.ena_utils.ena_accession_matching import (
 )
 from workflows.ena_utils.ena_auth import dcc_auth
 from workflows.ena_utils.read_run import ENAReadRunFields, ENAReadRunQuery
-from workflows.ena_utils.requestors import ENAAPIRequest, ENAAvailabilityException
+from workflows.ena_utils.requestors import (
+    ENAAPIRequest,
+    ENAAvailabilityException,
+    ena_portal_async_client,
+)
 from workflows.ena_utils.study import ENAStudyQuery, ENAStudyFields
 
 ALLOWED_LIBRARY_SOURCE: list = ["METAGENOMIC", "METATRANSCRIPTOMIC"]
@@ -70,8 +79,8 @@ def get_study_from_ena(accession: str, limit: int = 10) -> ena.models.Study:
 
     logger.info(f"Will fetch from ENA Portal API Study {accession}")
 
-    is_public = is_ena_study_public(accession)
-    is_private = not is_public and is_ena_study_available_privately(accession)
+    is_public, is_available_privately = get_ena_study_availability(accession)
+    is_private = not is_public and is_available_privately
 
     if not (is_private or is_public):
         raise ENAAvailabilityException(
@@ -259,6 +268,209 @@ def _make_samples_and_run(
     return ena_sample, mgnify_sample, run
 
 
+def _bulk_make_samples_and_runs(
+    run_responses: List[dict],
+    study: analyses.models.Study,
+    extra_run_metadata: Optional[List[dict]] = None,
+) -> List[analyses.models.Run]:
+    """
+    Set-based equivalent of `_make_samples_and_run`, for many portal API read-run records at once.
+    Existing objects are found with one query per model (by accession overlap), and everything is written with
+    bulk creates/updates in one transaction, so the number of queries does not grow with the number of runs.
+
+    :param run_responses: Read-run records from the ENA Portal API.
+    :param study: MGnify study the runs belong to.
+    :param extra_run_metadata: Optional list (parallel to run_responses) of extra metadata for each run.
+    :return: Runs created or updated, in the same order as run_responses.
+    """
+    _ = ENAReadRunFields
+    extra_run_metadata = extra_run_metadata or [{}] * len(run_responses)
+    checked_at = now()
+
+    def sample_accessions(response: dict) -> List[str]:
+        accessions = [
+            response[_.SAMPLE_ACCESSION],
+            response[_.SECONDARY_SAMPLE_ACCESSION],
+        ]
+        return list(dict.fromkeys(filter(None, accessions)))
+
+    with transaction.atomic():
+        # ENA samples
+        ena_samples_by_accession = {
+            ena_sample.accession: ena_sample
+            for ena_sample in ena.models.Sample.objects.filter(
+                accession__in={
+                    accession
+                    for response in run_responses
+                    for accession in sample_accessions(response)
+                }
+            )
+        }
+        ena_samples_to_create = {}
+        ena_samples_to_update = {}
+        ena_sample_for_response = []
+        for response in run_responses:
+            accessions = sample_accessions(response)
+            ena_sample = next(
+                (
+                    ena_samples_by_accession[accession]
+                    for accession in accessions
+                    if accession in ena_samples_by_accession
+                ),
+                None,
+            )
+            if ena_sample is None:
+                ena_sample = ena.models.Sample(
+                    accession=response[_.SAMPLE_ACCESSION],
+                    additional_accessions=[response[_.SECONDARY_SAMPLE_ACCESSION]],
+                    study=study.ena_study,  # TODO could be more than one...
+                )
+                ena_samples_to_create[ena_sample.accession] = ena_sample
+                for accession in accessions:
+                    ena_samples_by_accession[accession] = ena_sample
+            elif ena_sample.accession not in ena_samples_to_create:
+                ena_samples_to_update[ena_sample.accession] = ena_sample
+            ena_sample.metadata = some(response, {_.SAMPLE_TITLE, _.LAT, _.LON})
+            ena_sample.fetched_at = checked_at
+            ena_sample_for_response.append(ena_sample)
+
+        ena.models.Sample.objects.bulk_create(ena_samples_to_create.values())
+        ena.models.Sample.objects.bulk_update(
+            ena_samples_to_update.values(), ["metadata", "fetched_at"]
+        )
+
+        # MGnify samples
+        samples_by_accession = {
+            accession: sample
+            for sample in analyses.models.Sample.objects.filter(
+                ena_accessions__overlap=list(
+                    {
+                        accession
+                        for response in run_responses
+                        for accession in sample_accessions(response)
+                    }
+                )
+            )
+            for accession in sample.ena_accessions
+        }
+        samples_to_create = {}
+        samples_to_update = {}
+        sample_for_response = []
+        for response, ena_sample in zip(run_responses, ena_sample_for_response):
+            accessions = sample_accessions(response)
+            sample = next(
+                (
+                    samples_by_accession[accession]
+                    for accession in accessions
+                    if accession in samples_by_accession
+                ),
+                None,
+            )
+            if sample is None:
+                sample = analyses.models.Sample(
+                    ena_sample=ena_sample,
+                    ena_study=study.ena_study,
+                    ena_accessions=accessions,
+                )
+                samples_to_create[id(sample)] = sample
+            else:
+                sample.ena_accessions = list(
+                    dict.fromkeys(sample.ena_accessions + accessions)
+                )
+                sample.updated_at = checked_at
+                if id(sample) not in samples_to_create:
+                    samples_to_update[sample.pk] = sample
+            for accession in accessions:
+                samples_by_accession[accession] = sample
+            sample.is_private = study.is_private
+            sample.metadata = some(response, {_.LAT, _.LON})
+            sample_for_response.append(sample)
+
+        analyses.models.Sample.objects.bulk_create(samples_to_create.values())
+        analyses.models.Sample.objects.bulk_update(
+            samples_to_update.values(),
+            ["ena_accessions", "is_private", "metadata", "updated_at"],
+        )
+        send_bulk_saved(
+            analyses.models.Sample,
+            [*samples_to_create.values(), *samples_to_update.values()],
+        )
+        analyses.models.Sample.studies.through.objects.bulk_create(
+            [
+                analyses.models.Sample.studies.through(
+                    sample_id=sample.pk, study_id=study.pk
+                )
+                for sample in {
+                    sample.pk: sample for sample in sample_for_response
+                }.values()
+            ],
+            ignore_conflicts=True,
+        )
+
+        # Runs
+        runs_by_accession = {
+            accession: run
+            for run in analyses.models.Run.objects.filter(
+                ena_accessions__overlap=[
+                    response[_.RUN_ACCESSION] for response in run_responses
+                ]
+            )
+            for accession in run.ena_accessions
+        }
+        runs_to_create = {}
+        runs_to_update = {}
+        runs = []
+        for response, sample, extra_metadata in zip(
+            run_responses, sample_for_response, extra_run_metadata
+        ):
+            run_accession = response[_.RUN_ACCESSION]
+            run = runs_by_accession.get(run_accession)
+            if run is None:
+                run = analyses.models.Run(
+                    ena_accessions=[run_accession],
+                    study=study,
+                    ena_study=study.ena_study,
+                    sample=sample,
+                )
+                runs_to_create[run_accession] = run
+                runs_by_accession[run_accession] = run
+            elif run_accession not in runs_to_create:
+                run.updated_at = checked_at
+                runs_to_update[run.pk] = run
+            run.metadata = {
+                **some(
+                    response,
+                    {
+                        _.LIBRARY_STRATEGY,
+                        _.LIBRARY_LAYOUT,
+                        _.LIBRARY_SOURCE,
+                        _.SCIENTIFIC_NAME,
+                        _.HOST_TAX_ID,
+                        _.HOST_SCIENTIFIC_NAME,
+                        _.INSTRUMENT_PLATFORM,
+                        _.INSTRUMENT_MODEL,
+                    },
+                ),
+                **extra_metadata,
+            }
+            run.is_private = study.is_private
+            run.set_experiment_type_by_metadata(
+                response[_.LIBRARY_STRATEGY], response[_.LIBRARY_SOURCE], save=False
+            )
+            runs.append(run)
+
+        analyses.models.Run.objects.bulk_create(runs_to_create.values())
+        analyses.models.Run.objects.bulk_update(
+            runs_to_update.values(),
+            ["metadata", "is_private", "experiment_type", "updated_at"],
+        )
+        send_bulk_saved(
+            analyses.models.Run, [*runs_to_create.values(), *runs_to_update.values()]
+        )
+
+    return runs
+
+
 @task(
     retries=RETRIES,
     retry_delay_seconds=RETRY_DELAY,
@@ -268,7 +480,7 @@ def _make_samples_and_run(
 )
 def get_study_readruns_from_ena(
     accession: str,
-    limit: int = 20,
+    limit: Optional[int] = 20,
     filter_library_strategy: list[str] = None,
     raise_on_empty: bool = True,
 ) -> List[str]:
@@ -277,7 +489,7 @@ def get_study_readruns_from_ena(
     Only read_runs with the matching library strategy metadata will be fetched.
 
     :param accession: Study accession on ENA
-    :param limit: Maximum number of read_runs to fetch
+    :param limit: Maximum number of read_runs to fetch (0 or None for all). They are fetched in pages, so may be many.
     :param filter_library_strategy: E.g. ["AMPLICON"], to only fetch library-strategy: amplicon reads
     :param raise_on_empty: Raise an exception if no read_runs are found for the given study (default True, as some ENA failure modes may result in no read_runs being returned)
     :return: A list of run accessions that have been fetched and matched the specified library strategy. Study may also contain other non-matching runs.
@@ -329,9 +541,22 @@ def get_study_readruns_from_ena(
         ],
         limit=limit,
         query=query,
-    ).get(auth=ena_auth, raise_on_empty=raise_on_empty)
+        format=EMG_CONFIG.ena.portal_search_api_records_format,
+    ).iter_records(auth=ena_auth, raise_on_empty=raise_on_empty)
 
     run_accessions = []
+    valid_read_runs = []
+    extra_run_metadata = []
+
+    def import_valid_read_runs():
+        logger.info(f"Creating objects for {len(valid_read_runs)} runs")
+        runs = _bulk_make_samples_and_runs(
+            valid_read_runs, mgys_study, extra_run_metadata
+        )
+        run_accessions.extend(run.first_accession for run in runs)
+        valid_read_runs.clear()
+        extra_run_metadata.clear()
+
     for read_run in portal_read_runs:
         # check scientific name and metagenome source
         if (
@@ -356,26 +581,40 @@ def get_study_readruns_from_ena(
             )
             continue
 
-        logger.info(f"Creating objects for {read_run[_.RUN_ACCESSION]}")
-
-        __, __, run = _make_samples_and_run(read_run, mgys_study)
-        run.metadata[analyses.models.Run.CommonMetadataKeys.FASTQ_FTPS] = (
-            fastq_ftp_reads
-        )
+        run_metadata = {
+            analyses.models.Run.CommonMetadataKeys.FASTQ_FTPS: fastq_ftp_reads
+        }
         if not inferred_library_layout == read_run[_.LIBRARY_LAYOUT]:
             logger.warning(
                 f"Using inferred library layout of {inferred_library_layout} for {read_run[_.RUN_ACCESSION]} instead of metadata-provided {read_run[_.LIBRARY_LAYOUT]}."
             )
-            run.metadata[
+            run_metadata[
                 analyses.models.Run.CommonMetadataKeys.INFERRED_LIBRARY_LAYOUT
             ] = inferred_library_layout
-        run.save()
 
-        run_accessions.append(run.first_accession)
+        valid_read_runs.append(read_run)
+        extra_run_metadata.append(run_metadata)
+        if len(valid_read_runs) >= EMG_CONFIG.ena.portal_search_api_page_size:
+            import_valid_read_runs()
+
+    if valid_read_runs:
+        import_valid_read_runs()
 
     return run_accessions
 
 
+def _study_availability_request(accession: str) -> ENAAPIRequest:
+    return ENAAPIRequest(
+        result=ENAPortalResultType.STUDY,
+        query=(
+            ENAStudyQuery(study_accession=accession)
+            | ENAStudyQuery(secondary_study_accession=accession)
+        ),
+        format="json",
+        fields=[ENAStudyFields.STUDY_ACCESSION],
+    )
+
+
 def is_study_available(accession: str, auth: Optional[Type[Auth]] = None) -> bool:
     logger = get_run_logger()
     logger.info(f"Checking ENA Portal for {accession}")
@@ -385,21 +624,30 @@ def is_study_available(accession: str, auth: Optional[Type[Auth]] = None) -> boo
         logger.info("Checking privately, with auth")
 
     try:
-        portal = ENAAPIRequest(
-            result=ENAPortalResultType.STUDY,
-            query=(
-                ENAStudyQuery(study_accession=accession)
-                | ENAStudyQuery(secondary_study_accession=accession)
-            ),
-            format="json",
-            fields=[ENAStudyFields.STUDY_ACCESSION],
-        ).get(auth=auth)
+        portal = _study_availability_request(accession).get(auth=auth)
     except ENAAvailabilityException as e:
         logger.info(f"Looks like an error-free empty response from ENA: {e}")
         return False
     return len(portal) > 0
 
 
+async def ais_study_available(
+    accession: str,
+    auth: Optional[Type[Auth]] = None,
+    client: Optional[AsyncClient] = None,
+) -> bool:
+    """
+    Async version of `is_study_available`, which queries all data portals concurrently.
+    """
+    try:
+        portal = await _study_availability_request(accession).aget(
+            auth=auth, client=client
+        )
+    except ENAAvailabilityException:
+        return False
+    return len(portal) > 0
+
+
 @task(
     task_run_name="Determine if {accession} is public in ENA",
     retries=RETRIES,
@@ -426,6 +674,86 @@ def is_ena_study_available_privately(accession: str):
     return is_available_privately
 
 
+async def _aget_ena_studies_availability(
+    accessions: List[str],
+) -> List[Tuple[bool, bool]]:
+    """
+    Whether each study is public, and whether it is available privately, in ENA.
+    The public and private queries, to every data portal, are made concurrently over a pool of
+    kept-alive connections, and many studies are checked at once.
+    The private query only matters for studies that are not public, so if it fails for a public study
+    the study is reported as not (also) available privately.
+    """
+    studies_at_once = asyncio.Semaphore(
+        EMG_CONFIG.ena.portal_search_api_max_connections
+    )
+    async with ena_portal_async_client() as client:
+
+        async def get_availability(accession: str) -> Tuple[bool, bool]:
+            async with studies_at_once:
+                is_public, is_available_privately = await asyncio.gather(
+                    ais_study_available(accession, client=client),
+                    ais_study_available(accession, auth=dcc_auth, client=client),
+                    return_exceptions=True,
+                )
+            if isinstance(is_public, BaseException):
+                raise is_public
+            if isinstance(is_available_privately, BaseException):
+                if not is_public:
+                    raise is_available_privately
+                is_available_privately = False
+            return is_public, is_available_privately
+
+        return await asyncio.gather(
+            *[get_availability(accession) for accession in accessions]
+        )
+
+
+@task(
+    task_run_name="Determine ENA availability of {accession}",
+    retries=RETRIES,
+    retry_delay_seconds=RETRY_DELAY,
+)
+def get_ena_study_availability(accession: str) -> Tuple[bool, bool]:
+    """
+    Determine whether a study is public, and whether it is available privately, in ENA.
+    Like is_ena_study_public and then is_ena_study_available_privately, but with all of the queries made at once,
+    so it takes about one round-trip rather than up to four.
+    :param accession: ENA study accession.
+    :return: Tuple of (is public, is available privately to the DCC account).
+    """
+    logger = get_run_logger()
+    is_public, is_available_privately = run_coro_as_sync(
+        _aget_ena_studies_availability([accession])
+    )[0]
+    logger.info(
+        f"Is {accession} public? {is_public}. "
+        f"Available privately to {EMG_CONFIG.webin.dcc_account}? {is_available_privately}"
+    )
+    return is_public, is_available_privately
+
+
+@task(
+    task_run_name="Determine ENA availability of studies",
+    retries=RETRIES,
+    retry_delay_seconds=RETRY_DELAY,
+)
+def get_ena_studies_availability(accessions: List[str]) -> Dict[str, Tuple[bool, bool]]:
+    """
+    Like get_ena_study_availability, but for (possibly many) studies, which are checked concurrently.
+    :param accessions: ENA study accessions.
+    :return: Dict of accession: (is public, is available privately to the DCC account).
+    """
+    logger = get_run_logger()
+    availabilities = dict(
+        zip(accessions, run_coro_as_sync(_aget_ena_studies_availability(accessions)))
+    )
+    logger.info(
+        f"{sum(public for public, _ in availabilities.values())} of {len(accessions)} studies are public in ENA"
+    )
+    return availabilities
+
+
 @flow
 def sync_privacy_state_of_ena_study_and_derived_objects(
     ena_study: Union[ena.models.Study, str],
@@ -435,18 +763,14 @@ def sync_privacy_state_of_ena_study_and_derived_objects(
     if isinstance(ena_study, str):
         ena_study = ena.models.Study.objects.get_ena_study(ena_study)
 
-    # call portal api to check visibility
-    public = is_ena_study_public(ena_study.accession)
+    # call portal api to check visibility, both publicly and logged in
+    # (with authentication, where the Webin account must be a member of the ENA Data Hub (dcc))
+    public, available_privately = get_ena_study_availability(ena_study.accession)
+    private = not public and available_privately
     if public:
         logger.info(f"Study {ena_study} is available publicly in ENA Portal")
-    private = None
-
-    # call portal api logged in to check if it is private
-    if not public:
-        # Use authentication, where the Webin account must be a member of the ENA Data Hub (dcc).
-        private = is_ena_study_available_privately(ena_study.accession)
-        if private:
-            logger.info(f"Study {ena_study} is available privately in ENA Portal")
+    if private:
+        logger.info(f"Study {ena_study} is available privately in ENA Portal")
 
     suppressed = not (public or private)
     if suppressed:
@@ -466,7 +790,9 @@ def sync_privacy_state_of_ena_study_and_derived_objects(
     cache_key_fn=task_input_hash,
     task_run_name="Get study assemblies from ENA: {accession}",
 )
-def get_study_assemblies_from_ena(accession: str, limit: int = 10) -> list[str]:
+def get_study_assemblies_from_ena(
+    accession: str, limit: Optional[int] = 10
+) -> list[str]:
     """
     Fetches a list of assemblies from the European Nucleotide Archive (ENA) for a given study accession.
 
@@ -478,7 +804,7 @@ def get_study_assemblies_from_ena(accession: str, limit: int = 10) -> list[str]:
     :param accession: The ENA accession identifier of the study for which to fetch assemblies.
     An analysis.study must already exist for this accession.
     :type accession: str
-    :param limit: The maximum number of assemblies to retrieve. Default is 10.
+    :param limit: The maximum number of assemblies to retrieve (0 or None for all). Default is 10.
     :type limit: int
     :return: A list of assembly accession strings fetched from ENA.
     :rtype: List[str]
@@ -493,26 +819,29 @@ def get_study_assemblies_from_ena(accession: str, limit: int = 10) -> list[str]:
     ena_auth = dcc_auth if study.is_private else None
 
     # fetch all assemblies in the "assembly study"
-    portal_assemblies = ENAAPIRequest(
-        result=ENAPortalResultType.ANALYSIS,
-        fields=[
-            _.SAMPLE_ACCESSION,
-            _.SAMPLE_TITLE,
-            _.SECONDARY_SAMPLE_ACCESSION,
-            _.RUN_ACCESSION,
-            _.ANALYSIS_ACCESSION,
-            _.COMPLETENESS_SCORE,
-            _.CONTAMINATION_SCORE,
-            _.SCIENTIFIC_NAME,
-            _.LOCATION,
-            _.LAT,
-            _.LON,
-            _.GENERATED_FTP,
-        ],
-        limit=limit,
-        query=ENAAnalysisQuery(study_accession=accession)
-        | ENAAnalysisQuery(secondary_study_accession=accession),
-    ).get(auth=ena_auth)
+    portal_assemblies = list(
+        ENAAPIRequest(
+            result=ENAPortalResultType.ANALYSIS,
+            fields=[
+                _.SAMPLE_ACCESSION,
+                _.SAMPLE_TITLE,
+                _.SECONDARY_SAMPLE_ACCESSION,
+                _.RUN_ACCESSION,
+                _.ANALYSIS_ACCESSION,
+                _.COMPLETENESS_SCORE,
+                _.CONTAMINATION_SCORE,
+                _.SCIENTIFIC_NAME,
+                _.LOCATION,
+                _.LAT,
+                _.LON,
+                _.GENERATED_FTP,
+            ],
+            limit=limit,
+            query=ENAAnalysisQuery(study_accession=accession)
+            | ENAAnalysisQuery(secondary_study_accession=accession),
+            format=EMG_CONFIG.ena.portal_search_api_records_format,
+        ).iter_records(auth=ena_auth)
+    )
 
     # read-runs may exist in same study as the assemblies
     portal_runs = get_study_readruns_from_ena(
@@ -1,5 +1,19 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from json import JSONDecodeError
-from typing import Union, List, Optional, Literal, Type, Dict, Any
+from typing import (
+    Union,
+    List,
+    Optional,
+    Literal,
+    Type,
+    Dict,
+    Any,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+)
 
 from django.conf import settings
 import httpx
@@ -22,6 +36,50 @@ from workflows.ena_utils.analysis import ENAAnalysisFields, ENAAnalysisQuery
 
 EMG_CONFIG = settings.EMG_CONFIG
 
+_ena_portal_client: Optional[httpx.Client] = None
+_ena_portal_client_lock = threading.Lock()
+
+
+def _ena_portal_client_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=EMG_CONFIG.ena.portal_search_api_max_connections,
+        max_keepalive_connections=EMG_CONFIG.ena.portal_search_api_max_connections,
+    )
+
+
+def get_ena_portal_client() -> httpx.Client:
+    """
+    A process-wide HTTP client for the ENA Portal API, so that connections (and TLS sessions) are kept alive
+    and reused between requests, rather than opened for every request.
+    """
+    global _ena_portal_client
+    with _ena_portal_client_lock:
+        if _ena_portal_client is None or _ena_portal_client.is_closed:
+            _ena_portal_client = httpx.Client(
+                http2=True,
+                limits=_ena_portal_client_limits(),
+                timeout=EMG_CONFIG.ena.portal_search_api_timeout_seconds,
+            )
+        return _ena_portal_client
+
+
+@asynccontextmanager
+async def ena_portal_async_client() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    An async HTTP client for the ENA Portal API, to share between concurrent `ENAAPIRequest.aget` calls.
+    (Async clients are bound to an event loop, so unlike `get_ena_portal_client` these are not process-wide.)
+
+    E.g.
+        async with ena_portal_async_client() as client:
+            results = await asyncio.gather(*[request.aget(client=client) for request in requests])
+    """
+    async with httpx.AsyncClient(
+        http2=True,
+        limits=_ena_portal_client_limits(),
+        timeout=EMG_CONFIG.ena.portal_search_api_timeout_seconds,
+    ) as client:
+        yield client
+
 
 class ENAAPIRequest(BaseModel):
     result: ENAPortalResultType
@@ -104,29 +162,145 @@ class ENAAPIRequest(BaseModel):
             if isinstance(j, dict) and "message" in j:
                 raise ENAAccessException(f"Error response: {j['message']}")
             return j
-        return response.text  # TODO: tsv
+        return list(_parse_tsv_lines(response.iter_lines()))
+
+    def _check_portal_response(
+        self, portal: ENAPortalDataPortal, r: httpx.Response, raise_on_empty: bool
+    ) -> Optional[Union[List[Dict[str, Any]], str]]:
+        """
+        Parse a response from one of the data portals, or None if it is empty and another portal should be used.
+        """
+        if httpx.codes.is_error(r.status_code):
+            raise ENAAccessException(r.text)
+        response = self._parse_response(r)
+        if isinstance(response, list) and len(response) == 0:
+            if portal != self.data_portals[-1]:
+                return None
+            elif raise_on_empty:
+                raise ENAAvailabilityException("Empty response.")
+        return response
+
+    def _portal_params(self, portal: ENAPortalDataPortal) -> Dict[str, Any]:
+        params = self.model_dump(by_alias=True)
+        params["dataPortal"] = portal.value
+        return params
 
     def get(
         self, auth: Type[Auth] = None, raise_on_empty: bool = True
     ) -> Union[List[Dict[str, Any]], str]:
         url = EMG_CONFIG.ena.portal_search_api
-        params = self.model_dump(by_alias=True)
+        client = get_ena_portal_client()
         for portal in self.data_portals:
-            params["dataPortal"] = portal.value
-            r = httpx.get(
-                url=url,
-                params=params,
+            r = client.get(
+                url=str(url),
+                params=self._portal_params(portal),
                 auth=auth,
             )
+            response = self._check_portal_response(portal, r, raise_on_empty)
+            if response is not None:
+                return response
+
+    def _iter_page(
+        self,
+        client: httpx.Client,
+        portal: ENAPortalDataPortal,
+        auth: Optional[Type[Auth]],
+        limit: int,
+        offset: int,
+    ) -> Iterator[Dict[str, Any]]:
+        params = self._portal_params(portal)
+        params["limit"] = limit
+        if offset:
+            params["offset"] = offset
+        url = str(EMG_CONFIG.ena.portal_search_api)
+
+        if self.format == "json":
+            r = client.get(url=url, params=params, auth=auth)
+            if httpx.codes.is_error(r.status_code):
+                raise ENAAccessException(r.text)
+            yield from self._parse_response(r)
+            return
+
+        with client.stream("GET", url=url, params=params, auth=auth) as r:
             if httpx.codes.is_error(r.status_code):
+                r.read()
                 raise ENAAccessException(r.text)
-            response = self._parse_response(r)
-            if isinstance(response, list) and len(response) == 0:
-                if portal != self.data_portals[-1]:
-                    continue
-                elif raise_on_empty:
-                    raise ENAAvailabilityException("Empty response.")
-            return response
+            yield from _parse_tsv_lines(r.iter_lines())
+
+    def iter_records(
+        self,
+        auth: Type[Auth] = None,
+        raise_on_empty: bool = True,
+        page_size: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Like `get`, but yields the result records one at a time, fetching them in pages (with `offset`)
+        of `page_size` until `limit` records (or all records, if there is no limit) have been fetched.
+        In TSV format, each page is streamed and parsed line by line, so memory use does not grow with
+        the number of records.
+        :param page_size: Max records per request. Default is the config's `portal_search_api_page_size`.
+        """
+        page_size = page_size or EMG_CONFIG.ena.portal_search_api_page_size
+        client = get_ena_portal_client()
+        for portal in self.data_portals:
+            offset = 0
+            while True:
+                page_limit = (
+                    min(page_size, self.limit - offset) if self.limit else page_size
+                )
+                page_count = 0
+                for record in self._iter_page(client, portal, auth, page_limit, offset):
+                    page_count += 1
+                    yield record
+                offset += page_count
+                if page_count < page_limit or (self.limit and offset >= self.limit):
+                    break
+            if offset:
+                # records found in this portal, so no need to try the others
+                return
+        if raise_on_empty:
+            raise ENAAvailabilityException("Empty response.")
+
+    async def aget(
+        self,
+        auth: Type[Auth] = None,
+        raise_on_empty: bool = True,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> Union[List[Dict[str, Any]], str]:
+        """
+        Like `get`, but queries all the data portals concurrently rather than one after another.
+        The result is the same: that of the first portal (in order) with a non-empty response.
+        :param client: An async client to share between requests, e.g. from `ena_portal_async_client()`.
+        """
+        if client is None:
+            async with ena_portal_async_client() as client:
+                return await self.aget(auth, raise_on_empty, client)
+
+        url = str(EMG_CONFIG.ena.portal_search_api)
+        responses = await asyncio.gather(
+            *[
+                client.get(url=url, params=self._portal_params(portal), auth=auth)
+                for portal in self.data_portals
+            ]
+        )
+        for portal, r in zip(self.data_portals, responses):
+            response = self._check_portal_response(portal, r, raise_on_empty)
+            if response is not None:
+                return response
+
+
+def _parse_tsv_lines(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """
+    Parse lines of a TSV portal response (a header line, then a line per record) into dicts, lazily.
+    """
+    lines = iter(lines)
+    header = next(lines, "")
+    if not header:
+        return
+    columns = header.split("\t")
+    for line in lines:
+        if line:
+            yield dict(zip(columns, line.split("\t")))
 
 
 class ENAAccessException(Exception): ...
@@ -7,6 +7,7 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+from workflows.data_io_utils import legacy_emg_dbs
 from workflows.data_io_utils.legacy_emg_dbs import (
     LegacyAnalysisJob,
     LegacyAnalysisJobDownload,
@@ -153,9 +154,12 @@ def mock_mongo_client_for_taxonomy(monkeypatch):
     mock_collection = mock.MagicMock()
 
     mock_collection.find_one.return_value = mock_mgya_data
+    mock_collection.find.return_value = [mock_mgya_data]
     mock_db.analysis_job_taxonomy = mock_collection
     mock_client.__getitem__.return_value = mock_db
 
     monkeypatch.setattr(pymongo, "MongoClient", lambda *args, **kwargs: mock_client)
+    # the legacy mongo client is shared by the process, so make sure this mock one is used
+    monkeypatch.setattr(legacy_emg_dbs, "_legacy_mongo_client", None)
 
     return mock_client
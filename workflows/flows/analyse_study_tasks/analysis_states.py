@@ -1,15 +1,50 @@
+from typing import Iterable
+
 from prefect import task
 
 import analyses.models
+from workflows.prefect_utils.analyses_models_helpers import mark_analyses_status
 
 AnalysisStates = analyses.models.Analysis.AnalysisStates
 
 
 @task(log_prints=True)
-def mark_analysis_as_started(analysis: analyses.models.Analysis):
-    analysis.mark_status(AnalysisStates.ANALYSIS_STARTED)
+def mark_analyses_as_started(analyses_to_mark: Iterable[analyses.models.Analysis]):
+    mark_analyses_status(analyses_to_mark, AnalysisStates.ANALYSIS_STARTED)
+
+
+@task(log_prints=True)
+def mark_analyses_as_failed(analyses_to_mark: Iterable[analyses.models.Analysis]):
+    mark_analyses_status(analyses_to_mark, AnalysisStates.ANALYSIS_FAILED)
+
+
+@task(log_prints=True)
+def mark_analyses_as_imported(analyses_to_mark: Iterable[analyses.models.Analysis]):
+    """
+    Mark analyses whose annotations are imported and whose results are copied, which makes them ready.
+    """
+    mark_analyses_status(
+        analyses_to_mark,
+        AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED,
+        unset_statuses=[
+            AnalysisStates.ANALYSIS_QC_FAILED,
+            AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
+            AnalysisStates.ANALYSIS_BLOCKED,
+        ],
+    )
 
 
 @task(log_prints=True)
-def mark_analysis_as_failed(analysis: analyses.models.Analysis):
-    analysis.mark_status(AnalysisStates.ANALYSIS_FAILED)
+def mark_analyses_as_failed_results_copy(
+    analyses_to_mark: Iterable[analyses.models.Analysis], reason: str
+):
+    """
+    Mark analyses whose results could not be copied as failing their post-analysis sanity check,
+    and as not imported, so that they are never ready without their results.
+    """
+    mark_analyses_status(
+        analyses_to_mark,
+        AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
+        reason=reason,
+        unset_statuses=[AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED],
+    )
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import List, Tuple
 
 from prefect import task
 
@@ -8,23 +9,48 @@ from workflows.data_io_utils.filenames import (
 )
 from workflows.flows.analyse_study_tasks.shared.study_summary import STUDY_SUMMARY_TSV
 from workflows.prefect_utils.build_cli_command import cli_command
-from workflows.prefect_utils.datamovers import move_data
+from workflows.prefect_utils.datamovers import move_data, move_data_batch
 
 from activate_django_first import EMG_CONFIG
 
 from analyses.models import Analysis, Study
+from analyses.signals import send_bulk_saved
 
 
-@task(
-    name="Copy V6 Pipeline Results",
-    task_run_name="Copy V6 Pipeline Results for {analysis_accession}",
-    log_prints=True,
-)
-def copy_v6_pipeline_results(analysis_accession: str):
-    analysis = Analysis.objects.get(accession=analysis_accession)
+RESULTS_FILE_EXTENSIONS = [
+    "yml",
+    "yaml",
+    "txt",
+    "tsv",
+    "mseq",
+    "html",
+    "fa",
+    "json",
+    "gz",
+    "fasta",
+    "csv",
+]
+
+
+def _results_copy_command() -> str:
+    return cli_command(
+        [
+            "rsync",
+            "-av",
+            "--include=*/",
+        ]
+        + [f"--include=*.{ext}" for ext in RESULTS_FILE_EXTENSIONS]
+        + ["--exclude=*"]
+    )
+
+
+def _results_target(analysis: Analysis) -> Tuple[str, str]:
+    """
+    Where an analysis' results should be copied to.
+    :return: Tuple of the target root (public or private results dir), and the full target dir.
+    """
     study = analysis.study
     run = analysis.run
-    source = trailing_slash_ensured_dir(analysis.results_dir)
     experiment_type_label = Analysis.ExperimentTypes(
         analysis.experiment_type
     ).label.lower()
@@ -39,34 +65,23 @@ def copy_v6_pipeline_results(analysis_accession: str):
     )
 
     target = f"{target_root}/{accession_prefix_separated_dir_path(study.first_accession, -3)}/{accession_prefix_separated_dir_path(run.first_accession, -3)}/{analysis.pipeline_version}/{experiment_type_label}"
+    return target_root, target
+
+
+@task(
+    name="Copy V6 Pipeline Results",
+    task_run_name="Copy V6 Pipeline Results for {analysis_accession}",
+    log_prints=True,
+)
+def copy_v6_pipeline_results(analysis_accession: str):
+    analysis = Analysis.objects.get(accession=analysis_accession)
+    source = trailing_slash_ensured_dir(analysis.results_dir)
+    target_root, target = _results_target(analysis)
     print(
         f"Will copy results for {analysis_accession} from {analysis.results_dir} to {target}"
     )
 
-    allowed_extensions = [
-        "yml",
-        "yaml",
-        "txt",
-        "tsv",
-        "mseq",
-        "html",
-        "fa",
-        "json",
-        "gz",
-        "fasta",
-        "csv",
-    ]
-
-    command = cli_command(
-        [
-            "rsync",
-            "-av",
-            "--include=*/",
-        ]
-        + [f"--include=*.{ext}" for ext in allowed_extensions]
-        + ["--exclude=*"]
-    )
-    move_data(source, target, command)
+    move_data(source, target, _results_copy_command())
     analysis.external_results_dir = Path(target).relative_to(target_root)
     print(
         f"Analysis {analysis} now has results at {analysis.external_results_dir} in {EMG_CONFIG.slurm.ftp_results_dir}"
@@ -74,6 +89,38 @@ def copy_v6_pipeline_results(analysis_accession: str):
     analysis.save()
 
 
+@task(
+    name="Copy V6 Pipeline Results of analyses",
+    log_prints=True,
+)
+def copy_v6_pipeline_results_of_analyses(analysis_accessions: List[str]):
+    """
+    Like copy_v6_pipeline_results, but for many analyses (e.g. a samplesheet chunk) using a single datamover job.
+    """
+    analyses = list(
+        Analysis.objects.select_related("study", "run").filter(
+            accession__in=analysis_accessions
+        )
+    )
+    if not analyses:
+        print("No analyses to copy results for")
+        return
+
+    moves = []
+    for analysis in analyses:
+        target_root, target = _results_target(analysis)
+        moves.append((trailing_slash_ensured_dir(analysis.results_dir), target))
+        analysis.external_results_dir = str(Path(target).relative_to(target_root))
+    print(
+        f"Will copy results for {len(moves)} analyses, e.g. {moves[0][0]} to {moves[0][1]}"
+    )
+
+    move_data_batch(moves, _results_copy_command())
+    Analysis.objects.bulk_update(analyses, ["external_results_dir"])
+    send_bulk_saved(Analysis, analyses)
+    print(f"{len(analyses)} analyses now have results in their external_results_dir")
+
+
 @task(name="Copy V6 Study Summaries", log_prints=True)
 def copy_v6_study_summaries(study_accession: str):
     study = Study.objects.get(accession=study_accession)
@@ -9,32 +9,49 @@ from workflows.data_io_utils.mgnify_v6_utils.amplicon import (
     import_taxonomy,
     import_asv,
 )
-from workflows.flows.analyse_study_tasks.analysis_states import AnalysisStates
+from workflows.flows.analyse_study_tasks.analysis_states import (
+    AnalysisStates,
+    mark_analyses_as_failed_results_copy,
+    mark_analyses_as_imported,
+)
 from workflows.flows.analyse_study_tasks.copy_v6_pipeline_results import (
     copy_v6_pipeline_results,
+    copy_v6_pipeline_results_of_analyses,
+)
+from workflows.flows.analyse_study_tasks.shared.import_analyses import (
+    import_analyses_concurrently,
 )
 from workflows.prefect_utils.analyses_models_helpers import mark_analysis_status
 
 
 @task
-def import_completed_analysis(analysis: analyses.models.Analysis):
+def import_completed_analysis(
+    analysis: analyses.models.Analysis, copy_results: bool = True
+):
     analysis.refresh_from_db()
     dir_for_analysis = Path(analysis.results_dir)
 
-    import_qc(analysis, dir_for_analysis, allow_non_exist=False)
+    # downloads are saved once, after all the imports, rather than as each is added
+    with analysis.downloads_saved_once():
+        import_qc(analysis, dir_for_analysis, allow_non_exist=False)
 
-    t = analyses.models.Analysis.TaxonomySources
-    for source in [
-        t.UNITE,
-        t.DADA2_PR2,
-        t.DADA2_SILVA,
-        t.ITS_ONE_DB,
-        t.LSU,
-        t.SSU,
-        t.PR2,
-    ]:
-        import_taxonomy(analysis, dir_for_analysis, source=source, allow_non_exist=True)
-    import_asv(analysis, dir_for_analysis)
+        t = analyses.models.Analysis.TaxonomySources
+        for source in [
+            t.UNITE,
+            t.DADA2_PR2,
+            t.DADA2_SILVA,
+            t.ITS_ONE_DB,
+            t.LSU,
+            t.SSU,
+            t.PR2,
+        ]:
+            import_taxonomy(
+                analysis, dir_for_analysis, source=source, allow_non_exist=True
+            )
+        import_asv(analysis, dir_for_analysis)
+    if not copy_results:
+        # the caller copies the results of many analyses at once, and then marks them as imported
+        return
     copy_v6_pipeline_results(analysis.accession)
     mark_analysis_status(
         analysis,
@@ -52,6 +69,7 @@ def import_completed_analysis(analysis: analyses.models.Analysis):
 def import_completed_analyses(
     amplicon_current_outdir: Path, amplicon_analyses: List[analyses.models.Analysis]
 ):
+    analyses_to_import = []
     for analysis in amplicon_analyses:
         analysis.refresh_from_db()
         if not analysis.status.get(AnalysisStates.ANALYSIS_COMPLETED):
@@ -69,12 +87,22 @@ def import_completed_analyses(
         analysis.results_dir = str(dir_for_analysis)
         analysis.save()
 
-        try:
-            import_completed_analysis(analysis)
-        except Exception as e:
-            # TODO: there shouldn't really be cases where sanity passes but import fails... but currently there are.
-            print(f"{analysis} failed import! {e}")
-            analysis.mark_status(
-                analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
-                reason=f"Failed during import: {e}",
-            )
+        analyses_to_import.append(analysis)
+
+    # results are copied for the whole chunk at once, below, and only then are the analyses marked as imported
+    imported_analyses = import_analyses_concurrently(
+        lambda analysis: import_completed_analysis(analysis, copy_results=False),
+        analyses_to_import,
+    )
+
+    try:
+        copy_v6_pipeline_results_of_analyses(
+            [analysis.accession for analysis in imported_analyses]
+        )
+    except Exception as e:
+        print(f"Failed to copy results of {len(imported_analyses)} analyses! {e}")
+        mark_analyses_as_failed_results_copy(
+            imported_analyses, reason=f"Failed during results copy: {e}"
+        )
+    else:
+        mark_analyses_as_imported(imported_analyses)
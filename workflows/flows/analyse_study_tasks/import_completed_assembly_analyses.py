@@ -10,6 +10,9 @@ from workflows.data_io_utils.mgnify_v6_utils.assembly import (
     import_functions,
 )
 from workflows.flows.analyse_study_tasks.analysis_states import AnalysisStates
+from workflows.flows.analyse_study_tasks.shared.import_analyses import (
+    import_analyses_concurrently,
+)
 from workflows.prefect_utils.analyses_models_helpers import mark_analysis_status
 
 
@@ -22,13 +25,15 @@ def import_completed_assembly_analysis(analysis: analyses.models.Analysis):
     analysis.refresh_from_db()
     dir_for_analysis = Path(analysis.results_dir)
 
-    import_qc(analysis, dir_for_analysis, allow_non_exist=False)
+    # downloads are saved once, after all the imports, rather than as each is added
+    with analysis.downloads_saved_once():
+        import_qc(analysis, dir_for_analysis, allow_non_exist=False)
 
-    # Import taxonomy
-    import_taxonomy(analysis, dir_for_analysis)
+        # Import taxonomy
+        import_taxonomy(analysis, dir_for_analysis)
 
-    # Import functional annotations
-    import_functions(analysis, dir_for_analysis)
+        # Import functional annotations
+        import_functions(analysis, dir_for_analysis)
 
     # TODO: Import pathways
 
@@ -54,6 +59,7 @@ def import_completed_assembly_analyses(
     :param assembly_current_outdir: Path to the directory containing the pipeline output
     :param assembly_analyses: List of assembly analyses
     """
+    analyses_to_import = []
     for analysis in assembly_analyses:
         analysis.refresh_from_db()
         if not analysis.status.get(AnalysisStates.ANALYSIS_COMPLETED):
@@ -71,11 +77,6 @@ def import_completed_assembly_analyses(
         analysis.results_dir = str(dir_for_analysis)
         analysis.save()
 
-        try:
-            import_completed_assembly_analysis(analysis)
-        except Exception as e:
-            print(f"{analysis} failed import! {e}")
-            analysis.mark_status(
-                analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
-                reason=f"Failed during import: {e}",
-            )
+        analyses_to_import.append(analysis)
+
+    import_analyses_concurrently(import_completed_assembly_analysis, analyses_to_import)
@@ -9,35 +9,52 @@ from workflows.data_io_utils.mgnify_v6_utils.rawreads import (
     import_taxonomy,
     import_functional,
 )
-from workflows.flows.analyse_study_tasks.analysis_states import AnalysisStates
+from workflows.flows.analyse_study_tasks.analysis_states import (
+    AnalysisStates,
+    mark_analyses_as_failed_results_copy,
+    mark_analyses_as_imported,
+)
 from workflows.flows.analyse_study_tasks.copy_v6_pipeline_results import (
     copy_v6_pipeline_results,
+    copy_v6_pipeline_results_of_analyses,
+)
+from workflows.flows.analyse_study_tasks.shared.import_analyses import (
+    import_analyses_concurrently,
 )
 from workflows.prefect_utils.analyses_models_helpers import mark_analysis_status
 
 
 @task
-def import_completed_analysis(analysis: analyses.models.Analysis):
+def import_completed_analysis(
+    analysis: analyses.models.Analysis, copy_results: bool = True
+):
     analysis.refresh_from_db()
     dir_for_analysis = Path(analysis.results_dir)
 
-    import_qc(analysis, dir_for_analysis, allow_non_exist=False)
+    # downloads are saved once, after all the imports, rather than as each is added
+    with analysis.downloads_saved_once():
+        import_qc(analysis, dir_for_analysis, allow_non_exist=False)
 
-    t = analyses.models.Analysis.TaxonomySources
-    for source in [
-        t.MOTUS,
-        t.LSU,
-        t.SSU,
-    ]:
-        import_taxonomy(analysis, dir_for_analysis, source=source, allow_non_exist=True)
-    t = analyses.models.Analysis.FunctionalSources
-    for source in [
-        t.PFAM,
-    ]:
-        import_functional(
-            analysis, dir_for_analysis, source=source, allow_non_exist=True
-        )
+        t = analyses.models.Analysis.TaxonomySources
+        for source in [
+            t.MOTUS,
+            t.LSU,
+            t.SSU,
+        ]:
+            import_taxonomy(
+                analysis, dir_for_analysis, source=source, allow_non_exist=True
+            )
+        t = analyses.models.Analysis.FunctionalSources
+        for source in [
+            t.PFAM,
+        ]:
+            import_functional(
+                analysis, dir_for_analysis, source=source, allow_non_exist=True
+            )
 
+    if not copy_results:
+        # the caller copies the results of many analyses at once, and then marks them as imported
+        return
     copy_v6_pipeline_results(analysis.accession)
     mark_analysis_status(
         analysis,
@@ -56,6 +73,7 @@ def import_completed_analyses(
 ):
     logger = get_run_logger()
 
+    analyses_to_import = []
     for analysis in rawreads_analyses:
         analysis.refresh_from_db()
         if not analysis.status.get(AnalysisStates.ANALYSIS_COMPLETED):
@@ -76,12 +94,24 @@ def import_completed_analyses(
         analysis.results_dir = str(dir_for_analysis)
         analysis.save()
 
-        try:
-            import_completed_analysis(analysis)
-        except Exception as e:
-            # TODO: there shouldn't really be cases where sanity passes but import fails... but currently there are.
-            logger.warning(f"{analysis} failed import! {e}")
-            analysis.mark_status(
-                analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
-                reason=f"Failed during import: {e}",
-            )
+        analyses_to_import.append(analysis)
+
+    # results are copied for the whole chunk at once, below, and only then are the analyses marked as imported
+    imported_analyses = import_analyses_concurrently(
+        lambda analysis: import_completed_analysis(analysis, copy_results=False),
+        analyses_to_import,
+    )
+
+    try:
+        copy_v6_pipeline_results_of_analyses(
+            [analysis.accession for analysis in imported_analyses]
+        )
+    except Exception as e:
+        logger.warning(
+            f"Failed to copy results of {len(imported_analyses)} analyses! {e}"
+        )
+        mark_analyses_as_failed_results_copy(
+            imported_analyses, reason=f"Failed during results copy: {e}"
+        )
+    else:
+        mark_analyses_as_imported(imported_analyses)
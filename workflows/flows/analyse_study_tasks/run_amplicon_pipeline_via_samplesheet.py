@@ -16,8 +16,8 @@ from workflows.flows.analyse_study_tasks.make_samplesheet_amplicon import (
     make_samplesheet_amplicon,
 )
 from workflows.flows.analyse_study_tasks.analysis_states import (
-    mark_analysis_as_started,
-    mark_analysis_as_failed,
+    mark_analyses_as_started,
+    mark_analyses_as_failed,
 )
 from workflows.flows.analyse_study_tasks.set_post_analysies_states import (
     set_post_analysis_states,
@@ -47,8 +47,7 @@ def run_amplicon_pipeline_via_samplesheet(
     )
     samplesheet, ss_hash = make_samplesheet_amplicon(mgnify_study, amplicon_analyses)
 
-    for analysis in amplicon_analyses:
-        mark_analysis_as_started(analysis)
+    mark_analyses_as_started(amplicon_analyses)
 
     amplicon_current_outdir_parent = Path(
         f"{EMG_CONFIG.slurm.default_workdir}/{mgnify_study.ena_study.accession}_amplicon_v6"
@@ -92,8 +91,7 @@ def run_amplicon_pipeline_via_samplesheet(
             resubmit_policy=ResubmitIfFailedPolicy,
         )
     except ClusterJobFailedException:
-        for analysis in amplicon_analyses:
-            mark_analysis_as_failed(analysis)
+        mark_analyses_as_failed(amplicon_analyses)
     else:
         # assume that if job finished, all finished... set statuses
         set_post_analysis_states(amplicon_current_outdir, amplicon_analyses)
@@ -17,8 +17,8 @@ from workflows.flows.analyse_study_tasks.make_samplesheet_assembly import (
     make_samplesheet_assembly,
 )
 from workflows.flows.analyse_study_tasks.analysis_states import (
-    mark_analysis_as_started,
-    mark_analysis_as_failed,
+    mark_analyses_as_started,
+    mark_analyses_as_failed,
 )
 from workflows.flows.analyse_study_tasks.set_post_assembly_analysis_states import (
     set_post_assembly_analysis_states,
@@ -52,8 +52,7 @@ def run_assembly_pipeline_via_samplesheet(
     )
     samplesheet, ss_hash = make_samplesheet_assembly(mgnify_study, assembly_analyses)
 
-    for analysis in assembly_analyses:
-        mark_analysis_as_started(analysis)
+    mark_analyses_as_started(assembly_analyses)
 
     assembly_current_outdir_parent = Path(
         f"{EMG_CONFIG.slurm.default_workdir}/{mgnify_study.ena_study.accession}_assembly_v6/{flow_run.root_flow_run_id}"
@@ -111,8 +110,7 @@ def run_assembly_pipeline_via_samplesheet(
             resubmit_policy=ResubmitIfFailedPolicy,
         )
     except ClusterJobFailedException:
-        for analysis in assembly_analyses:
-            mark_analysis_as_failed(analysis)
+        mark_analyses_as_failed(assembly_analyses)
     else:
         # assume that if job finished, all finished... set statuses
         set_post_assembly_analysis_states(assembly_current_outdir, assembly_analyses)
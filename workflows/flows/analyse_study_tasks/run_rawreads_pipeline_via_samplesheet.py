@@ -16,8 +16,8 @@ from workflows.flows.analyse_study_tasks.make_samplesheet_rawreads import (
     make_samplesheet_rawreads,
 )
 from workflows.flows.analyse_study_tasks.analysis_states import (
-    mark_analysis_as_started,
-    mark_analysis_as_failed,
+    mark_analyses_as_started,
+    mark_analyses_as_failed,
 )
 from workflows.flows.analyse_study_tasks.set_rawreads_post_analysis_states import (
     set_post_analysis_states,
@@ -44,8 +44,7 @@ def run_rawreads_pipeline_via_samplesheet(
     )
     samplesheet, ss_hash = make_samplesheet_rawreads(mgnify_study, rawreads_analyses)
 
-    for analysis in rawreads_analyses:
-        mark_analysis_as_started(analysis)
+    mark_analyses_as_started(rawreads_analyses)
 
     rawreads_current_outdir_parent = Path(
         f"{EMG_CONFIG.slurm.default_workdir}/{mgnify_study.ena_study.accession}_rawreads_v6"
@@ -90,8 +89,7 @@ def run_rawreads_pipeline_via_samplesheet(
             resubmit_policy=ResubmitIfFailedPolicy,
         )
     except ClusterJobFailedException:
-        for analysis in rawreads_analyses:
-            mark_analysis_as_failed(analysis)
+        mark_analyses_as_failed(rawreads_analyses)
     else:
         # assume that if job finished, all finished... set statuses
         set_post_analysis_states(rawreads_current_outdir, rawreads_analyses)
@@ -7,6 +7,14 @@ from prefect.tasks import task_input_hash
 from activate_django_first import EMG_CONFIG
 
 import analyses.models
+from workflows.data_io_utils.file_rules.common_rules import (
+    FileExistsRule,
+    FileIsNotEmptyRule,
+)
+from workflows.data_io_utils.file_rules.mgnify_v6_result_rules import (
+    FileConformsToTaxonomyTSVSchemaRule,
+)
+from workflows.data_io_utils.file_rules.validation import validate_result_tree
 from workflows.flows.analyse_study_tasks.analysis_states import AnalysisStates
 from workflows.prefect_utils.analyses_models_helpers import mark_analysis_status
 
@@ -280,6 +288,22 @@ def sanity_check_amplicon_results(
             else:
                 reason = f"unknown {db} in {EMG_CONFIG.amplicon_pipeline.taxonomy_summary_folder}"
 
+    # taxonomy tables are validated with the same rules as on import, so the import reuses these outcomes
+    invalid_tables = validate_result_tree(
+        taxonomy_summary_folder,
+        {
+            f"*/{run_id}_*.tsv": [
+                FileExistsRule,
+                FileIsNotEmptyRule,
+                FileConformsToTaxonomyTSVSchemaRule,
+            ]
+        },
+        max_workers=EMG_CONFIG.results_import.file_validation_workers,
+    )
+    for table, failed_rule_names in invalid_tables.items():
+        reason = f"Invalid {table.name}: {', '.join(failed_rule_names)}"
+        logger.info(f"Post sanity check for {run_id}: {reason}")
+
     # QC mandatory folder
     if qc_folder.exists():
         if not Path(f"{qc_folder}/{analysis.run.first_accession}_seqfu.tsv").exists():
@@ -7,6 +7,15 @@ from prefect.tasks import task_input_hash
 from activate_django_first import EMG_CONFIG
 
 import analyses.models
+from workflows.data_io_utils.file_rules.common_rules import (
+    FileExistsRule,
+    FileIsNotEmptyRule,
+)
+from workflows.data_io_utils.file_rules.mgnify_v6_result_rules import (
+    FileConformsToFunctionalTSVSchemaRule,
+    FileConformsToRawReadsTaxonomyTSVSchemaRule,
+)
+from workflows.data_io_utils.file_rules.validation import validate_result_tree
 from workflows.flows.analyse_study_tasks.analysis_states import AnalysisStates
 from workflows.prefect_utils.analyses_models_helpers import mark_analysis_status
 
@@ -105,6 +114,26 @@ def validate_decontam_folder(current_outdir, run_id, logger):
             return f"Unexpected files in {EMG_CONFIG.rawreads_pipeline.decontam_folder} phix folder"
 
 
+def validate_annotation_tables(current_outdir, run_id, logger):
+    # tables are validated with the same rules as on import, so the import reuses these outcomes
+    table_rules = [FileExistsRule, FileIsNotEmptyRule]
+    logger.info(f"Validating {run_id} annotation tables in {current_outdir}")
+
+    invalid_tables = validate_result_tree(
+        Path(current_outdir),
+        {
+            f"{EMG_CONFIG.rawreads_pipeline.taxonomy_summary_folder}/*/{run_id}_*.txt": table_rules
+            + [FileConformsToRawReadsTaxonomyTSVSchemaRule],
+            f"{EMG_CONFIG.rawreads_pipeline.function_summary_folder}/*/{run_id}_*.txt": table_rules
+            + [FileConformsToFunctionalTSVSchemaRule],
+        },
+        max_workers=EMG_CONFIG.results_import.file_validation_workers,
+    )
+    if invalid_tables:
+        table, failed_rule_names = next(iter(invalid_tables.items()))
+        return f"Invalid {table.name}: {', '.join(failed_rule_names)}"
+
+
 @task(
     cache_key_fn=task_input_hash,
 )
@@ -161,6 +190,7 @@ def sanity_check_rawreads_results(
         validate_funcational_summary_folder,
         validate_taxonomic_summary_folder,
         validate_qc_folder,
+        validate_annotation_tables,
     ]
 
     for validator in validators:
@@ -1,4 +1,5 @@
 import csv
+from collections import defaultdict
 from pathlib import Path
 from typing import List
 
@@ -11,7 +12,7 @@ from workflows.flows.analyse_study_tasks.analysis_states import AnalysisStates
 from workflows.flows.analyse_study_tasks.sanity_check_amplicon_results import (
     sanity_check_amplicon_results,
 )
-from workflows.prefect_utils.analyses_models_helpers import mark_analysis_status
+from workflows.prefect_utils.analyses_models_helpers import mark_analyses_status
 
 
 @task(
@@ -46,30 +47,33 @@ def set_post_analysis_states(amplicon_current_outdir: Path, amplicon_analyses: L
                 run_accession, info = row
                 qc_completed_runs[run_accession] = info
 
+    # analyses are grouped by their new status and reason, so that each group is marked in a single query
+    analyses_by_state = defaultdict(list)
     for analysis in amplicon_analyses:
-        if analysis.run.first_accession in qc_failed_runs:
-            mark_analysis_status(
-                analysis,
-                status=AnalysisStates.ANALYSIS_QC_FAILED,
-                reason=qc_failed_runs[analysis.run.first_accession],
-            )
-        elif analysis.run.first_accession in qc_completed_runs:
-            mark_analysis_status(
-                analysis,
-                status=AnalysisStates.ANALYSIS_COMPLETED,
-                reason=qc_completed_runs[analysis.run.first_accession],
-                unset_statuses=[
-                    AnalysisStates.ANALYSIS_FAILED,
-                    AnalysisStates.ANALYSIS_BLOCKED,
-                ],
-            )
+        accession = analysis.run.first_accession
+        if accession in qc_failed_runs:
+            state = (AnalysisStates.ANALYSIS_QC_FAILED, qc_failed_runs[accession])
+        elif accession in qc_completed_runs:
+            state = (AnalysisStates.ANALYSIS_COMPLETED, qc_completed_runs[accession])
+        else:
+            state = (AnalysisStates.ANALYSIS_FAILED, "Missing run in execution")
+        analyses_by_state[state].append(analysis)
+
+    for (status, reason), analyses_in_state in analyses_by_state.items():
+        mark_analyses_status(
+            analyses_in_state,
+            status=status,
+            reason=reason,
+            unset_statuses=(
+                [AnalysisStates.ANALYSIS_FAILED, AnalysisStates.ANALYSIS_BLOCKED]
+                if status == AnalysisStates.ANALYSIS_COMPLETED
+                else None
+            ),
+        )
+
+    for analysis in amplicon_analyses:
+        if analysis.run.first_accession in qc_completed_runs:
             sanity_check_amplicon_results(
                 Path(f"{amplicon_current_outdir}/{analysis.run.first_accession}"),
                 analysis,
             )
-        else:
-            mark_analysis_status(
-                analysis,
-                status=AnalysisStates.ANALYSIS_FAILED,
-                reason="Missing run in execution",
-            )
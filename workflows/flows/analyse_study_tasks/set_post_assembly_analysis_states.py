@@ -1,4 +1,5 @@
 import csv
+from collections import defaultdict
 from pathlib import Path
 from typing import List
 
@@ -7,7 +8,7 @@ from prefect.tasks import task_input_hash
 
 from workflows.flows.analyse_study_tasks.analysis_states import AnalysisStates
 
-from workflows.prefect_utils.analyses_models_helpers import mark_analysis_status
+from workflows.prefect_utils.analyses_models_helpers import mark_analyses_status
 
 
 @task(
@@ -45,26 +46,29 @@ def set_post_assembly_analysis_states(
                 assembly_accession, info = row
                 qc_completed_assemblies[assembly_accession] = info
 
+    # analyses are grouped by their new status and reason, so that each group is marked in a single query
+    analyses_by_state = defaultdict(list)
     for analysis in assembly_analyses:
-        if analysis.assembly.first_accession in qc_failed_assemblies:
-            mark_analysis_status(
-                analysis,
-                status=AnalysisStates.ANALYSIS_QC_FAILED,
-                reason=qc_failed_assemblies[analysis.assembly.first_accession],
-            )
-        elif analysis.assembly.first_accession in qc_completed_assemblies:
-            mark_analysis_status(
-                analysis,
-                status=AnalysisStates.ANALYSIS_COMPLETED,
-                reason=qc_completed_assemblies[analysis.assembly.first_accession],
-                unset_statuses=[
-                    AnalysisStates.ANALYSIS_FAILED,
-                    AnalysisStates.ANALYSIS_BLOCKED,
-                ],
+        accession = analysis.assembly.first_accession
+        if accession in qc_failed_assemblies:
+            state = (AnalysisStates.ANALYSIS_QC_FAILED, qc_failed_assemblies[accession])
+        elif accession in qc_completed_assemblies:
+            state = (
+                AnalysisStates.ANALYSIS_COMPLETED,
+                qc_completed_assemblies[accession],
             )
         else:
-            mark_analysis_status(
-                analysis,
-                status=AnalysisStates.ANALYSIS_FAILED,
-                reason="Missing assembly in execution",
-            )
+            state = (AnalysisStates.ANALYSIS_FAILED, "Missing assembly in execution")
+        analyses_by_state[state].append(analysis)
+
+    for (status, reason), analyses_in_state in analyses_by_state.items():
+        mark_analyses_status(
+            analyses_in_state,
+            status=status,
+            reason=reason,
+            unset_statuses=(
+                [AnalysisStates.ANALYSIS_FAILED, AnalysisStates.ANALYSIS_BLOCKED]
+                if status == AnalysisStates.ANALYSIS_COMPLETED
+                else None
+            ),
+        )
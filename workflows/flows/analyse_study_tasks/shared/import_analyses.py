@@ -0,0 +1,67 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from django.db import connection
+from prefect import get_run_logger
+
+from activate_django_first import EMG_CONFIG
+
+import analyses.models
+
+# shared by every import in this process, however many flows (e.g. samplesheet chunks) are importing at once
+_db_connections_budget = threading.BoundedSemaphore(
+    max(EMG_CONFIG.results_import.db_connections_budget, 1)
+)
+
+
+def import_analyses_concurrently(
+    import_analysis: Callable[[analyses.models.Analysis], None],
+    analyses_to_import: List[analyses.models.Analysis],
+) -> List[analyses.models.Analysis]:
+    """
+    Import the results of several completed analyses at once, so that their file I/O and parsing overlap.
+
+    Up to `concurrent_analysis_imports` analyses are imported at once, each in its own thread
+    (and so with its own DB connection, closed afterwards).
+    No more than `db_connections_budget` imports run at once across the whole process.
+
+    If an analysis fails to import, it is marked as failing its post-analysis sanity check,
+    and the other analyses are unaffected.
+
+    :param import_analysis: Imports a single analysis, e.g. an import_completed_analysis task.
+    :param analyses_to_import: Analyses whose results_dir is set, ready to be imported.
+    :return: The analyses that were imported successfully.
+    """
+    logger = get_run_logger()
+
+    def import_one(analysis: analyses.models.Analysis):
+        with _db_connections_budget:
+            try:
+                import_analysis(analysis)
+            finally:
+                connection.close()
+
+    max_workers = max(EMG_CONFIG.results_import.concurrent_analysis_imports, 1)
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="analysis-import"
+    ) as executor:
+        futures = [
+            # each import gets its own copy of the (prefect) context, so its tasks belong to the current flow
+            executor.submit(contextvars.copy_context().run, import_one, analysis)
+            for analysis in analyses_to_import
+        ]
+
+    imported_analyses = []
+    for analysis, future in zip(analyses_to_import, futures):
+        if e := future.exception():
+            # TODO: there shouldn't really be cases where sanity passes but import fails... but currently there are.
+            logger.warning(f"{analysis} failed import! {e}")
+            analysis.mark_status(
+                analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
+                reason=f"Failed during import: {e}",
+            )
+        else:
+            imported_analyses.append(analysis)
+    return imported_analyses
@@ -98,7 +98,7 @@ def generate_markergene_summary_for_pipeline_run(
             Analysis.ASV: asv_summary_for_ss.get(run_accession, {}),
         }
         analysis = study.analyses.get(
-            run__ena_accessions__icontains=run_accession,
+            run__ena_accessions__contains=[run_accession],
             pipeline_version=Analysis.PipelineVersions.v6,
         )
         analysis.metadata[analysis.KnownMetadataKeys.MARKER_GENE_SUMMARY] = (
@@ -0,0 +1,87 @@
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, List, Set, TypeVar, Union
+
+from django.db import connection
+from prefect import get_run_logger
+from prefect.concurrency.sync import concurrency
+
+from activate_django_first import EMG_CONFIG
+
+import analyses.models
+from workflows.prefect_utils import slurm_limits
+
+AnalysisId = TypeVar("AnalysisId", bound=Union[str, int])
+
+
+def _chunks_limit(chunk_size: int) -> int:
+    """
+    How many chunks may be running at once: the per-study limit,
+    or fewer if the cluster does not have space for that many chunks' worth of jobs (but always at least one).
+    """
+    chunks_with_space = slurm_limits.cluster_can_accept_jobs() // max(chunk_size, 1)
+    return max(
+        min(EMG_CONFIG.slurm.samplesheet_chunks_per_study_limit, chunks_with_space),
+        1,
+    )
+
+
+def run_samplesheet_chunks(
+    pipeline_flow: Callable[[analyses.models.Study, List[AnalysisId]], None],
+    mgnify_study: analyses.models.Study,
+    analyses_chunks: List[List[AnalysisId]],
+):
+    """
+    Run a samplesheet pipeline (sub)flow for each chunk of a study's analyses, several chunks at a time.
+
+    At most `samplesheet_chunks_per_study_limit` chunks of the study run at once, and fewer if
+    the cluster is nearly full (re-checked each time a chunk is started).
+    Each chunk also occupies a slot of the `samplesheet_chunks_concurrency_limit` global concurrency limit,
+    if that exists, to limit the chunks of all studies.
+
+    Returns once every chunk has finished, so that e.g. study summaries can then be merged.
+    If any chunks failed, the first failure is raised (after the other chunks have finished).
+
+    :param pipeline_flow: E.g. run_amplicon_pipeline_via_samplesheet
+    :param mgnify_study: The study the analyses belong to.
+    :param analyses_chunks: Lists of analysis IDs, each of which is one run of the pipeline_flow.
+    """
+    logger = get_run_logger()
+
+    def run_chunk(analyses_chunk: List[AnalysisId]):
+        try:
+            with concurrency(
+                EMG_CONFIG.slurm.samplesheet_chunks_concurrency_limit, occupy=1
+            ):
+                logger.info(
+                    f"Working on analyses: {analyses_chunk[0]}-{analyses_chunk[-1]}"
+                )
+                pipeline_flow(mgnify_study, analyses_chunk)
+        finally:
+            # each chunk's thread has its own DB connection
+            connection.close()
+
+    if not analyses_chunks:
+        return
+
+    max_workers = max(EMG_CONFIG.slurm.samplesheet_chunks_per_study_limit, 1)
+    running: Set[Future] = set()
+    finished: List[Future] = []
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="samplesheet-chunk"
+    ) as executor:
+        for analyses_chunk in analyses_chunks:
+            while running and len(running) >= _chunks_limit(len(analyses_chunk)):
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                finished.extend(done)
+            # copy the (prefect) context, so that each chunk's flow is a subflow of the current flow
+            context = contextvars.copy_context()
+            running.add(executor.submit(context.run, run_chunk, analyses_chunk))
+
+        done, _ = wait(running)
+        finished.extend(done)
+
+    failures = [future.exception() for future in finished if future.exception()]
+    if failures:
+        logger.error(f"{len(failures)} of {len(finished)} chunks failed")
+        raise failures[0]
@@ -29,6 +29,9 @@ from workflows.ena_utils.ena_api_requests import (
     ENALibraryStrategyPolicy,
 )
 from workflows.ena_utils.webin_owner_utils import validate_and_set_webin_owner
+from workflows.flows.analyse_study_tasks.shared.samplesheet_chunks import (
+    run_samplesheet_chunks,
+)
 from workflows.flows.analyse_study_tasks.shared.study_summary import (
     merge_study_summaries,
     add_study_summaries_to_downloads,
@@ -181,12 +184,10 @@ def analysis_amplicon_study(study_accession: str):
     chunked_runs = chunk_list(
         analyses_to_attempt, EMG_CONFIG.amplicon_pipeline.samplesheet_chunk_size
     )
-    for analyses_chunk in chunked_runs:
-        # launch jobs for all analyses in this chunk in a single flow
-        logger.info(
-            f"Working on amplicon analyses: {analyses_chunk[0]}-{analyses_chunk[-1]}"
-        )
-        run_amplicon_pipeline_via_samplesheet(mgnify_study, analyses_chunk)
+    # launch jobs for all analyses of each chunk in a single flow, running several chunks at once
+    run_samplesheet_chunks(
+        run_amplicon_pipeline_via_samplesheet, mgnify_study, chunked_runs
+    )
 
     merge_study_summaries(
         mgnify_study.accession,
@@ -202,6 +203,9 @@ def analysis_amplicon_study(study_accession: str):
     ).exists()
     mgnify_study.save()
 
+    status_summary = mgnify_study.analyses.status_summary(
+        analyses.models.Analysis.AnalysisStates
+    )
     emit_event(
         event="flow.analysis.finished",
         resource={"prefect.resource.id": f"prefect.flow-run.{flow_run.id}"},
@@ -212,24 +216,20 @@ def analysis_amplicon_study(study_accession: str):
             }
         ],
         payload={
-            "successful": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_COMPLETED]
-            ).count(),
-            "failed": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_FAILED]
-            ).count()
-            + mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_QC_FAILED]
-            ).count()
-            + mgnify_study.analyses.filter_by_statuses(
+            "successful": status_summary.count(
+                analyses.models.Analysis.AnalysisStates.ANALYSIS_COMPLETED
+            ),
+            "failed": status_summary.count_any(
                 [
-                    analyses.models.Analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_FAILED,
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_QC_FAILED,
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
                 ]
-            ).count(),
-            "imported": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
-            ).count(),
-            "total": mgnify_study.analyses.count(),
+            ),
+            "imported": status_summary.count(
+                analyses.models.Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED
+            ),
+            "total": status_summary.total,
             "study_watchers": [
                 watcher.username for watcher in mgnify_study.watchers.all()
             ],
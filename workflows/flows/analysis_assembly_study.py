@@ -26,6 +26,9 @@ from workflows.flows.analyse_study_tasks.get_analyses_to_attempt import (
 from workflows.flows.analyse_study_tasks.run_assembly_pipeline_via_samplesheet import (
     run_assembly_pipeline_via_samplesheet,
 )
+from workflows.flows.analyse_study_tasks.shared.samplesheet_chunks import (
+    run_samplesheet_chunks,
+)
 from workflows.flows.analyse_study_tasks.shared.study_summary import (
     merge_study_summaries,
     add_study_summaries_to_downloads,
@@ -130,12 +133,10 @@ def analysis_assembly_study(study_accession: str):
         analyses_to_attempt,
         EMG_CONFIG.assembly_analysis_pipeline.samplesheet_chunk_size,
     )
-    for analyses_chunk in chunked_analyses:
-        # launch jobs for all analyses in this chunk in a single flow
-        logger.info(
-            f"Working on assembly analyses: {analyses_chunk[0]}-{analyses_chunk[-1]}"
-        )
-        run_assembly_pipeline_via_samplesheet(mgnify_study, analyses_chunk)
+    # launch jobs for all analyses of each chunk in a single flow, running several chunks at once
+    run_samplesheet_chunks(
+        run_assembly_pipeline_via_samplesheet, mgnify_study, chunked_analyses
+    )
 
     merge_study_summaries(
         mgnify_study.accession,
@@ -151,6 +152,9 @@ def analysis_assembly_study(study_accession: str):
     ).exists()
     mgnify_study.save()
 
+    status_summary = mgnify_study.analyses.status_summary(
+        analyses.models.Analysis.AnalysisStates
+    )
     events.emit_event(
         event="flow.analysis.finished",
         resource={"prefect.resource.id": f"prefect.flow-run.{flow_run.id}"},
@@ -161,24 +165,20 @@ def analysis_assembly_study(study_accession: str):
             }
         ],
         payload={
-            "successful": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_COMPLETED]
-            ).count(),
-            "failed": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_FAILED]
-            ).count()
-            + mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_QC_FAILED]
-            ).count()
-            + mgnify_study.analyses.filter_by_statuses(
+            "successful": status_summary.count(
+                analyses.models.Analysis.AnalysisStates.ANALYSIS_COMPLETED
+            ),
+            "failed": status_summary.count_any(
                 [
-                    analyses.models.Analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_FAILED,
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_QC_FAILED,
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
                 ]
-            ).count(),
-            "imported": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
-            ).count(),
-            "total": mgnify_study.analyses.count(),
+            ),
+            "imported": status_summary.count(
+                analyses.models.Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED
+            ),
+            "total": status_summary.total,
             "study_watchers": [
                 watcher.username for watcher in mgnify_study.watchers.all()
             ],
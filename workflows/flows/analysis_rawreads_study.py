@@ -27,6 +27,9 @@ from workflows.ena_utils.ena_api_requests import (
     library_strategy_policy_to_filter,
     ENALibraryStrategyPolicy,
 )
+from workflows.flows.analyse_study_tasks.shared.samplesheet_chunks import (
+    run_samplesheet_chunks,
+)
 from workflows.flows.analyse_study_tasks.shared.study_summary import (
     merge_study_summaries,
     add_rawreads_study_summaries_to_downloads,
@@ -155,12 +158,10 @@ def analysis_rawreads_study(study_accession: str):
     chunked_runs = chunk_list(
         analyses_to_attempt, EMG_CONFIG.rawreads_pipeline.samplesheet_chunk_size
     )
-    for analyses_chunk in chunked_runs:
-        # launch jobs for all analyses in this chunk in a single flow
-        logger.info(
-            f"Working on raw-reads analyses: {analyses_chunk[0]}-{analyses_chunk[-1]}"
-        )
-        run_rawreads_pipeline_via_samplesheet(mgnify_study, analyses_chunk)
+    # launch jobs for all analyses of each chunk in a single flow, running several chunks at once
+    run_samplesheet_chunks(
+        run_rawreads_pipeline_via_samplesheet, mgnify_study, chunked_runs
+    )
 
     merge_study_summaries(
         mgnify_study.accession,
@@ -176,6 +177,9 @@ def analysis_rawreads_study(study_accession: str):
     ).exists()
     mgnify_study.save()
 
+    status_summary = mgnify_study.analyses.status_summary(
+        analyses.models.Analysis.AnalysisStates
+    )
     emit_event(
         event="flow.analysis.finished",
         resource={"prefect.resource.id": f"prefect.flow-run.{flow_run.id}"},
@@ -186,24 +190,20 @@ def analysis_rawreads_study(study_accession: str):
             }
         ],
         payload={
-            "successful": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_COMPLETED]
-            ).count(),
-            "failed": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_FAILED]
-            ).count()
-            + mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_QC_FAILED]
-            ).count()
-            + mgnify_study.analyses.filter_by_statuses(
+            "successful": status_summary.count(
+                analyses.models.Analysis.AnalysisStates.ANALYSIS_COMPLETED
+            ),
+            "failed": status_summary.count_any(
                 [
-                    analyses.models.Analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_FAILED,
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_QC_FAILED,
+                    analyses.models.Analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED,
                 ]
-            ).count(),
-            "imported": mgnify_study.analyses.filter_by_statuses(
-                [analyses.models.Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
-            ).count(),
-            "total": mgnify_study.analyses.count(),
+            ),
+            "imported": status_summary.count(
+                analyses.models.Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED
+            ),
+            "total": status_summary.total,
             "study_watchers": [
                 watcher.username for watcher in mgnify_study.watchers.all()
             ],
@@ -51,11 +51,7 @@ class AssemblerChoices(FutureStrEnum):
 
 def get_biomes_as_choices():
     # IDEA: move this one to a helper of some sorts
-    biomes = {
-        str(biome.path): biome.pretty_lineage
-        for biome in analyses.models.Biome.objects.all()
-    }
-    BiomeChoices = Enum("BiomeChoices", biomes)
+    BiomeChoices = Enum("BiomeChoices", analyses.models.biome_tree.choices())
     return BiomeChoices
 
 
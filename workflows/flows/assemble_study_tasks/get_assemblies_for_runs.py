@@ -20,10 +20,14 @@ def get_or_create_assemblies_for_runs(
     logger = get_run_logger()
     study = analyses.models.Study.objects.get(accession=study_accession)
     logger.info(f"Getting/creating assemblies for study {study_accession}")
+    # every run is resolved by exact accession match in one (indexed) query
+    runs = analyses.models.Run.objects.resolve_many(read_runs)
     assembly_ids = []
     for read_run in read_runs:
         logger.info(f"Getting/creating assembly for run {read_run}")
-        run = analyses.models.Run.objects.get(ena_accessions__icontains=read_run)
+        run = runs.get(read_run)
+        if run is None:
+            raise analyses.models.Run.DoesNotExist(f"No run has accession {read_run}")
         if run.experiment_type not in [
             run.ExperimentTypes.METAGENOMIC,
             run.ExperimentTypes.METATRANSCRIPTOMIC,
@@ -225,10 +225,15 @@ def get_memory_for_assembler(
     )
 
     # ascend the biome hierarchy to find a memory heuristic
-    for biome_to_try in biome.ancestors().reverse():
-        heuristic = assembler_heuristics.filter(biome=biome_to_try).first()
-        if heuristic:
-            return heuristic.memory_gb
+    biomes_to_try = analyses.models.biome_tree.ancestors(biome)[::-1]
+    memory_gb_for_biomes = {}
+    for heuristic in assembler_heuristics.filter(biome__in=biomes_to_try).order_by(
+        "pk"
+    ):
+        memory_gb_for_biomes.setdefault(heuristic.biome_id, heuristic.memory_gb)
+    for biome_to_try in biomes_to_try:
+        if biome_to_try.pk in memory_gb_for_biomes:
+            return memory_gb_for_biomes[biome_to_try.pk]
 
 
 EXPERIMENT_TYPES_TO_MIASSEMBLER_LIBRARY_STRATEGY = defaultdict(
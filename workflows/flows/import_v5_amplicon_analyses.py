@@ -1,8 +1,11 @@
 from pathlib import Path
+from typing import Dict, List
 
 import django
+from django.db import transaction
 from prefect import flow, get_run_logger, task
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
 django.setup()
 
@@ -12,15 +15,24 @@ from analyses.base_models.with_downloads_models import (
     DownloadFileType,
     DownloadType,
 )
-from analyses.models import Analysis, Biome, Run, Sample, Study
+from analyses.models import (
+    Analysis,
+    Biome,
+    Run,
+    Sample,
+    Study,
+)
+from analyses.signals import send_bulk_saved
 from workflows.data_io_utils.legacy_emg_dbs import (
     LEGACY_DOWNLOAD_TYPE_MAP,
     LEGACY_FILE_FORMATS_MAP,
+    LegacyAnalysisJob,
+    LegacyAnalysisJobDownload,
     LegacyBiome,
     LegacyRun,
     LegacySample,
     LegacyStudy,
-    get_taxonomy_from_api_v1_mongo,
+    get_taxonomies_from_api_v1_mongo,
     legacy_emg_db_session,
 )
 
@@ -62,63 +74,253 @@ def make_study_from_legacy_emg_db(
     return mg_study
 
 
+BULK_WRITE_BATCH_SIZE = 1000
+
+
 @task
-def make_sample_from_legacy_emg_db(legacy_sample: LegacySample, study: Study) -> Sample:
+def make_samples_from_legacy_emg_db(
+    legacy_samples: List[LegacySample], study: Study
+) -> Dict[str, Sample]:
+    """
+    Get or create the (ENA and MGnify) samples for several legacy samples,
+    with a few set-based queries rather than a few queries per sample.
+    :return: Mapping of legacy sample primary accessions to MGnify samples.
+    """
     logger = get_run_logger()
 
-    ena_sample, created = ena.models.Sample.objects.get_or_create(
-        accession=legacy_sample.primary_accession,
-        defaults={
-            "additional_accessions": [legacy_sample.ext_sample_id],
-            "study": study.ena_study,
-        },
+    legacy_samples_by_accession = {
+        legacy_sample.primary_accession: legacy_sample
+        for legacy_sample in legacy_samples
+    }
+
+    ena_samples = ena.models.Sample.objects.in_bulk(
+        list(legacy_samples_by_accession.keys())
     )
-    if created:
-        logger.warning(f"Created new ENA sample object {ena_sample}")
+    new_ena_samples = [
+        ena.models.Sample(
+            accession=accession,
+            additional_accessions=[legacy_sample.ext_sample_id],
+            study=study.ena_study,
+        )
+        for accession, legacy_sample in legacy_samples_by_accession.items()
+        if accession not in ena_samples
+    ]
+    if new_ena_samples:
+        ena.models.Sample.objects.bulk_create(
+            new_ena_samples, batch_size=BULK_WRITE_BATCH_SIZE, ignore_conflicts=True
+        )
+        logger.warning(f"Created {len(new_ena_samples)} new ENA sample objects")
+        ena_samples = ena.models.Sample.objects.in_bulk(
+            list(legacy_samples_by_accession.keys())
+        )
 
-    mg_sample, created = Sample.objects.get_or_create(
-        ena_sample=ena_sample,
-        ena_study=study.ena_study,
-        defaults={
-            "ena_accessions": [
-                legacy_sample.primary_accession,
-                legacy_sample.ext_sample_id,
-            ],
-        },
+    samples: Dict[str, Sample] = {}
+    for sample in Sample.objects.filter(
+        ena_sample__in=list(ena_samples.keys()), ena_study=study.ena_study
+    ).order_by("id"):
+        samples.setdefault(sample.ena_sample_id, sample)
+
+    new_samples = [
+        Sample(
+            ena_sample=ena_samples[accession],
+            ena_study=study.ena_study,
+            ena_accessions=[accession, legacy_sample.ext_sample_id],
+        )
+        for accession, legacy_sample in legacy_samples_by_accession.items()
+        if accession not in samples
+    ]
+    if new_samples:
+        Sample.objects.bulk_create(new_samples, batch_size=BULK_WRITE_BATCH_SIZE)
+        send_bulk_saved(Sample, new_samples)
+        logger.warning(f"Created {len(new_samples)} new sample objects")
+        samples.update({sample.ena_sample_id: sample for sample in new_samples})
+
+    return samples
+
+
+def _legacy_run_accessions(legacy_run: LegacyRun) -> List[str]:
+    # they are usually duplicated in the legacy db
+    return list(dict.fromkeys([legacy_run.accession, legacy_run.secondary_accession]))
+
+
+@task
+def make_runs_from_legacy_emg_db(
+    legacy_runs: List[LegacyRun], study: Study, samples: Dict[str, Sample]
+) -> Dict[int, Run]:
+    """
+    Get or create the runs for several legacy (amplicon) runs, with a few set-based queries.
+    A run is matched to an existing run of the study by its accessions.
+    :param samples: Mapping of legacy sample primary accessions to MGnify samples, from make_samples_from_legacy_emg_db.
+    :return: Mapping of legacy run IDs to runs.
+    """
+    for legacy_run in legacy_runs:
+        assert (
+            legacy_run.experiment_type_id == 3
+        ), f"Legacy run {legacy_run.run_id} is not amplicon. Experiment type is {legacy_run.experiment_type_id}"
+
+    logger = get_run_logger()
+
+    all_accessions = {
+        accession
+        for legacy_run in legacy_runs
+        for accession in _legacy_run_accessions(legacy_run)
+    }
+    existing_runs = {
+        frozenset(run.ena_accessions): run
+        for run in Run.objects.filter(
+            study=study,
+            experiment_type=Run.ExperimentTypes.AMPLICON,
+            ena_accessions__overlap=list(all_accessions),
+        ).order_by("-id")
+    }
+
+    runs: Dict[int, Run] = {}
+    new_runs: Dict[int, Run] = {}
+    for legacy_run in legacy_runs:
+        accessions = _legacy_run_accessions(legacy_run)
+        if run := existing_runs.get(frozenset(accessions)):
+            runs[legacy_run.run_id] = run
+            continue
+        new_runs[legacy_run.run_id] = Run(
+            ena_study=study.ena_study,
+            study=study,
+            sample=samples[legacy_run.sample.primary_accession],
+            experiment_type=Run.ExperimentTypes.AMPLICON,
+            ena_accessions=accessions,
+            metadata={
+                Run.CommonMetadataKeys.INSTRUMENT_PLATFORM: legacy_run.instrument_platform,
+                Run.CommonMetadataKeys.INSTRUMENT_MODEL: legacy_run.instrument_model,
+            },
+        )
+
+    if new_runs:
+        Run.objects.bulk_create(
+            list(new_runs.values()), batch_size=BULK_WRITE_BATCH_SIZE
+        )
+        send_bulk_saved(Run, new_runs.values())
+        logger.info(f"Created {len(new_runs)} new run objects")
+        runs.update(new_runs)
+
+    return runs
+
+
+def _download_from_legacy_download(
+    legacy_download: LegacyAnalysisJobDownload,
+) -> DownloadFile:
+    basename = Path(legacy_download.real_name)
+
+    if legacy_download.subdir:
+        path = Path(legacy_download.subdir.subdir) / basename
+    else:
+        path = basename
+
+    return DownloadFile(
+        path=str(path),
+        alias=legacy_download.alias,
+        long_description=legacy_download.description.description,
+        short_description=legacy_download.description.description_label,
+        download_type=LEGACY_DOWNLOAD_TYPE_MAP.get(
+            legacy_download.group_id, DownloadType.OTHER
+        ),
+        download_group="all",
+        file_type=LEGACY_FILE_FORMATS_MAP.get(
+            legacy_download.format_id, DownloadFileType.OTHER
+        ),
     )
-    if created:
-        logger.warning(f"Created new sample object {mg_sample}")
-    return mg_sample
 
 
 @task
-def make_run_from_legacy_emg_db(legacy_run: LegacyRun, study: Study) -> Run:
-    assert (
-        legacy_run.experiment_type_id == 3
-    ), f"Legacy run {legacy_run.run_id} is not amplicon. Experiment type is {legacy_run.experiment_type_id}"
+def make_analyses_from_legacy_emg_db(
+    legacy_analyses: List[LegacyAnalysisJob],
+    study: Study,
+    samples: Dict[str, Sample],
+    runs: Dict[int, Run],
+) -> List[Analysis]:
+    """
+    Create or update the analyses for several legacy analysis jobs, with their downloads and taxonomies,
+    and mark them as completed with annotations imported.
 
+    The analyses are written with a few bulk upserts, so (unlike a normal save) no post_save signals are sent:
+    the experiment type is inherited from the run here instead,
+    and the AnalysisAnnotation rows are rebuilt by the bulk_saved signal of set_statuses.
+    Downloads and annotations of existing analyses are replaced by those from the legacy DBs,
+    but other statuses are left as they were.
+    """
     logger = get_run_logger()
 
-    sample = Sample.objects.get(
-        ena_accessions__contains=[legacy_run.sample.primary_accession]
+    accession_field = Analysis._meta.get_field("accession")
+    # taxonomies are fetched for the whole study at once, a page of analyses per mongo query
+    taxonomies = get_taxonomies_from_api_v1_mongo(
+        [
+            accession_field.accession_for(legacy_analysis.job_id)
+            for legacy_analysis in legacy_analyses
+        ]
     )
 
-    run, created = Run.objects.get_or_create(
-        ena_study=study.ena_study,
-        study=study,
-        sample=sample,
-        experiment_type=Run.ExperimentTypes.AMPLICON,
-        ena_accessions=list(
-            {legacy_run.accession, legacy_run.secondary_accession}
-        ),  # dedupes
-        metadata={
-            Run.CommonMetadataKeys.INSTRUMENT_PLATFORM: legacy_run.instrument_platform,
-            Run.CommonMetadataKeys.INSTRUMENT_MODEL: legacy_run.instrument_model,
-        },
+    analyses = []
+    for legacy_analysis in legacy_analyses:
+        run = runs[legacy_analysis.run.run_id]
+        analysis = Analysis(
+            id=legacy_analysis.job_id,
+            study=study,
+            sample=samples[legacy_analysis.sample.primary_accession],
+            results_dir=legacy_analysis.result_directory,
+            ena_study=study.ena_study,
+            pipeline_version=Analysis.PipelineVersions.v5,
+            run=run,
+            experiment_type=run.experiment_type or Analysis.ExperimentTypes.UNKNOWN,
+        )
+        analysis.add_downloads(
+            [
+                _download_from_legacy_download(legacy_download)
+                for legacy_download in legacy_analysis.downloads
+            ],
+            save=False,
+        )
+        analysis.annotations[Analysis.TAXONOMIES] = taxonomies.get(
+            accession_field.accession_for(analysis.id), {}
+        )
+        analyses.append(analysis)
+
+    analysis_ids = [analysis.id for analysis in analyses]
+    existing_ids = set(
+        Analysis.objects.filter(id__in=analysis_ids).values_list("id", flat=True)
     )
-    if created:
-        logger.info(f"Created new run object {run}")
-    return run
+
+    with transaction.atomic():
+        Analysis.objects.bulk_create(
+            analyses,
+            batch_size=BULK_WRITE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=[
+                "study",
+                "sample",
+                "results_dir",
+                "ena_study",
+                "pipeline_version",
+                "run",
+                "experiment_type",
+                "downloads",
+                "annotations",
+                "updated_at",
+            ],
+        )
+        Analysis.objects.filter(id__in=analysis_ids).set_statuses(
+            true=[
+                Analysis.AnalysisStates.ANALYSIS_STARTED,
+                Analysis.AnalysisStates.ANALYSIS_COMPLETED,
+                Analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED,
+            ]
+        )
+
+    for analysis in Analysis.objects.filter(id__in=analysis_ids).order_by("id"):
+        if analysis.id in existing_ids:
+            logger.warning(f"Updated analysis {analysis}")
+        else:
+            logger.info(f"Created analysis {analysis}")
+
+    return analyses
 
 
 @flow(
@@ -127,11 +329,14 @@ def make_run_from_legacy_emg_db(legacy_run: LegacyRun, study: Study) -> Run:
 )
 def import_v5_amplicon_analyses(mgys: str):
     """
-    This flow will iteratively import amplicon analyses (made with MGnify V5 pipeline)
+    This flow will import amplicon analyses (made with MGnify V5 pipeline)
     into the EMG DB.
 
     It connects to the legacy Mongo database server directly to copy data (it is big),
     but uses a TSV dump file of the legacy MySQL db (it is quite small).
+
+    The study's analysis jobs, and their samples, runs and downloads, are loaded from the legacy db up front,
+    and the samples, runs and analyses are then made in bulk (a few queries per study, not per analysis).
     """
 
     logger = get_run_logger()
@@ -139,63 +344,39 @@ def import_v5_amplicon_analyses(mgys: str):
     study_id = int(mgys.upper().lstrip("MGYS"))
 
     with legacy_emg_db_session() as session:
-        study_select_stmt = select(LegacyStudy).where(LegacyStudy.id == study_id)
+        study_select_stmt = (
+            select(LegacyStudy)
+            .where(LegacyStudy.id == study_id)
+            .options(
+                selectinload(LegacyStudy.biome),
+                selectinload(LegacyStudy.analysis_jobs).options(
+                    selectinload(LegacyAnalysisJob.sample),
+                    selectinload(LegacyAnalysisJob.run).selectinload(LegacyRun.sample),
+                    selectinload(LegacyAnalysisJob.downloads).options(
+                        selectinload(LegacyAnalysisJobDownload.subdir),
+                        selectinload(LegacyAnalysisJobDownload.description),
+                    ),
+                ),
+            )
+        )
         legacy_study: LegacyStudy = session.scalar(study_select_stmt)
         logger.info(f"Got legacy study {legacy_study}")
-        legacy_biome = legacy_study.biome
-
-        study = make_study_from_legacy_emg_db(legacy_study, legacy_biome)
-
-        for legacy_analysis in legacy_study.analysis_jobs:
-            legacy_sample = legacy_analysis.sample
-            sample = make_sample_from_legacy_emg_db(legacy_sample, study)
-            run = make_run_from_legacy_emg_db(legacy_analysis.run, study)
-
-            analysis, created = Analysis.objects.update_or_create(
-                id=legacy_analysis.job_id,
-                defaults={
-                    "study": study,
-                    "sample": sample,
-                    "results_dir": legacy_analysis.result_directory,
-                    "ena_study": study.ena_study,
-                    "pipeline_version": Analysis.PipelineVersions.v5,
-                    "run": run,
-                },
-            )
-            analysis.inherit_experiment_type()
-
-            if created:
-                logger.info(f"Created analysis {analysis}")
-            else:
-                logger.warning(f"Updated analysis {analysis}")
-
-            for legacy_download in legacy_analysis.downloads:
-                basename = Path(legacy_download.real_name)
-
-                if legacy_download.subdir:
-                    path = Path(legacy_download.subdir.subdir) / basename
-                else:
-                    path = basename
-
-                analysis.add_download(
-                    DownloadFile(
-                        path=str(path),
-                        alias=legacy_download.alias,
-                        long_description=legacy_download.description.description,
-                        short_description=legacy_download.description.description_label,
-                        download_type=LEGACY_DOWNLOAD_TYPE_MAP.get(
-                            legacy_download.group_id, DownloadType.OTHER
-                        ),
-                        download_group="all",
-                        file_type=LEGACY_FILE_FORMATS_MAP.get(
-                            legacy_download.format_id, DownloadFileType.OTHER
-                        ),
-                    )
-                )
-
-            taxonomy = get_taxonomy_from_api_v1_mongo(analysis.accession)
-            analysis.annotations[Analysis.TAXONOMIES] = taxonomy
-            analysis.mark_status(analysis.AnalysisStates.ANALYSIS_STARTED)
-            analysis.mark_status(analysis.AnalysisStates.ANALYSIS_COMPLETED)
-            analysis.mark_status(analysis.AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED)
-            analysis.save()
+        legacy_analyses = list(legacy_study.analysis_jobs)
+        logger.info(f"Legacy study has {len(legacy_analyses)} analysis jobs")
+
+        study = make_study_from_legacy_emg_db(legacy_study, legacy_study.biome)
+
+        legacy_samples = {
+            legacy_sample.sample_id: legacy_sample
+            for legacy_analysis in legacy_analyses
+            for legacy_sample in [legacy_analysis.sample, legacy_analysis.run.sample]
+        }
+        samples = make_samples_from_legacy_emg_db(list(legacy_samples.values()), study)
+
+        legacy_runs = {
+            legacy_analysis.run.run_id: legacy_analysis.run
+            for legacy_analysis in legacy_analyses
+        }
+        runs = make_runs_from_legacy_emg_db(list(legacy_runs.values()), study, samples)
+
+        make_analyses_from_legacy_emg_db(legacy_analyses, study, samples, runs)
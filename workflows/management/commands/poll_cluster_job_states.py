@@ -0,0 +1,46 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from workflows.prefect_utils.slurm_flow import poll_cluster_job_states
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class Command(BaseCommand):
+    help = "Polls slurm for the states of all in-flight cluster jobs at once, so that cluster job flows can read them from the DB."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-i",
+            "--interval_seconds",
+            type=int,
+            help="How many seconds to wait between polls.",
+            default=settings.EMG_CONFIG.slurm.default_seconds_between_job_checks,
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Poll once and exit, rather than polling forever.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.EMG_CONFIG.slurm.central_job_state_poller:
+            logger.warning(
+                "central_job_state_poller is not enabled in the config, so flows will still query slurm themselves"
+            )
+
+        while True:
+            try:
+                polled = poll_cluster_job_states()
+            except Exception as e:
+                logger.error(f"Could not poll cluster job states: {e}")
+            else:
+                logger.info(f"Polled states of {polled} cluster jobs")
+
+            if options["once"]:
+                break
+            time.sleep(options["interval_seconds"])
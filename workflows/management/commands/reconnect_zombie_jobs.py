@@ -114,8 +114,10 @@ class Command(BaseCommand):
             f"Looking for RUNNING cluster jobs last updated before {zombies_if_before.isoformat()}"
         )
 
+        # updated_at rather than state_checked_at, since the latter is also refreshed by poll_cluster_job_states
+        #   whether or not a flow is still waiting on the job
         probable_zombie_jobs = OrchestratedClusterJob.objects.filter(
-            last_known_state=SlurmStatus.running, state_checked_at__lt=zombies_if_before
+            last_known_state=SlurmStatus.running, updated_at__lt=zombies_if_before
         )
         logger.info(f"Found {probable_zombie_jobs.count()} such jobs")
 
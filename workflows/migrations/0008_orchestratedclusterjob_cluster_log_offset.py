@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflows", "0007_alter_orchestratedclusterjob_input_files_hashes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orchestratedclusterjob",
+            name="cluster_log_offset",
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workflows", "0008_orchestratedclusterjob_cluster_log_offset"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InputFileHash",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("path", models.TextField()),
+                ("hash_alg", models.CharField(default="blake2b", max_length=32)),
+                ("size", models.BigIntegerField()),
+                ("mtime_ns", models.BigIntegerField()),
+                ("inode", models.BigIntegerField()),
+                ("hash", models.CharField(max_length=128)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("path", "hash_alg"),
+                        name="unique_input_file_hash_per_alg",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,7 +1,10 @@
+import logging
 import uuid
+from datetime import timedelta
 from pathlib import Path
 from typing import List, Optional, Union
 
+from django.conf import settings
 from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.db.models.signals import pre_save
@@ -11,8 +14,18 @@ from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 from emgapiv2.model_utils import JSONFieldWithSchema
 
+from .prefect_utils.file_hashing import (
+    HASH_ALG,
+    SAMPLED_HASH_ALG,
+    hash_file_sample,
+    hash_files,
+)
 from .prefect_utils.slurm_policies import _SlurmResubmitPolicy
-from .prefect_utils.slurm_status import SlurmStatus
+from .prefect_utils.slurm_status import (
+    SlurmStatus,
+    slurm_status_is_finished_successfully,
+    slurm_status_is_finished_unsuccessfully,
+)
 from .signals import ready
 
 
@@ -52,8 +65,23 @@ class OrchestratedClusterJobManager(models.Manager):
         self,
         policy: _SlurmResubmitPolicy,
         job: "OrchestratedClusterJob.SlurmJobSubmitDescription",
-        input_file_hashes: List["OrchestratedClusterJob.JobInputFile"],
+        input_file_hashes: List["OrchestratedClusterJob.JobInputFile"] = None,
+        input_files: Optional[List[Union[Path, str]]] = None,
     ):
+        """
+        :param input_file_hashes: Hashed input files to match (if required by the policy).
+        :param input_files: Alternatively, paths of input files to match (if required by the policy).
+            These are only hashed if the policy needs them, using the InputFileHash cache.
+        """
+        if (
+            input_file_hashes is None
+            and input_files
+            and policy.considering_input_file_changes
+        ):
+            input_file_hashes = [
+                InputFileHash.objects.get_or_compute(input_file).as_job_input_file()
+                for input_file in input_files
+            ]
         similar_past_jobs = self.filter_similar_to_by_policy(
             policy, job, input_file_hashes
         )
@@ -63,6 +91,29 @@ class OrchestratedClusterJobManager(models.Manager):
 
         return None
 
+    def filter_in_flight(self):
+        """
+        Filter for jobs that are not known to have finished, and are recent enough that a flow may still be waiting on them.
+        (Slurm recycles job IDs, so very old jobs in an unknown state are excluded.)
+        :return: Filtered queryset.
+        """
+        terminal_states = [
+            state.value
+            for state in SlurmStatus
+            if slurm_status_is_finished_successfully(state)
+            or slurm_status_is_finished_unsuccessfully(state)
+        ]
+        return (
+            self.get_queryset()
+            .filter(
+                created_at__gte=now()
+                - timedelta(
+                    seconds=settings.EMG_CONFIG.slurm.cluster_job_flow_timeout_seconds
+                )
+            )
+            .exclude(last_known_state__in=terminal_states)
+        )
+
 
 class OrchestratedClusterJob(models.Model):
     objects = OrchestratedClusterJobManager()
@@ -131,6 +182,8 @@ class OrchestratedClusterJob(models.Model):
 
     nextflow_trace = models.JSONField(default=list, null=True, blank=True)
     cluster_log = models.TextField(null=True, blank=True, default=None)
+    cluster_log_offset = models.BigIntegerField(default=0)
+    # how far into the slurm log file cluster_log has been read, so that only new log lines need reading
 
     @property
     def name(self):
@@ -161,6 +214,109 @@ class OrchestratedClusterJob(models.Model):
         return f"{self.__class__.__name__} {self.pk} (Slurm: {self.cluster_job_id})"
 
 
+class InputFileHashManager(models.Manager):
+    @staticmethod
+    def _hash_alg(path: Union[Path, str], sampled: Optional[bool]) -> str:
+        if sampled is None:
+            min_bytes = settings.EMG_CONFIG.slurm.input_file_sampled_hash_min_bytes
+            sampled = min_bytes is not None and Path(path).stat().st_size >= min_bytes
+        return SAMPLED_HASH_ALG if sampled else HASH_ALG
+
+    def get_cached(
+        self, path: Union[Path, str], sampled: Optional[bool] = None
+    ) -> Optional["InputFileHash"]:
+        """
+        Get the cached hash of a file, provided the file is unchanged (by size, mtime and inode) since it was hashed.
+        :param path: Path to the file.
+        :param sampled: Whether to look for a sampled hash. Default is per the config's `input_file_sampled_hash_min_bytes`.
+        :return: InputFileHash, or None if there is no up-to-date cached hash (or no file).
+        """
+        try:
+            stat = Path(path).stat()
+            hash_alg = self._hash_alg(path, sampled)
+        except FileNotFoundError:
+            return None
+        return self.filter(
+            path=str(path),
+            hash_alg=hash_alg,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            inode=stat.st_ino,
+        ).first()
+
+    def get_or_compute(
+        self, path: Union[Path, str], sampled: Optional[bool] = None
+    ) -> "InputFileHash":
+        """
+        Get the hash of a file from the cache if the file is unchanged, otherwise hash the file and cache it.
+        A missing file gets the hash of no content, which is not cached.
+        :param path: Path to the file.
+        :param sampled: Whether to hash only samples of the file. Default is per the config's `input_file_sampled_hash_min_bytes`.
+        :return: InputFileHash (unsaved, if there was no file).
+        """
+        if not Path(path).is_file():
+            logging.warning(f"Did not find a file to hash at {path}. Ignoring it.")
+            return InputFileHash(path=str(path), hash_alg=HASH_ALG, hash=hash_files([]))
+
+        if cached := self.get_cached(path, sampled):
+            return cached
+
+        hash_alg = self._hash_alg(path, sampled)
+        stat = Path(
+            path
+        ).stat()  # before reading, so that changes during hashing invalidate it
+        if hash_alg == SAMPLED_HASH_ALG:
+            file_hash = hash_file_sample(
+                path, settings.EMG_CONFIG.slurm.input_file_sampled_hash_sample_bytes
+            )
+        else:
+            file_hash = hash_files([path])
+
+        input_file_hash, _ = self.update_or_create(
+            path=str(path),
+            hash_alg=hash_alg,
+            defaults={
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "inode": stat.st_ino,
+                "hash": file_hash,
+            },
+        )
+        return input_file_hash
+
+
+class InputFileHash(models.Model):
+    """
+    Cache of the content hashes of (possibly huge) files, like cluster job input files.
+    Keyed by path and stat metadata, so that unchanged files need not be read again to re-hash them.
+    """
+
+    objects = InputFileHashManager()
+
+    path = models.TextField()
+    hash_alg = models.CharField(max_length=32, default=HASH_ALG)
+    size = models.BigIntegerField()
+    mtime_ns = models.BigIntegerField()
+    inode = models.BigIntegerField()
+    hash = models.CharField(max_length=128)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["path", "hash_alg"], name="unique_input_file_hash_per_alg"
+            )
+        ]
+
+    def as_job_input_file(self) -> OrchestratedClusterJob.JobInputFile:
+        return OrchestratedClusterJob.JobInputFile(
+            path=self.path, hash=self.hash, hash_alg=self.hash_alg
+        )
+
+    def __str__(self):
+        return f"{self.__class__.__name__} {self.path} ({self.hash_alg})"
+
+
 @receiver(pre_save, sender=OrchestratedClusterJob)
 def ensure_orchestrated_cluster_job_has_state(
     sender, instance: OrchestratedClusterJob, **kwargs
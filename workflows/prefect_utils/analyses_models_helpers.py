@@ -1,6 +1,6 @@
 import logging
 from enum import Enum
-from typing import List, TypeVar, Type
+from typing import Iterable, List, TypeVar, Type
 
 from django.contrib.auth.models import User
 from prefect import task
@@ -83,6 +83,45 @@ def mark_analysis_status(
             )
 
 
+def mark_analyses_status(
+    analyses: Iterable[Analysis],
+    status: Analysis.AnalysisStates,
+    reason: str = None,
+    unset_statuses: list[Analysis.AnalysisStates] = None,
+) -> int:
+    """
+    Logs and updates the status of several analyses at once, in a single query.
+    Unlike mark_analysis_status, the analyses are not reloaded, so in-memory objects will have a stale status.
+    :param analyses: The Analysis objects (or a queryset of them) to update.
+    :type analyses: Iterable of Analysis
+    :param status: The new status to assign to the analyses.
+    :type status: One of Analysis.AnalysisStates
+    :param reason: An optional reason for the status change, which will be recorded.
+    :type reason: str, optional
+    :param unset_statuses: An optional list of statuses to unset (e.g., [Analysis.AnalysisStates.ANALYSIS_FAILED])
+    :type unset_statuses: list of Analysis.AnalysisStates, optional
+    :return: Number of analyses updated.
+    :rtype: int
+    :raises ValueError: If the status is not one of the predefined AnalysisStates.
+    """
+    if status not in Analysis.AnalysisStates.__dict__.values():
+        raise ValueError(
+            f"Invalid status '{status}'. Must be one of the predefined AnalysisStates."
+        )
+    analysis_ids = [analysis.pk for analysis in analyses]
+    print(f"{len(analysis_ids)} analyses status is {status} now.")
+    return Analysis.objects.filter(pk__in=analysis_ids).set_statuses(
+        true=[status],
+        false=unset_statuses,
+        reasons={status: reason} if reason else None,
+        # like mark_analysis_status, only explain the unsetting of statuses that were set
+        reasons_if_was_true={
+            unset_status: f"Explicitly unset when setting {status}"
+            for unset_status in unset_statuses or []
+        },
+    )
+
+
 I = TypeVar("I")  # noqa: E741
 
 
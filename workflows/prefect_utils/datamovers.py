@@ -1,5 +1,8 @@
+import hashlib
+import shlex
 from datetime import timedelta
-from pathlib import PurePath
+from pathlib import Path, PurePath
+from typing import List, Tuple
 
 from prefect import flow
 from prefect.runtime import flow_run
@@ -10,6 +13,8 @@ from workflows.data_io_utils.filenames import file_path_shortener
 from workflows.prefect_utils.slurm_flow import EMG_CONFIG, run_cluster_job
 from workflows.prefect_utils.slurm_policies import ResubmitAlwaysPolicy
 
+MOVES_MANIFESTS_DIR = "datamover-manifests"  # inside the default_workdir
+
 
 def move_data_flow_name() -> str:
     source = flow_run.parameters["source"]
@@ -60,3 +65,79 @@ def move_data(
         partitions=[EMG_CONFIG.slurm.datamover_paritition],
         **kwargs,
     )
+
+
+def write_moves_manifest(moves: List[Tuple[str, str]]) -> Path:
+    """
+    Write (source, target) pairs to a manifest file for a datamover job, on the shared filesystem.
+    Every path is NUL-terminated (the only character a path cannot contain), as read by `xargs -0 -n 2`.
+    The file is named by its content, so the same moves always make the same job command.
+
+    :param moves: List of (source, target) fully qualified paths.
+    :return: Path of the manifest file.
+    """
+    content = "".join(f"{source}\0{target}\0" for source, target in moves).encode()
+    manifest = (
+        Path(EMG_CONFIG.slurm.default_workdir)
+        / MOVES_MANIFESTS_DIR
+        / f"{hashlib.sha256(content).hexdigest()}.nul"
+    )
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    manifest.write_bytes(content)
+    return manifest
+
+
+def move_data_batch_flow_name() -> str:
+    moves = flow_run.parameters["moves"]
+    return f"Move data: {len(moves)} sources"
+
+
+@flow(flow_run_name=move_data_batch_flow_name)
+def move_data_batch(
+    moves: List[Tuple[str, str]],
+    move_command: str = "cp",
+    make_targets: bool = True,
+    kwargs: dict | None = None,
+):
+    """
+    Move many sources to their own targets on the cluster filesystem, in a single slurm job on the datamover partition.
+    Rather than a job (and flow) per source, like `move_data`, which can mean thousands of tiny jobs for a big study.
+
+    The job runs `datamover_parallel_transfers` of the moves at once, and fails if any of them fail.
+
+    :param moves: List of (source, target) fully qualified paths, e.g. [("/results/ERR1/", "/ftp/ERR1/")]
+        Targets are treated as directories.
+    :param move_command: tool command for the moves. Default is `cp`, but could be `mv` or `rsync` etc.
+    :param make_targets: mkdir each target directory before copying.
+    :param kwargs: Other keywords to pass to run_cluster_job
+        (e.g. expected_time, memory, or other slurm job-description parameters)
+    :return: Job ID of the datamover job.
+    """
+    kwargs = kwargs or {}
+    expected_time = kwargs.pop("expected_time", timedelta(hours=2))
+    memory = kwargs.pop("memory", "1G")
+
+    if "environment" not in kwargs:
+        kwargs["environment"] = {}
+
+    move_one = f'{move_command} "$0" "$1"'
+    if make_targets:
+        move_one = 'mkdir -p "$1" && ' + move_one
+
+    # each source and target is read from the manifest as a whole (whatever characters the path contains),
+    # and xargs runs `sh -c move_one source target` for each pair
+    manifest = write_moves_manifest(moves)
+    command = (
+        f"xargs -0 -n 2 -P {EMG_CONFIG.slurm.datamover_parallel_transfers} "
+        f"sh -c {shlex.quote(move_one)} < {shlex.quote(str(manifest))}"
+    )
+
+    return run_cluster_job(
+        name=f"Move {len(moves)} sources to {file_path_shortener(moves[0][1])} etc.",
+        command=command,
+        expected_time=expected_time,
+        memory=memory,
+        resubmit_policy=ResubmitAlwaysPolicy,
+        partitions=[EMG_CONFIG.slurm.datamover_paritition],
+        **kwargs,
+    )
@@ -0,0 +1,44 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterable, Union
+
+__all__ = ["HASH_ALG", "SAMPLED_HASH_ALG", "hash_files", "hash_file_sample"]
+
+HASH_ALG = "blake2b"
+SAMPLED_HASH_ALG = "blake2b-sampled"
+
+CHUNK_SIZE = 131072
+# 131072 is rsize on EBI /nfs/production, so slightly optimised for that
+
+
+def hash_files(paths: Iterable[Union[Path, str]]) -> str:
+    """
+    Hash the full contents of some files, in order, as one blake2b digest.
+    """
+    files_hash = hashlib.new(HASH_ALG)
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                files_hash.update(chunk)
+    return files_hash.hexdigest()
+
+
+def hash_file_sample(path: Union[Path, str], sample_bytes: int) -> str:
+    """
+    Hash a file's size and a sample of its contents (the start, middle and end), rather than all of it.
+    Much cheaper than `hash_files` for huge files, but only detects changes to the size or sampled parts.
+    Files no bigger than three samples are hashed in full (so the hash still differs from `hash_files`).
+    """
+    sample_hash = hashlib.new(HASH_ALG)
+    size = os.path.getsize(path)
+    sample_hash.update(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= 3 * sample_bytes:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                sample_hash.update(chunk)
+        else:
+            for offset in [0, (size - sample_bytes) // 2, size - sample_bytes]:
+                f.seek(offset)
+                sample_hash.update(f.read(sample_bytes))
+    return sample_hash.hexdigest()
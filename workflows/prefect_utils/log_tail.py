@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+__all__ = ["read_log_tail"]
+
+DEFAULT_BLOCK_SIZE = 65536
+
+
+def read_log_tail(
+    path: Union[Path, str],
+    lines: int,
+    previous_tail: Optional[str] = None,
+    from_offset: int = 0,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> Tuple[str, int]:
+    """
+    Read the last few lines of a (possibly huge, growing) log file, without reading the whole file.
+
+    The file is read backwards from its end, a block at a time, until enough lines are found.
+    If the tail from a previous call is given along with the offset it was read up to, only bytes written
+    since then are read and the result is joined onto the previous tail.
+    So repeated calls on a growing log cost the size of the new content (at most), not the size of the log,
+    and memory use is bounded by the lines requested.
+
+    E.g.
+        tail, offset = read_log_tail("slurm-1.out", 10)
+        ...
+        tail, offset = read_log_tail("slurm-1.out", 10, previous_tail=tail, from_offset=offset)
+
+    :param path: Path to the log file.
+    :param lines: Number of lines to return, at most.
+    :param previous_tail: Tail returned by a previous call (for the same number of lines), if any.
+    :param from_offset: Byte offset returned by that previous call.
+    :param block_size: Number of bytes to read at a time.
+    :return: Tuple of the tail (the last lines, with their original line endings) and the byte offset read up to.
+    """
+    with open(path, "rb") as log:
+        end = log.seek(0, os.SEEK_END)
+
+        if previous_tail is None or not 0 < from_offset <= end:
+            # nothing to build on, or the file was truncated/replaced since
+            previous_tail = ""
+            from_offset = 0
+
+        if end == from_offset:
+            return previous_tail, end
+
+        data = b""
+        position = end
+        while position > from_offset and data.count(b"\n") <= lines:
+            step = min(block_size, position - from_offset)
+            position -= step
+            log.seek(position)
+            data = log.read(step) + data
+
+    text = data.decode("utf-8", errors="ignore")
+    if position == from_offset:
+        # everything since the previous tail was read, so it continues on from that
+        text = previous_tail + text
+
+    return "".join(text.splitlines(keepends=True)[-lines:]), end
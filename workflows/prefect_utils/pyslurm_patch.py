@@ -1,6 +1,6 @@
 import logging
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -34,15 +34,16 @@ class Job:
 
 @dataclass
 class JobFilter:
-    names: [str]
-    users: [str]
+    names: Optional[List[str]] = None
+    users: Optional[List[str]] = None
+    ids: Optional[List[int]] = None
 
 
 @dataclass
 class Jobs:
     @staticmethod
-    def load(db_filter: JobFilter) -> List[Job]:
-        return []
+    def load(db_filter: JobFilter) -> Dict[int, Job]:
+        return {}
 
 
 @dataclass
@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 import time
@@ -15,9 +14,14 @@ from prefect.artifacts import create_markdown_artifact
 from prefect.runtime import flow_run
 
 from emgapiv2.log_utils import mask_sensitive_data as safe
-from workflows.models import OrchestratedClusterJob
+from workflows.models import InputFileHash, OrchestratedClusterJob
 from workflows.nextflow_utils.tower import get_nextflow_tower_url
-from workflows.nextflow_utils.trace import maybe_get_nextflow_trace_df
+from workflows.nextflow_utils.trace import (
+    maybe_get_nextflow_trace_df,
+    maybe_get_nextflow_trace_file,
+)
+from workflows.prefect_utils.file_hashing import hash_files
+from workflows.prefect_utils.log_tail import read_log_tail
 from workflows.prefect_utils.slurm_limits import delay_until_cluster_has_space
 from workflows.prefect_utils.slurm_policies import (
     _SlurmResubmitPolicy,
@@ -58,12 +62,53 @@ def slurm_timedelta(delta: timedelta) -> str:
     return f"{days:02}-{hours:02}:{minutes:02}:{seconds:02}"
 
 
+def _log_cluster_job_tail(
+    orchestrated_cluster_job: OrchestratedClusterJob, working_directory: Optional[str]
+):
+    """
+    Send the tail of a cluster job's stdout log to prefect, and keep it on the OrchestratedClusterJob (unsaved).
+    """
+    logger = get_run_logger()
+    job_id = orchestrated_cluster_job.cluster_job_id
+
+    if not working_directory:
+        logger.info(f"No working directory known for Slurm Job {job_id}")
+        return
+
+    job_log_path = Path(working_directory) / Path(f"slurm-{job_id}.out")
+    if job_log_path.exists():
+        # only the part of the log written since the last check is read
+        log, orchestrated_cluster_job.cluster_log_offset = read_log_tail(
+            job_log_path,
+            EMG_CONFIG.slurm.job_log_tail_lines,
+            previous_tail=orchestrated_cluster_job.cluster_log,
+            from_offset=orchestrated_cluster_job.cluster_log_offset,
+        )
+        logger.info(
+            _(
+                f"""\
+                Slurm Job Stdout Log (last {EMG_CONFIG.slurm.job_log_tail_lines} lines, of {orchestrated_cluster_job.cluster_log_offset} bytes):
+                ----------
+                <<LOG>>
+                ----------
+                """
+            ).replace("<<LOG>>", safe(log))
+        )
+
+        orchestrated_cluster_job.cluster_log = log
+    else:
+        logger.info(f"No Slurm Job Stdout available at {job_log_path}")
+
+
 def check_cluster_job(
     orchestrated_cluster_job: OrchestratedClusterJob,
 ) -> str:
     """
     Retrieve the state (e.g. RUNNING) of a cluster job on slurm.
     Updates the state of any associated OrchestratedClusterJob objects.
+
+    If the central job state poller is enabled (see `poll_cluster_job_states`), a recently polled state
+    is read from the DB instead of querying slurm for this job alone.
     :param orchestrated_cluster_job: Orchestrated Cluster Job referencing the Slurm job
     :return: state of the job, as one of the string values of SlurmStatus.
     """
@@ -72,6 +117,29 @@ def check_cluster_job(
 
     job_id = orchestrated_cluster_job.cluster_job_id
 
+    if EMG_CONFIG.slurm.central_job_state_poller:
+        orchestrated_cluster_job.refresh_from_db(
+            fields=["last_known_state", "state_checked_at"]
+        )
+        polled_at = orchestrated_cluster_job.state_checked_at
+        if polled_at and polled_at > now() - timedelta(
+            seconds=EMG_CONFIG.slurm.central_job_state_max_age_seconds
+        ):
+            state = orchestrated_cluster_job.last_known_state
+            logger.info(f"Polled SLURM status of {job_id = } is {state}")
+            _log_cluster_job_tail(
+                orchestrated_cluster_job,
+                orchestrated_cluster_job.job_submit_description.working_directory,
+            )
+            # don't overwrite the state fields, which belong to the poller
+            orchestrated_cluster_job.save(
+                update_fields=["cluster_log", "cluster_log_offset", "updated_at"]
+            )
+            return state
+        logger.info(
+            f"No polled SLURM status of {job_id = } since {polled_at}, so querying slurm"
+        )
+
     try:
         job = pyslurm.db.Job(job_id).load(job_id)
     except pyslurm.core.error.RPCError:
@@ -86,29 +154,53 @@ def check_cluster_job(
     orchestrated_cluster_job.last_known_state = job.state
     orchestrated_cluster_job.state_checked_at = now()
 
-    job_log_path = Path(job.working_directory) / Path(f"slurm-{job_id}.out")
-    if job_log_path.exists():
-        with open(job_log_path, "r", encoding="utf-8", errors="ignore") as job_log:
-            full_log = job_log.readlines()
-            log = "\n".join(full_log[-EMG_CONFIG.slurm.job_log_tail_lines :])
-            logger.info(
-                _(
-                    f"""\
-                    Slurm Job Stdout Log (last {EMG_CONFIG.slurm.job_log_tail_lines} lines of {len(full_log)}):
-                    ----------
-                    <<LOG>>
-                    ----------
-                    """
-                ).replace("<<LOG>>", safe(log))
-            )
-
-            orchestrated_cluster_job.cluster_log = log
-    else:
-        logger.info(f"No Slurm Job Stdout available at {job_log_path}")
+    _log_cluster_job_tail(orchestrated_cluster_job, job.working_directory)
     orchestrated_cluster_job.save()
     return job.state
 
 
+def poll_cluster_job_states() -> int:
+    """
+    Refresh the states of all in-flight OrchestratedClusterJobs with a single slurm DB query,
+    rather than one query per job.
+    Run periodically (by the `poll_cluster_job_states` command) alongside `central_job_state_poller`,
+    so that the load on slurm does not grow with the number of cluster job flows waiting.
+    :return: Number of OrchestratedClusterJobs whose state was refreshed.
+    """
+    in_flight_jobs = list(
+        OrchestratedClusterJob.objects.filter_in_flight().only("id", "cluster_job_id")
+    )
+    if not in_flight_jobs:
+        return 0
+
+    try:
+        jobs = pyslurm.db.Jobs.load(
+            db_filter=pyslurm.db.JobFilter(
+                ids=sorted({ocj.cluster_job_id for ocj in in_flight_jobs})
+            )
+        )
+    except pyslurm.core.error.RPCError:
+        logging.warning(f"Error talking to slurm for {len(in_flight_jobs)} jobs")
+        return 0
+
+    states = {int(job.job_id): job.state for job in jobs.values()}
+    checked_at = now()
+
+    polled_jobs = []
+    for ocj in in_flight_jobs:
+        if ocj.cluster_job_id not in states:
+            # e.g. not yet known to slurm's DB; flows fall back to checking it themselves if this persists
+            continue
+        ocj.last_known_state = states[ocj.cluster_job_id]
+        ocj.state_checked_at = checked_at
+        polled_jobs.append(ocj)
+
+    OrchestratedClusterJob.objects.bulk_update(
+        polled_jobs, ["last_known_state", "state_checked_at"], batch_size=1000
+    )
+    return len(polled_jobs)
+
+
 def _ensure_absolute_workdir(workdir):
     path = Path(workdir)
     if not path.is_absolute():
@@ -216,20 +308,12 @@ def start_or_attach_cluster_job(
     )
 
     # check if a job already exists for this
-    input_files = [
-        OrchestratedClusterJob.JobInputFile(
-            path=input_file,
-            hash=compute_hash_of_input_file([input_file]),
-        )
-        for input_file in input_files or []
-    ]
-    logger.info(f"Have hashed {len(input_files)} input files")
-
+    # (input files are hashed only if the policy needs them, and unchanged files' hashes come from a cache)
     last_submitted_similar_job: Optional[OrchestratedClusterJob] = (
         OrchestratedClusterJob.objects.get_previous_job(
             job=job_submit_description,
             policy=slurm_resubmit_policy,
-            input_file_hashes=input_files,
+            input_files=input_files,
         )
     )
 
@@ -264,6 +348,12 @@ def start_or_attach_cluster_job(
             environment={},
         )
 
+    input_files_hashes = [
+        InputFileHash.objects.get_or_compute(input_file).as_job_input_file()
+        for input_file in input_files or []
+    ]
+    logger.info(f"Have hashed {len(input_files_hashes)} input files")
+
     # need to submit new job
     job_id = submit_cluster_job(
         name=job_submit_description.name,
@@ -277,7 +367,7 @@ def start_or_attach_cluster_job(
         cluster_job_id=job_id,
         flow_run_id=flow_run.id,
         job_submit_description=job_submit_description,
-        input_files_hashes=input_files,
+        input_files_hashes=input_files_hashes,
     )
 
     create_markdown_artifact(
@@ -353,18 +443,13 @@ def compute_hash_of_input_file(
     input_files_to_hash: Optional[List[Union[Path, str]]] = None,
 ) -> str:
     logger = get_run_logger()
-    input_files_hash = hashlib.new("blake2b")
-
+    input_files = []
     for input_file in input_files_to_hash or []:
         if not Path(input_file).is_file():
             logger.warning(f"Did not find a file to hash at {input_file}. Ignoring it.")
             continue
-        with open(input_file, "rb") as f:
-            for chunk in iter(
-                lambda: f.read(131072), b""
-            ):  # 131072 is rsize on EBI /nfs/production, so slightly optimised for that
-                input_files_hash.update(chunk)
-    return input_files_hash.hexdigest()
+        input_files.append(input_file)
+    return hash_files(input_files)
 
 
 @task(log_prints=True)
@@ -372,12 +457,25 @@ def store_nextflow_trace(orchestrated_cluster_job: OrchestratedClusterJob):
     job_description: OrchestratedClusterJob.SlurmJobSubmitDescription = (
         orchestrated_cluster_job.job_submit_description
     )
+    workdir = Path(job_description.working_directory)
+
+    # a reattached, already finished job may have stored its trace already
+    trace_file = maybe_get_nextflow_trace_file(workdir, job_description.script)
+    if (
+        trace_file
+        and orchestrated_cluster_job.nextflow_trace
+        and InputFileHash.objects.get_cached(trace_file, sampled=False)
+    ):
+        print(f"Nextflow trace {trace_file} is unchanged since it was stored")
+        return
+
     maybe_trace = maybe_get_nextflow_trace_df(
-        workdir=Path(job_description.working_directory), command=job_description.script
+        workdir=workdir, command=job_description.script
     )
     if maybe_trace is not None:
         orchestrated_cluster_job.nextflow_trace = maybe_trace.to_dict(orient="index")
         orchestrated_cluster_job.save()
+        InputFileHash.objects.get_or_compute(trace_file, sampled=False)
 
 
 @flow(
@@ -459,11 +557,9 @@ def run_cluster_job(
                 job = pyslurm.db.Job(job_id).load(job_id)
                 job_log_path = Path(job.working_directory) / Path(f"slurm-{job_id}.out")
                 if job_log_path.exists():
-                    with open(job_log_path, "r") as job_log:
-                        full_log = job_log.readlines()
-                        error_details = "\n".join(
-                            full_log[-EMG_CONFIG.slurm.job_log_failure_tail_lines :]
-                        )
+                    error_details, _offset = read_log_tail(
+                        job_log_path, EMG_CONFIG.slurm.job_log_failure_tail_lines
+                    )
             except Exception as e:
                 logger.warning(f"Failed to get job error details: {e}")
 
@@ -6,7 +6,9 @@ from workflows.data_io_utils.filenames import trailing_slash_ensured_dir
 from workflows.data_io_utils.mgnify_v6_utils.amplicon import EMG_CONFIG
 from workflows.flows.analyse_study_tasks.copy_v6_pipeline_results import (
     copy_v6_pipeline_results,
+    copy_v6_pipeline_results_of_analyses,
 )
+from workflows.prefect_utils.datamovers import MOVES_MANIFESTS_DIR, write_moves_manifest
 
 
 @pytest.mark.django_db(transaction=True)
@@ -119,3 +121,58 @@ def test_copy_amplicon_pipeline_results_disallowed_extensions(raw_read_analyses)
             assert (
                 f"--include='*.{ext}'" not in command
             ), f"Found disallowed extension: {ext}"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_copy_amplicon_pipeline_results_of_analyses(raw_read_analyses):
+    """Test copying results of several analyses in a single datamover job"""
+    analyses = raw_read_analyses[:2]
+    analyses[1].results_dir = "/app/data/tests/amplicon_v6_output/SRR6180435"
+    analyses[1].save()
+
+    mock_move_data_batch = Mock(return_value="mock_job_id")
+
+    with patch(
+        "workflows.flows.analyse_study_tasks.copy_v6_pipeline_results.move_data_batch",
+        mock_move_data_batch,
+    ):
+        copy_v6_pipeline_results_of_analyses.fn(
+            [analysis.accession for analysis in analyses]
+        )
+
+    # one job for all analyses
+    mock_move_data_batch.assert_called_once()
+    moves, command = mock_move_data_batch.call_args[0]
+    assert "rsync" in command
+    assert command.endswith("'--exclude=*'")
+
+    assert len(moves) == 2
+    for analysis in analyses:
+        analysis.refresh_from_db()
+        source = trailing_slash_ensured_dir(analysis.results_dir)
+        target = f"{EMG_CONFIG.slurm.ftp_results_dir}/{analysis.external_results_dir}"
+        assert (source, target) in moves
+        assert f"/{analysis.run.first_accession}/" in analysis.external_results_dir
+
+
+def test_write_moves_manifest(tmp_path, monkeypatch):
+    """Test that moves are written to a manifest that survives any characters in the paths"""
+    monkeypatch.setattr(EMG_CONFIG.slurm, "default_workdir", str(tmp_path))
+    moves = [
+        ("/results/ERR1/", "/ftp/ERR1 with spaces"),
+        ("/results/ERR2\nnewline/", "/ftp/ERR2"),
+    ]
+
+    manifest = write_moves_manifest(moves)
+
+    assert manifest.parent == tmp_path / MOVES_MANIFESTS_DIR
+    assert manifest.read_bytes().split(b"\0") == [
+        b"/results/ERR1/",
+        b"/ftp/ERR1 with spaces",
+        b"/results/ERR2\nnewline/",
+        b"/ftp/ERR2",
+        b"",
+    ]
+    # the same moves make the same manifest (and so the same job command)
+    assert write_moves_manifest(moves) == manifest
+    assert write_moves_manifest(moves[:1]) != manifest
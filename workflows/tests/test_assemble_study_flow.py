@@ -85,6 +85,7 @@ def test_prefect_assemble_study_flow(
         f"format=json&"
         f"dataPortal=metagenome",
         json=[{"study_accession": accession}],
+        is_reusable=True,  # public and private availability are checked at once
     )
 
     httpx_mock.add_response(
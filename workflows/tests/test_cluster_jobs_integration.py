@@ -3,14 +3,18 @@ import re
 import uuid
 from datetime import timedelta
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from prefect import flow, task, runtime
 from prefect.runtime import flow_run
 
-from workflows.models import OrchestratedClusterJob
+from workflows.models import InputFileHash, OrchestratedClusterJob
+from workflows.prefect_utils.file_hashing import hash_files
+from workflows.prefect_utils.pyslurm_patch import Job
 from workflows.prefect_utils.slurm_flow import (
     compute_hash_of_input_file,
+    poll_cluster_job_states,
     run_cluster_job,
 )
 from workflows.prefect_utils.slurm_policies import (
@@ -202,6 +206,42 @@ def test_input_file_hash(tmp_path, caplog, prefect_harness):
     assert hash.startswith("786a02f7")
 
 
+@pytest.mark.django_db
+def test_input_file_hash_cache(tmp_path, settings, monkeypatch):
+    f1 = tmp_path / "file1.txt"
+    f1.write_text("some inputs")
+
+    cached = InputFileHash.objects.get_or_compute(f1)
+    assert cached.pk
+    assert cached.hash == hash_files([f1])
+    assert cached.as_job_input_file().hash_alg == "blake2b"
+    assert InputFileHash.objects.get_cached(f1) == cached
+
+    # unchanged file is not re-read
+    with patch("workflows.models.hash_files") as mock_hash_files:
+        assert InputFileHash.objects.get_or_compute(f1) == cached
+        mock_hash_files.assert_not_called()
+
+    # changed file is re-hashed
+    f1.write_text("some different inputs")
+    assert InputFileHash.objects.get_cached(f1) is None
+    rehashed = InputFileHash.objects.get_or_compute(f1)
+    assert rehashed.pk == cached.pk
+    assert rehashed.hash != cached.hash
+
+    # big files can be hashed from samples
+    with monkeypatch.context() as m:
+        m.setattr(settings.EMG_CONFIG.slurm, "input_file_sampled_hash_min_bytes", 10)
+        sampled = InputFileHash.objects.get_or_compute(f1)
+    assert sampled.hash_alg == "blake2b-sampled"
+    assert sampled.hash != rehashed.hash
+
+    # missing files are not cached
+    missing = InputFileHash.objects.get_or_compute(tmp_path / "nope.txt")
+    assert missing.pk is None
+    assert InputFileHash.objects.count() == 2
+
+
 @pytest.mark.django_db
 def test_slurm_resubmit_policies():
     jsd1 = OrchestratedClusterJob.SlurmJobSubmitDescription(
@@ -279,6 +319,54 @@ def test_slurm_resubmit_policies():
     assert matching_jobs.count() == 0
 
 
+@pytest.mark.django_db
+def test_poll_cluster_job_states():
+    def make_job(cluster_job_id: int, state: SlurmStatus) -> OrchestratedClusterJob:
+        return OrchestratedClusterJob.objects.create(
+            cluster_job_id=cluster_job_id,
+            job_submit_description=OrchestratedClusterJob.SlurmJobSubmitDescription(
+                name=f"Job {cluster_job_id}",
+                script="echo 'test'",
+                working_directory="/nfs",
+            ),
+            flow_run_id=uuid.uuid4(),
+            last_known_state=state,
+        )
+
+    running = make_job(1, SlurmStatus.running)
+    pending = make_job(2, SlurmStatus.pending)
+    unknown_to_slurm = make_job(3, SlurmStatus.pending)
+    completed = make_job(4, SlurmStatus.completed)
+
+    assert set(OrchestratedClusterJob.objects.filter_in_flight()) == {
+        running,
+        pending,
+        unknown_to_slurm,
+    }
+
+    with patch(
+        "workflows.prefect_utils.pyslurm_patch.Jobs.load",
+        return_value={
+            1: Job(job_id=1, state=SlurmStatus.completed.value),
+            2: Job(job_id=2, state=SlurmStatus.running.value),
+        },
+    ) as mock_jobs_load:
+        assert poll_cluster_job_states() == 2
+
+    # one slurm query for all in-flight jobs
+    mock_jobs_load.assert_called_once()
+    assert mock_jobs_load.call_args.kwargs["db_filter"].ids == [1, 2, 3]
+
+    for ocj in [running, pending, unknown_to_slurm, completed]:
+        ocj.refresh_from_db()
+    assert running.last_known_state == SlurmStatus.completed
+    assert running.state_checked_at is not None
+    assert pending.last_known_state == SlurmStatus.running
+    assert unknown_to_slurm.last_known_state == SlurmStatus.pending
+    assert unknown_to_slurm.state_checked_at is None
+    assert completed.state_checked_at is None
+
+
 @flow(log_prints=True)
 def retryable_subflow(param: str, **kwargs):
     print(f"Retryable subflow for {param}")
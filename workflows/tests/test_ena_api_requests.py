@@ -1,3 +1,6 @@
+import re
+
+import httpx
 import pytest
 from django.conf import settings
 from prefect import State
@@ -9,6 +12,9 @@ from workflows.ena_utils.ena_accession_matching import (
     extract_study_accession_from_study_title,
 )
 from workflows.ena_utils.ena_api_requests import (
+    _bulk_make_samples_and_runs,
+    get_ena_studies_availability,
+    get_ena_study_availability,
     get_study_from_ena,
     get_study_readruns_from_ena,
     is_ena_study_available_privately,
@@ -22,6 +28,7 @@ from workflows.ena_utils.requestors import (
     ENAAccessException,
     ENAAvailabilityException,
 )
+from workflows.ena_utils.read_run import ENAReadRunFields, ENAReadRunQuery
 from workflows.ena_utils.study import ENAStudyQuery, ENAStudyFields
 from workflows.ena_utils.abstract import (
     ENAPortalResultType,
@@ -238,8 +245,14 @@ def test_get_study_from_ena_private(httpx_mock, prefect_harness):
 
 @pytest.mark.httpx_mock(should_mock=should_not_mock_httpx_requests_to_prefect_server)
 @pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("records_format", ["json", "tsv"])
 def test_get_study_readruns_from_ena(
-    httpx_mock, raw_read_ena_study, raw_reads_mgnify_study, prefect_harness
+    httpx_mock,
+    raw_read_ena_study,
+    raw_reads_mgnify_study,
+    prefect_harness,
+    monkeypatch,
+    records_format,
 ):
     """
     run1 is not metagenomic/metatranscriptomic data
@@ -249,205 +262,216 @@ def test_get_study_readruns_from_ena(
     run5 paired but has 1 fq
     run6 paired has additional fqs
     """
+    # production reads the portal API as TSV; the other fixtures mock JSON
+    monkeypatch.setattr(
+        EMG_CONFIG.ena, "portal_search_api_records_format", records_format
+    )
     study_accession = "PRJNA398089"
+    read_runs = [
+        {
+            "run_accession": "RUN1",
+            "sample_accession": "SAMPLE1",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP1",
+            "fastq_md5": "md5kbshdk",
+            "fastq_ftp": "fq.fastq.gz",
+            "library_layout": "SINGLE",
+            "library_strategy": "AMPLICON",
+            "library_source": "GENOMIC",
+            "scientific_name": "genome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN2",
+            "sample_accession": "SAMPLE2",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP2",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq_1.fastq.gz;fq_2.fastq.gz",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN3",
+            "sample_accession": "SAMPLE3",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP3",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq_1.fastq.gz;fq_2.fastq.gz",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOME",
+            "scientific_name": "uncultured bacteria",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN4",
+            "sample_accession": "SAMPLE4",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP4",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq_1.fastq.gz;fq_2.fastq.gz",
+            "library_layout": "SINGLE",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN5",
+            "sample_accession": "SAMPLE5",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP5",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq.fastq.gz",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN6",
+            "sample_accession": "SAMPLE6",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP6",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq_2.fastq.gz;fq_1.fastq.gz;fq_merged.fastq.gz;fq_3.fastq.gz",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN7",
+            "sample_accession": "SAMPLE7",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP7",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq_2.fastq.gz",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN8",
+            "sample_accession": "SAMPLE8",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP8",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq_2.fastq.gz",
+            "library_layout": "SINGLE",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN9",
+            "sample_accession": "SAMPLE9",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP9",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+        {
+            "run_accession": "RUN10",
+            "sample_accession": "SAMPLE10",
+            "sample_title": "sample title",
+            "secondary_sample_accession": "SAMP10",
+            "fastq_md5": "md5kjdndk",
+            "fastq_ftp": "fq.fastq.gz;fq_2.fastq.gz;fq_1.fastq.gz",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": "52",
+            "lon": "0",
+            "location": "hinxton",
+        },
+    ]
+    if records_format == "json":
+        response = {"json": read_runs}
+    else:
+        header = list(read_runs[0].keys())
+        rows = ["\t".join(run[field] for field in header) for run in read_runs]
+        response = {"text": "\n".join(["\t".join(header)] + rows) + "\n"}
     httpx_mock.add_response(
         url=f"{EMG_CONFIG.ena.portal_search_api}?result=read_run&query=%22%28study_accession%3D{study_accession}+OR+secondary_study_accession%3D{study_accession}%29%22"
         f"&fields=run_accession%2Csample_accession%2Csample_title%2Csecondary_sample_accession%2Cfastq_md5%2Cfastq_ftp%2Clibrary_layout%2Clibrary_strategy%2Clibrary_source%2Cscientific_name%2Chost_tax_id%2Chost_scientific_name%2Cinstrument_platform%2Cinstrument_model%2Clocation%2Clat%2Clon"
         f"&limit=10"
-        f"&format=json"
+        f"&format={records_format}"
         f"&dataPortal=metagenome",
-        json=[
-            {
-                "run_accession": "RUN1",
-                "sample_accession": "SAMPLE1",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP1",
-                "fastq_md5": "md5kbshdk",
-                "fastq_ftp": "fq.fastq.gz",
-                "library_layout": "SINGLE",
-                "library_strategy": "AMPLICON",
-                "library_source": "GENOMIC",
-                "scientific_name": "genome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN2",
-                "sample_accession": "SAMPLE2",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP2",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq_1.fastq.gz;fq_2.fastq.gz",
-                "library_layout": "PAIRED",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN3",
-                "sample_accession": "SAMPLE3",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP3",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq_1.fastq.gz;fq_2.fastq.gz",
-                "library_layout": "PAIRED",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOME",
-                "scientific_name": "uncultured bacteria",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN4",
-                "sample_accession": "SAMPLE4",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP4",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq_1.fastq.gz;fq_2.fastq.gz",
-                "library_layout": "SINGLE",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN5",
-                "sample_accession": "SAMPLE5",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP5",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq.fastq.gz",
-                "library_layout": "PAIRED",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN6",
-                "sample_accession": "SAMPLE6",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP6",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq_2.fastq.gz;fq_1.fastq.gz;fq_merged.fastq.gz;fq_3.fastq.gz",
-                "library_layout": "PAIRED",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN7",
-                "sample_accession": "SAMPLE7",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP7",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq_2.fastq.gz",
-                "library_layout": "PAIRED",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN8",
-                "sample_accession": "SAMPLE8",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP8",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq_2.fastq.gz",
-                "library_layout": "SINGLE",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN9",
-                "sample_accession": "SAMPLE9",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP9",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "",
-                "library_layout": "PAIRED",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-            {
-                "run_accession": "RUN10",
-                "sample_accession": "SAMPLE10",
-                "sample_title": "sample title",
-                "secondary_sample_accession": "SAMP10",
-                "fastq_md5": "md5kjdndk",
-                "fastq_ftp": "fq.fastq.gz;fq_2.fastq.gz;fq_1.fastq.gz",
-                "library_layout": "PAIRED",
-                "library_strategy": "AMPLICON",
-                "library_source": "METAGENOMIC",
-                "scientific_name": "metagenome",
-                "host_tax_id": "7460",
-                "host_scientific_name": "Apis mellifera",
-                "instrument_platform": "ILLUMINA",
-                "instrument_model": "Illumina MiSeq",
-                "lat": "52",
-                "lon": "0",
-                "location": "hinxton",
-            },
-        ],
+        **response,
     )
     get_study_readruns_from_ena(study_accession, limit=10)
     # run is not metagenome in scientific_name
@@ -820,6 +844,109 @@ def test_ena_api_query_maker(httpx_mock):
     assert request.get(raise_on_empty=False) == []
 
 
+@pytest.mark.django_db
+def test_bulk_make_samples_and_runs(
+    raw_reads_mgnify_study, django_assert_max_num_queries
+):
+    def read_run(i: int, lat: str = "52") -> dict:
+        return {
+            "run_accession": f"RUN{i}",
+            "sample_accession": f"SAMEA{i // 2}",  # two runs per sample
+            "secondary_sample_accession": f"ERS{i // 2}",
+            "sample_title": "sample title",
+            "library_layout": "PAIRED",
+            "library_strategy": "AMPLICON",
+            "library_source": "METAGENOMIC",
+            "scientific_name": "metagenome",
+            "host_tax_id": "7460",
+            "host_scientific_name": "Apis mellifera",
+            "instrument_platform": "ILLUMINA",
+            "instrument_model": "Illumina MiSeq",
+            "lat": lat,
+            "lon": "0",
+        }
+
+    with django_assert_max_num_queries(15):
+        runs = _bulk_make_samples_and_runs(
+            [read_run(i) for i in range(40)],
+            raw_reads_mgnify_study,
+            [{"fastq_ftps": [f"RUN{i}_1.fastq.gz"]} for i in range(40)],
+        )
+    assert [run.first_accession for run in runs] == [f"RUN{i}" for i in range(40)]
+    assert (
+        analyses.models.Run.objects.filter(study=raw_reads_mgnify_study).count() == 40
+    )
+    assert (
+        analyses.models.Sample.objects.filter(studies=raw_reads_mgnify_study).count()
+        == 20
+    )
+    assert ena.models.Sample.objects.filter(accession__startswith="SAMEA").count() == 20
+
+    run = analyses.models.Run.objects.get_by_accession("RUN3")
+    assert run.experiment_type == analyses.models.Run.ExperimentTypes.AMPLICON
+    assert run.metadata["fastq_ftps"] == ["RUN3_1.fastq.gz"]
+    assert run.metadata["host_tax_id"] == "7460"
+    assert set(run.sample.ena_accessions) == {"SAMEA1", "ERS1"}
+    assert run.sample.ena_sample.accession == "SAMEA1"
+
+    # re-importing updates rather than duplicates
+    with django_assert_max_num_queries(15):
+        _bulk_make_samples_and_runs(
+            [read_run(i, lat="53") for i in range(40)], raw_reads_mgnify_study
+        )
+    assert (
+        analyses.models.Run.objects.filter(study=raw_reads_mgnify_study).count() == 40
+    )
+    assert (
+        analyses.models.Sample.objects.filter(studies=raw_reads_mgnify_study).count()
+        == 20
+    )
+    run.sample.refresh_from_db()
+    assert run.sample.metadata["lat"] == "53"
+    assert ena.models.Sample.objects.get(accession="SAMEA1").metadata["lat"] == "53"
+
+
+@pytest.mark.httpx_mock(should_mock=should_not_mock_httpx_requests_to_prefect_server)
+def test_ena_api_request_iter_records_paged_tsv(httpx_mock):
+    run_accessions = [f"SRR{i}" for i in range(25)]
+
+    def portal_api(request: httpx.Request):
+        assert request.url.params["format"] == "tsv"
+        offset = int(request.url.params.get("offset", 0))
+        limit = int(request.url.params["limit"])
+        rows = [
+            f"{run}\tSAMN{i}"
+            for i, run in enumerate(run_accessions[offset : offset + limit])
+        ]
+        return httpx.Response(
+            200, text="\n".join(["run_accession\tsample_accession"] + rows) + "\n"
+        )
+
+    httpx_mock.add_callback(portal_api, is_reusable=True)
+
+    request = ENAAPIRequest(
+        result=ENAPortalResultType.READ_RUN,
+        query=ENAReadRunQuery(study_accession="PRJ1"),
+        fields=[ENAReadRunFields.RUN_ACCESSION, ENAReadRunFields.SAMPLE_ACCESSION],
+        limit=None,
+        format="tsv",
+    )
+    records = list(request.iter_records(page_size=10))
+    assert [record["run_accession"] for record in records] == run_accessions
+    assert records[0] == {"run_accession": "SRR0", "sample_accession": "SAMN0"}
+    # 10 + 10 + 5
+    assert len(httpx_mock.get_requests()) == 3
+
+    request.limit = 12
+    assert len(list(request.iter_records(page_size=10))) == 12
+
+    request.query = ENAReadRunQuery(study_accession="PRJ2")
+    run_accessions = []
+    with pytest.raises(ENAAvailabilityException):
+        list(request.iter_records(page_size=10))
+    assert list(request.iter_records(raise_on_empty=False)) == []
+
+
 @pytest.mark.httpx_mock(should_mock=should_not_mock_httpx_requests_to_prefect_server)
 def test_is_study_public(httpx_mock, prefect_harness):
     httpx_mock.add_response(
@@ -856,6 +983,64 @@ def test_is_study_private(httpx_mock, prefect_harness):
     assert is_ena_study_available_privately("ERP1")
 
 
+@pytest.mark.httpx_mock(should_mock=should_not_mock_httpx_requests_to_prefect_server)
+def test_get_ena_studies_availability(httpx_mock, prefect_harness):
+    public_studies = {"ERP1", "ERP2"}
+    private_studies = {"ERP2", "ERP3"}
+
+    def portal_api(request: httpx.Request):
+        accession = re.search(
+            r"study_accession=(\w+)", request.url.params["query"]
+        ).group(1)
+        is_authed = "Authorization" in request.headers
+        available = accession in (private_studies if is_authed else public_studies)
+        return httpx.Response(
+            200, json=[{"study_accession": accession}] if available else []
+        )
+
+    httpx_mock.add_callback(portal_api, is_reusable=True)
+
+    assert get_ena_studies_availability(["ERP1", "ERP2", "ERP3", "ERP4"]) == {
+        "ERP1": (True, False),
+        "ERP2": (True, True),
+        "ERP3": (False, True),
+        "ERP4": (False, False),
+    }
+    # public and private queries for every study
+    portal_requests = [
+        request
+        for request in httpx_mock.get_requests()
+        if str(request.url).startswith(str(EMG_CONFIG.ena.portal_search_api))
+    ]
+    assert len(portal_requests) == 8
+
+
+@pytest.mark.httpx_mock(should_mock=should_not_mock_httpx_requests_to_prefect_server)
+def test_get_ena_study_availability(httpx_mock, prefect_harness):
+    def portal_api(request: httpx.Request):
+        if "Authorization" in request.headers:
+            return httpx.Response(500, text="Private portal is down")
+        accession = re.search(
+            r"study_accession=(\w+)", request.url.params["query"]
+        ).group(1)
+        return httpx.Response(
+            200, json=[{"study_accession": accession}] if accession == "ERP1" else []
+        )
+
+    httpx_mock.add_callback(portal_api, is_reusable=True)
+
+    # the private query is made at the same time, but its failure does not matter for a public study
+    assert get_ena_study_availability("ERP1") == (True, False)
+    assert any(
+        "Authorization" in request.headers for request in httpx_mock.get_requests()
+    )
+
+    # but it does for a study that is not public
+    state: State = get_ena_study_availability("ERP2", return_state=True)
+    assert state.is_failed()
+    assert ENAAccessException.__name__ in state.message
+
+
 @pytest.mark.httpx_mock(should_mock=should_not_mock_httpx_requests_to_prefect_server)
 @pytest.mark.django_db
 def test_sync_privacy_state_of_ena_study_and_derived_objects(
@@ -1,6 +1,19 @@
+import logging
+import random
+import time
+
 import pytest
 from pydantic import ValidationError
 
+from workflows.data_io_utils.csv.csv_comment_handler import (
+    CommentAwareDictReader,
+    CSVDelimiter,
+)
+from workflows.data_io_utils.csv.schema_validation import (
+    ColumnarSchemaValidator,
+    RaggedCSVError,
+)
+
 from workflows.data_io_utils.file_rules.base_rules import FileRule, GlobRule
 from workflows.data_io_utils.file_rules.common_rules import (
     DirectoryExistsRule,
@@ -10,9 +23,12 @@ from workflows.data_io_utils.file_rules.common_rules import (
     GlobHasFilesRule,
 )
 from workflows.data_io_utils.file_rules.mgnify_v6_result_rules import (
+    FileConformsToFunctionalTSVSchemaRule,
     FileConformsToTaxonomyTSVSchemaRule,
+    FunctionalTSVRow,
 )
 from workflows.data_io_utils.file_rules.nodes import Directory, File
+from workflows.data_io_utils.file_rules.validation import validate_result_tree
 
 
 def test_file_rules_utils(tmp_path):
@@ -191,3 +207,123 @@ def test_glob_file_count_rules(tmp_path):
     with pytest.raises(ValidationError) as exc_info:
         Directory(path=empty, glob_rules=[GlobHasFilesCountRule[:1]])
         assert "Glob should have :2 file(s)" in exc_info.value
+
+
+def test_validate_result_tree(tmp_path):
+    tested = []
+
+    def contains_hello(path):
+        tested.append(path.name)
+        return "hello" in path.read_text()
+
+    MyRule = FileRule(rule_name="Text contains hello", test=contains_hello)
+
+    (tmp_path / "tables" / "db").mkdir(parents=True)
+    good = tmp_path / "tables" / "db" / "SRR1_db.txt"
+    good.write_text("hello world")
+    bad = tmp_path / "tables" / "db" / "SRR1_other.txt"
+    bad.write_text("goodbye")
+    (tmp_path / "tables" / "db" / "SRR1_db.html").write_text("not a table")
+    (tmp_path / "SRR1_top.txt").write_text("not under tables")
+
+    failures = validate_result_tree(
+        tmp_path, {"tables/*/SRR1_*.txt": [FileExistsRule, MyRule]}, max_workers=2
+    )
+    assert failures == {bad: ["Text contains hello"]}
+    assert sorted(tested) == ["SRR1_db.txt", "SRR1_other.txt"]
+
+    # outcomes are reused by File nodes, e.g. during an import, whilst the files are unchanged
+    File(path=good, rules=[FileExistsRule, MyRule])
+    with pytest.raises(ValidationError):
+        File(path=bad, rules=[MyRule])
+    assert len(tested) == 2
+
+    # but not once a file changes
+    bad.write_text("hello again")
+    File(path=bad, rules=[MyRule])
+    assert len(tested) == 3
+    assert validate_result_tree(tmp_path, {"tables/*/*.txt": [MyRule]}) == {}
+    assert len(tested) == 3
+
+    assert validate_result_tree(tmp_path / "non-exist", {"*": [MyRule]}) == {}
+
+
+def test_columnar_csv_schema_validation(tmp_path, caplog):
+    tsv_file = tmp_path / "functions.tsv"
+    tsv_file.write_text(
+        "function\tread_count\tcoverage_depth\tcoverage_breadth\n"
+        "PF00001\t4\t0.5\t0.25\n"
+        "PF00002\tmany\t0.5\t\n"
+        "PF00003\t1\t0.5\t0.25\n"
+        "PF00004\tmany\t0.5\t0.25\n"
+    )
+
+    validator = ColumnarSchemaValidator(
+        FunctionalTSVRow, delimiter=CSVDelimiter.TAB, none_values=[""]
+    )
+    with tsv_file.open() as f:
+        bad_rows = validator.bad_rows(f)
+    assert [bad_row.row_number for bad_row in bad_rows] == [2, 4]
+    assert bad_rows[0].errors[0].startswith("read_count: Input should be a valid")
+    assert "'many'" in bad_rows[0].errors[0]
+    assert bad_rows[0].errors[1].startswith("coverage_breadth:")
+    assert len(bad_rows[1].errors) == 1
+
+    with tsv_file.open() as f:
+        assert len(validator.bad_rows(f, max_bad_rows=1)) == 1
+
+    with caplog.at_level(logging.ERROR):
+        with pytest.raises(ValidationError):
+            File(path=tsv_file, rules=[FileConformsToFunctionalTSVSchemaRule])
+    assert "Validation failed on row 2" in caplog.text
+
+    # header aliases are checked once
+    tsv_file.write_text(
+        "function\tcount\tcoverage_depth\tcoverage_breadth\nPF1\t1\t0\t0\n"
+    )
+    with tsv_file.open() as f:
+        assert validator.bad_rows(f)[0].errors == ["read_count: Field required"]
+
+    # rows with more values than the header are validated row by row instead
+    tsv_file.write_text(
+        "function\tread_count\tcoverage_depth\tcoverage_breadth\n"
+        "PF00001\t4\t0.5\t0.25\t\n"
+    )
+    with tsv_file.open() as f:
+        with pytest.raises(RaggedCSVError):
+            validator.bad_rows(f)
+    File(path=tsv_file, rules=[FileConformsToFunctionalTSVSchemaRule])
+
+
+@pytest.mark.benchmark
+def test_benchmark_csv_schema_rule(tmp_path):
+    """
+    Compare against validating each row with the pydantic schema, for a large functional profile table.
+    Run with: pytest -m benchmark -s --no-cov -n0 workflows/tests/test_file_rules_utils.py
+    """
+    random.seed(1)
+    rows = 1_000_000
+    tsv_file = tmp_path / "functions.tsv"
+    with tsv_file.open("w") as f:
+        f.write("function\tread_count\tcoverage_depth\tcoverage_breadth\n")
+        for i in range(rows):
+            f.write(
+                f"PF{i:07d}\t{random.randint(1, 1000)}\t{random.random() * 10:.3f}\t{random.random():.3f}\n"
+            )
+
+    start = time.perf_counter()
+    with tsv_file.open() as f:
+        for row in CommentAwareDictReader(
+            f, delimiter=CSVDelimiter.TAB, none_values=[""]
+        ):
+            FunctionalTSVRow.model_validate(row)
+    row_wise_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    File(path=tsv_file, rules=[FileConformsToFunctionalTSVSchemaRule])
+    columnar_seconds = time.perf_counter() - start
+
+    print(
+        f"{rows} rows: row-wise {row_wise_seconds:.2f}s, columnar {columnar_seconds:.2f}s"
+    )
+    assert columnar_seconds * 5 < row_wise_seconds
@@ -0,0 +1,109 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+from prefect import flow
+
+import analyses.models
+from workflows.flows.analyse_study_tasks.import_completed_amplicon_analyses import (
+    import_completed_analyses,
+)
+from workflows.flows.analyse_study_tasks.shared.import_analyses import (
+    import_analyses_concurrently,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_analyses_concurrently(prefect_harness, raw_read_analyses):
+    failing_analysis = raw_read_analyses[1]
+    import_threads = set()
+
+    def fake_import_analysis(analysis: analyses.models.Analysis):
+        import_threads.add(threading.current_thread().name)
+        analysis.refresh_from_db()
+        if analysis == failing_analysis:
+            raise FileNotFoundError("No results")
+        analysis.quality_control = {"imported": True}
+        analysis.save()
+
+    @flow
+    def fake_import_completed_analyses():
+        return import_analyses_concurrently(fake_import_analysis, raw_read_analyses)
+
+    imported = fake_import_completed_analyses()
+
+    # imports happened in worker threads, and one failure did not stop the others
+    assert threading.current_thread().name not in import_threads
+    assert imported == [
+        analysis for analysis in raw_read_analyses if analysis != failing_analysis
+    ]
+    for analysis in imported:
+        analysis.refresh_from_db()
+        assert analysis.quality_control == {"imported": True}
+        assert not analysis.status.get(
+            analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED
+        )
+
+    failing_analysis.refresh_from_db()
+    assert failing_analysis.status[
+        failing_analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED
+    ]
+    assert (
+        "No results"
+        in failing_analysis.status[
+            f"{failing_analysis.AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED}_reason"
+        ]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("copy_fails", [False, True])
+def test_import_completed_analyses_marked_imported_only_once_copied(
+    prefect_harness, raw_read_analyses, copy_fails
+):
+    AnalysisStates = analyses.models.Analysis.AnalysisStates
+    analysis = raw_read_analyses[
+        0
+    ]  # has amplicon results in /app/data/tests/amplicon_v6_output
+    analysis.annotations = analysis.default_annotations()
+    analysis.downloads = []
+    analysis.status[AnalysisStates.ANALYSIS_COMPLETED] = True
+    analysis.status[AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED] = False
+    analysis.save()
+
+    def fake_move_data_batch(moves, *args, **kwargs):
+        # the analysis must not be ready (public) while its results are being copied
+        analysis.refresh_from_db()
+        assert not analysis.is_ready
+        if copy_fails:
+            raise RuntimeError("Datamover job failed")
+        return "mock_job_id"
+
+    with patch(
+        "workflows.flows.analyse_study_tasks.copy_v6_pipeline_results.move_data_batch",
+        Mock(side_effect=fake_move_data_batch),
+    ) as mock_move_data_batch:
+        import_completed_analyses(
+            amplicon_current_outdir="/app/data/tests/amplicon_v6_output",
+            amplicon_analyses=[analysis],
+        )
+    mock_move_data_batch.assert_called_once()
+
+    analysis.refresh_from_db()
+    assert analysis.annotations[analysis.TAXONOMIES]
+    if copy_fails:
+        assert not analysis.is_ready
+        assert not analysis.status[AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+        assert analysis.status[AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED]
+        assert (
+            "Datamover job failed"
+            in analysis.status[
+                f"{AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED}_reason"
+            ]
+        )
+        assert not analysis.external_results_dir
+    else:
+        assert analysis.is_ready
+        assert analysis.status[AnalysisStates.ANALYSIS_ANNOTATIONS_IMPORTED]
+        assert not analysis.status[AnalysisStates.ANALYSIS_POST_SANITY_CHECK_FAILED]
+        assert analysis.external_results_dir
@@ -2,8 +2,13 @@ import pymongo
 import pytest
 from sqlalchemy import select
 
-from analyses.models import Analysis
-from workflows.data_io_utils.legacy_emg_dbs import LegacyStudy, legacy_emg_db_session
+from analyses.models import Analysis, AnalysisAnnotation
+from workflows.data_io_utils.legacy_emg_dbs import (
+    LegacyStudy,
+    get_taxonomies_from_api_v1_mongo,
+    legacy_emg_db_session,
+    legacy_mongo_taxonomies_collection,
+)
 from workflows.flows.import_v5_amplicon_analyses import import_v5_amplicon_analyses
 from workflows.prefect_utils.testing_utils import run_flow_and_capture_logs
 
@@ -135,3 +140,63 @@ def test_prefect_import_v5_amplicon_analyses_flow(
         {"count": 10, "organism": "Archaea:Euks::Something|5.0", "description": None},
         {"count": 20, "organism": "Bacteria|5.0", "description": None},
     ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_prefect_import_v5_amplicon_analyses_flow_reimport(
+    prefect_harness,
+    mock_legacy_emg_db_session,
+    mock_mongo_client_for_taxonomy,
+):
+    run_flow_and_capture_logs(import_v5_amplicon_analyses, mgys="MGYS00005000")
+
+    analyses_count = Analysis.objects.count()
+    annotation_rows_count = AnalysisAnnotation.objects.count()
+    assert annotation_rows_count > 0
+    imported_annotations = Analysis.objects_and_annotations.get(
+        accession="MGYA00012345"
+    ).annotations
+
+    # drift the analysis away from the legacy dbs, without any signals
+    Analysis.objects_and_annotations.filter(accession="MGYA00012345").update(
+        results_dir="some/other/dir",
+        annotations={Analysis.TAXONOMIES: {}},
+    )
+
+    reimporter_flow_run = run_flow_and_capture_logs(
+        import_v5_amplicon_analyses, mgys="MGYS00005000"
+    )
+    assert "Updated analysis MGYA00012345 (V5 AMPLI)" in reimporter_flow_run.logs
+
+    # upserted in place: no new analyses, nor duplicated downloads or annotation rows
+    assert Analysis.objects.count() == analyses_count
+    assert AnalysisAnnotation.objects.count() == annotation_rows_count
+
+    reimported_analysis = Analysis.objects_and_annotations.get(accession="MGYA00012345")
+    assert reimported_analysis.results_dir == "some/dir/in/results"
+    assert reimported_analysis.annotations == imported_annotations
+    assert len(reimported_analysis.downloads) == 1
+    assert reimported_analysis.annotations_imported
+
+
+def test_get_taxonomies_from_api_v1_mongo(
+    prefect_harness, mock_mongo_client_for_taxonomy, settings, monkeypatch
+):
+    monkeypatch.setattr(settings.EMG_CONFIG.legacy_service, "emg_mongo_page_size", 2)
+    taxonomies = get_taxonomies_from_api_v1_mongo(
+        ["MGYA00012345", "MGYA00012346", "MGYA00012347"]
+    )
+
+    # one query per page of accessions, on the one shared client
+    collection = mock_mongo_client_for_taxonomy["any_db"].analysis_job_taxonomy
+    assert collection.find.call_count == 2
+    query, *_ = collection.find.call_args_list[1].args
+    assert query == {"accession": {"$in": ["MGYA00012347"]}}
+    assert legacy_mongo_taxonomies_collection() is collection
+
+    assert list(taxonomies.keys()) == ["MGYA00012345"]
+    assert taxonomies["MGYA00012345"]["ssu"][1] == {
+        "count": 40,
+        "organism": "Bacteria|5.0",
+    }
+    assert taxonomies["MGYA00012345"]["its_one_db"] is None
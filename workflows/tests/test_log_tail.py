@@ -0,0 +1,45 @@
+from workflows.prefect_utils.log_tail import read_log_tail
+
+
+def test_read_log_tail(tmp_path):
+    log_path = tmp_path / "slurm-1.out"
+    log_path.write_text("".join(f"line {i}\n" for i in range(1000)))
+
+    tail, offset = read_log_tail(log_path, 3, block_size=16)
+    assert tail == "line 997\nline 998\nline 999\n"
+    assert offset == log_path.stat().st_size
+
+    # unchanged file: nothing new to read
+    assert read_log_tail(log_path, 3, previous_tail=tail, from_offset=offset) == (
+        tail,
+        offset,
+    )
+
+    # a partial line, then its continuation, are joined onto the previous tail
+    with open(log_path, "a") as log:
+        log.write("line 1000 sta")
+    tail, offset = read_log_tail(log_path, 3, previous_tail=tail, from_offset=offset)
+    assert tail == "line 998\nline 999\nline 1000 sta"
+
+    with open(log_path, "a") as log:
+        log.write("rted\nline 1001\n")
+    tail, offset = read_log_tail(
+        log_path, 3, previous_tail=tail, from_offset=offset, block_size=4
+    )
+    assert tail == "line 999\nline 1000 started\nline 1001\n"
+    assert offset == log_path.stat().st_size
+
+    # lots of new lines: previous tail is not needed
+    with open(log_path, "a") as log:
+        log.write("".join(f"new line {i}\n" for i in range(100)))
+    tail, _ = read_log_tail(log_path, 2, previous_tail=tail, from_offset=offset)
+    assert tail == "new line 98\nnew line 99\n"
+
+    # truncated / replaced log: read from scratch
+    log_path.write_text("fresh\nlog\n")
+    tail, offset = read_log_tail(log_path, 5, previous_tail=tail, from_offset=offset)
+    assert tail == "fresh\nlog\n"
+    assert offset == 10
+
+    # fewer lines than requested
+    assert read_log_tail(log_path, 100)[0] == "fresh\nlog\n"
@@ -0,0 +1,57 @@
+import threading
+import time
+
+import pytest
+from prefect import flow
+
+from activate_django_first import EMG_CONFIG
+from workflows.flows.analyse_study_tasks.shared.samplesheet_chunks import (
+    run_samplesheet_chunks,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_samplesheet_chunks_concurrently(
+    prefect_harness, mock_cluster_can_accept_jobs_yes, monkeypatch
+):
+    monkeypatch.setattr(EMG_CONFIG.slurm, "samplesheet_chunks_per_study_limit", 2)
+
+    lock = threading.Lock()
+    running = []
+    most_running = []
+    chunks_run = []
+
+    @flow
+    def fake_pipeline_via_samplesheet(mgnify_study, analysis_ids):
+        with lock:
+            running.append(analysis_ids)
+            most_running.append(len(running))
+        time.sleep(0.5)
+        with lock:
+            running.remove(analysis_ids)
+            chunks_run.append(analysis_ids)
+        if analysis_ids == [5]:
+            raise ValueError("Chunk failed")
+
+    @flow
+    def fake_study_flow():
+        run_samplesheet_chunks(
+            fake_pipeline_via_samplesheet, None, [[1, 2], [3, 4], [5], [6]]
+        )
+
+    with pytest.raises(ValueError, match="Chunk failed"):
+        fake_study_flow()
+
+    # every chunk ran, even after one failed, but never more than two at once
+    assert sorted(chunks_run) == [[1, 2], [3, 4], [5], [6]]
+    assert max(most_running) == 2
+
+    # if the cluster is full, chunks run one at a time
+    mock_cluster_can_accept_jobs_yes.return_value = 0
+    most_running.clear()
+    chunks_run.clear()
+
+    with pytest.raises(ValueError, match="Chunk failed"):
+        fake_study_flow()
+    assert len(chunks_run) == 4
+    assert max(most_running) == 1